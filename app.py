@@ -0,0 +1,153 @@
+"""
+SkillMentor Flask Web Application (full pipeline)
+
+Serves the translation, retrieval and LLM pipeline of skillmentor.core.
+At startup the caches are warmed in the background with the most frequent
+recorded queries; /ready reports the progress.
+"""
+import os
+import atexit
+import logging
+import uuid
+import time
+from flask import Flask, request, render_template, jsonify, redirect, url_for, Response
+from werkzeug.exceptions import HTTPException
+from skillmentor.core import SkillMentor
+from skillmentor.nlp.tokenizer import query_hash
+from skillmentor.storage.store import create_event_store, RetentionPolicy
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+# Initialize Flask app
+app = Flask(__name__)
+app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'default-dev-key')
+
+# Most frequent recorded queries replayed at startup before /ready reports ready (0 disables)
+WARMUP_QUERIES = int(os.environ.get('SKILLMENTOR_WARMUP_QUERIES', 100))
+
+# Persistent, bounded event store shared by all workers, as in simple_app
+DEFAULT_STORE_URL = 'sqlite:///' + os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'processed', 'skillmentor.db'
+)
+event_store = create_event_store(
+    os.environ.get('SKILLMENTOR_STORE_URL', DEFAULT_STORE_URL),
+    retention=RetentionPolicy(
+        max_events=int(os.environ.get('SKILLMENTOR_MAX_EVENTS', 100000)),
+        max_age=float(os.environ.get('SKILLMENTOR_MAX_EVENT_AGE', 30 * 86400))
+    ),
+    batch_size=int(os.environ.get('SKILLMENTOR_FLUSH_SIZE', 100)),
+    write_behind=True,
+    flush_interval=float(os.environ.get('SKILLMENTOR_FLUSH_INTERVAL', 1.0)),
+    max_queue=int(os.environ.get('SKILLMENTOR_WRITE_QUEUE_SIZE', 10000))
+)
+atexit.register(event_store.close)
+advice_requests = event_store.log('advice_requests')
+
+# The full pipeline; paths and models come from the environment
+mentor = SkillMentor(
+    index_path=os.environ.get('SKILLMENTOR_INDEX_PATH', 'data/processed/faiss_index.bin'),
+    documents_path=os.environ.get('SKILLMENTOR_DOCUMENTS_PATH', 'data/processed/documents.txt'),
+    index_bundle_root=os.environ.get('SKILLMENTOR_BUNDLE_ROOT') or None,
+    encoder_onnx_path=os.environ.get('SKILLMENTOR_ONNX_ENCODER') or None,
+    model_name=os.environ.get('SKILLMENTOR_MODEL', 'meta-llama/Llama-2-7b-chat-hf'),
+    device=os.environ.get('SKILLMENTOR_DEVICE', 'cpu'),
+    translation_backend=os.environ.get('SKILLMENTOR_TRANSLATION_BACKEND', 'google'),
+    precomputed_path=os.environ.get('SKILLMENTOR_PRECOMPUTED_PATH') or None
+)
+
+# Background warm-up over the most frequent recorded queries
+if WARMUP_QUERIES:
+    mentor.start_warmup(advice_requests.read(), n=WARMUP_QUERIES)
+
+def answer(query, source_lang):
+    """Run a query through the pipeline and record it for future warm-ups."""
+    result = mentor.process_query(query, source_lang)
+    result['query_id'] = query_hash(query)
+    advice_requests.append({
+        'id': str(uuid.uuid4()),
+        'query': query,
+        'query_id': result['query_id'],
+        'source_lang': result['source_lang'],
+        'timestamp': time.time(),
+        'processing_time': result['response_time'],
+        'degraded': result['degraded'],
+        'precomputed': result['precomputed']
+    })
+    return result
+
+@app.route('/')
+def index():
+    """Render the home page."""
+    return render_template('index.html')
+
+@app.route('/query', methods=['POST'])
+def process_query():
+    """Process a query from the form and render the advice."""
+    query = request.form.get('query', '').strip()
+    if not query:
+        return render_template('index.html', error='Please enter a query')
+    
+    result = answer(query, request.form.get('language', 'en'))
+    return render_template(
+        'result.html',
+        query=query,
+        advice=result['advice_source_lang'],
+        query_id=result['query_id'],
+        response_time=f"{result['response_time']:.2f}",
+        dashboard_image=result['dashboard_image']
+    )
+
+@app.route('/feedback', methods=['POST'])
+def record_feedback():
+    """Record a 1-5 rating for a query's advice."""
+    try:
+        rating = int(request.form.get('rating', 0))
+    except ValueError:
+        rating = 0
+    query_id = request.form.get('query_id')
+    if not query_id or not 1 <= rating <= 5:
+        return jsonify({'success': False, 'error': 'A query id and a rating from 1 to 5 are required'}), 400
+    
+    mentor.record_user_feedback(query_id, rating, request.form.get('comments', '').strip() or None)
+    return jsonify({'success': True})
+
+@app.route('/api/advice', methods=['POST'])
+def api_get_advice():
+    """API endpoint: {"query": ..., "source_lang": ...} -> advice."""
+    data = request.get_json(silent=True) or {}
+    query = data.get('query')
+    if not query or not isinstance(query, str):
+        return jsonify({'error': 'Query is required'}), 400
+    
+    result = answer(query, data.get('source_lang', 'en'))
+    result.pop('dashboard_image', None)
+    return jsonify(result)
+
+@app.route('/ready')
+def readiness():
+    """Readiness check: 200 once the cache warm-up is done, 503 with its progress until then."""
+    status = mentor.readiness()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/metrics/prometheus')
+def prometheus_metrics():
+    """Export pipeline stage latencies in the Prometheus text format."""
+    return Response(mentor.prometheus_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.errorhandler(Exception)
+def handle_global_exception(e):
+    """Log unexpected errors and answer JSON for the API, the home page otherwise."""
+    if isinstance(e, HTTPException):
+        return e
+    logging.error(f"Unhandled exception: {str(e)}", exc_info=True)
+    if request.path.startswith('/api/'):
+        return jsonify({'error': 'Internal server error'}), 500
+    return redirect(url_for('index'))
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
@@ -0,0 +1,100 @@
+"""
+Timing, memory and comparison helpers for the benchmarks
+"""
+import time
+import resource
+import numpy as np
+
+def measure(func, inputs, iterations=200, warmup=10):
+    """
+    Call a function repeatedly and summarize its latency
+    
+    Args:
+        func (callable): Function under test
+        inputs (list): Argument tuples, cycled through
+        iterations (int): Measured calls
+        warmup (int): Unmeasured calls made first
+        
+    Returns:
+        dict: Iterations, wall time, throughput and latency percentiles in ms
+    """
+    for i in range(warmup):
+        func(*inputs[i % len(inputs)])
+    
+    latencies = np.empty(iterations)
+    start = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        func(*inputs[i % len(inputs)])
+        latencies[i] = time.perf_counter() - call_start
+    seconds = time.perf_counter() - start
+    
+    return {
+        'iterations': iterations,
+        'seconds': seconds,
+        'throughput_per_s': iterations / seconds if seconds else 0.0,
+        'latency_ms': latency_summary(latencies)
+    }
+
+def latency_summary(latencies):
+    """
+    Summarize durations
+    
+    Args:
+        latencies: Durations in seconds
+        
+    Returns:
+        dict: Mean, p50, p95, p99 and max in milliseconds (None when empty)
+    """
+    latencies = np.asarray(latencies, dtype=float)
+    if not latencies.size:
+        return {'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'mean': float(latencies.mean() * 1000),
+        'p50': float(p50),
+        'p95': float(p95),
+        'p99': float(p99),
+        'max': float(latencies.max() * 1000)
+    }
+
+def peak_rss_mb():
+    """Peak resident memory of the current process in MB (Linux reports kB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def result_key(result):
+    """Identify a result across runs"""
+    return (result['name'], result.get('corpus_size'))
+
+def compare(results, baseline, threshold=0.10):
+    """
+    Find results that got slower than a previous run
+    
+    Args:
+        results (list): Results of this run
+        baseline (list): Results of the previous run
+        threshold (float): Tolerated relative slowdown of p50 latency and throughput
+        
+    Returns:
+        list: One dict per regressed metric
+    """
+    previous = {result_key(r): r for r in baseline if r.get('status') == 'ok'}
+    regressions = []
+    for result in results:
+        before = previous.get(result_key(result))
+        if result.get('status') != 'ok' or before is None:
+            continue
+        checks = [
+            ('latency_ms.p50', result['latency_ms']['p50'] / before['latency_ms']['p50'] - 1),
+            ('throughput_per_s', before['throughput_per_s'] / result['throughput_per_s'] - 1),
+            ('peak_rss_mb', result['peak_rss_mb'] / before['peak_rss_mb'] - 1)
+        ]
+        for metric, slowdown in checks:
+            if slowdown > threshold:
+                regressions.append({
+                    'name': result['name'],
+                    'corpus_size': result.get('corpus_size'),
+                    'metric': metric,
+                    'change': slowdown
+                })
+    return regressions
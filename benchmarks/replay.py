@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+"""
+Replay recorded advice requests against simple_app served by a WSGI server
+
+Requests come from the event store (the recorded advice_requests) or a
+JSONL file with one {"query": ..., "timestamp": ..., "endpoint": ...}
+object per line. For every worker count the app is started under
+gunicorn (or Werkzeug's threaded server for a single process) and driven
+closed-loop at each concurrency level, open-loop with Poisson arrivals at
+each rate, or with the recorded inter-arrival times.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+import subprocess
+import http.client
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.harness import latency_summary
+from benchmarks.stubs import synthetic_queries
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+ENDPOINTS = ('/api/advice', '/query')
+
+def load_requests(source):
+    """
+    Load recorded requests
+    
+    Args:
+        source (str): JSONL file, or an event store URL ('sqlite:///...')
+        
+    Returns:
+        list: Dicts with 'query' and, when recorded, 'timestamp' and 'endpoint'
+    """
+    if source.startswith(('sqlite:///', 'memory://')):
+        from skillmentor.storage.store import create_event_store
+        
+        store = create_event_store(source)
+        records = store.log('advice_requests').read()
+        store.close()
+    else:
+        records = []
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+    
+    requests = [
+        {'query': r['query'], 'timestamp': r.get('timestamp'), 'endpoint': r.get('endpoint')}
+        for r in records if r.get('query')
+    ]
+    requests.sort(key=lambda r: r['timestamp'] or 0)
+    return requests
+
+def free_port():
+    """An unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def serve_werkzeug(port):
+    """Serve simple_app with Werkzeug's threaded server (runs in the server process)"""
+    from werkzeug.serving import make_server
+    import simple_app
+    
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    make_server('127.0.0.1', port, simple_app.app, threaded=True).serve_forever()
+
+def start_server(server, workers, port):
+    """
+    Start simple_app in a subprocess and wait until it answers
+    
+    Args:
+        server (str): 'gunicorn' or 'werkzeug'
+        workers (int): Worker processes (gunicorn only)
+        port (int): Port to bind on 127.0.0.1
+        
+    Returns:
+        subprocess.Popen: The server process
+    """
+    env = dict(os.environ)
+    # Keep replayed requests out of the persistent store
+    env.setdefault('SKILLMENTOR_STORE_URL', 'memory://')
+    if server == 'gunicorn':
+        command = [
+            sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+            '--log-level', 'warning', 'simple_app:app'
+        ]
+    else:
+        command = [sys.executable, os.path.abspath(__file__), '--serve', str(port)]
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env)
+    
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/')
+            connection.getresponse().read()
+            connection.close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{server} did not start within 60 seconds")
+
+def stop_server(process):
+    """Stop a server process"""
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def send(port, endpoint, query, timeout):
+    """
+    Send one request
+    
+    Returns:
+        bool: Whether the server answered 200
+    """
+    if endpoint == '/api/advice':
+        body = json.dumps({'query': query})
+        headers = {'Content-Type': 'application/json'}
+    else:
+        body = urllib.parse.urlencode({'query': query})
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+        connection.request('POST', endpoint, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        return response.status == 200
+    except OSError:
+        return False
+
+def endpoint_for(request, index, endpoints):
+    """Recorded endpoint of a request, or the endpoints in turn"""
+    if request.get('endpoint') in endpoints:
+        return request['endpoint']
+    return endpoints[index % len(endpoints)]
+
+def run_closed_loop(port, requests, count, concurrency, endpoints, timeout):
+    """
+    Send `count` requests from `concurrency` clients that each wait for a
+    response before sending the next
+    
+    Returns:
+        tuple: (samples of (endpoint, seconds, ok), elapsed seconds)
+    """
+    samples = []
+    lock = threading.Lock()
+    next_index = iter(range(count))
+    
+    def client():
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            request = requests[index % len(requests)]
+            endpoint = endpoint_for(request, index, endpoints)
+            start = time.perf_counter()
+            ok = send(port, endpoint, request['query'], timeout)
+            with lock:
+                samples.append((endpoint, time.perf_counter() - start, ok))
+    
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+def run_open_loop(port, requests, arrivals, endpoints, timeout, max_inflight):
+    """
+    Send requests at fixed arrival times regardless of how fast the server
+    answers; latency is measured from the scheduled arrival, so time spent
+    queued behind a saturated server counts
+    
+    Args:
+        arrivals (list): Arrival offsets in seconds, one per request
+        
+    Returns:
+        tuple: (samples of (endpoint, seconds, ok), elapsed seconds)
+    """
+    samples = []
+    lock = threading.Lock()
+    
+    def fire(index, scheduled):
+        request = requests[index % len(requests)]
+        endpoint = endpoint_for(request, index, endpoints)
+        ok = send(port, endpoint, request['query'], timeout)
+        with lock:
+            samples.append((endpoint, time.perf_counter() - scheduled, ok))
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        for index, offset in enumerate(arrivals):
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, index, start + offset)
+    return samples, time.perf_counter() - start
+
+def poisson_arrivals(rate, count, seed=0):
+    """Arrival offsets of a Poisson process with `rate` requests per second"""
+    return np.cumsum(np.random.default_rng(seed).exponential(1.0 / rate, size=count)).tolist()
+
+def recorded_arrivals(requests, count, speedup):
+    """Arrival offsets taken from the recorded timestamps, compressed by `speedup`"""
+    timestamps = [r['timestamp'] for r in requests[:count]]
+    if len(timestamps) < count or None in timestamps:
+        raise ValueError("Recorded mode needs a timestamp for every replayed request")
+    return [(t - timestamps[0]) / speedup for t in timestamps]
+
+def summarize(samples, elapsed):
+    """
+    Summarize one load level
+    
+    Returns:
+        dict: Counts, error rate, throughput and latency per endpoint and overall
+    """
+    def summary(subset):
+        errors = sum(1 for _, _, ok in subset if not ok)
+        return {
+            'requests': len(subset),
+            'errors': errors,
+            'error_rate': errors / len(subset) if subset else 0.0,
+            'throughput_per_s': (len(subset) - errors) / elapsed if elapsed else 0.0,
+            'latency_ms': latency_summary([seconds for _, seconds, _ in subset])
+        }
+    
+    result = summary(samples)
+    result['seconds'] = elapsed
+    result['endpoints'] = {
+        endpoint: summary([s for s in samples if s[0] == endpoint])
+        for endpoint in sorted({s[0] for s in samples})
+    }
+    return result
+
+def main():
+    """
+    Replay the requests for every worker count and load level
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--serve', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--source', default='sqlite:///data/processed/skillmentor.db',
+                        help='Event store URL or JSONL file of recorded requests')
+    parser.add_argument('--server', default='gunicorn', choices=['gunicorn', 'werkzeug'])
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help='Worker counts to test')
+    parser.add_argument('--mode', default='closed', choices=['closed', 'poisson', 'recorded'])
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 4, 16, 64],
+                        help='Closed-loop client counts')
+    parser.add_argument('--rates', nargs='+', type=float, default=[50, 100, 200, 400],
+                        help='Poisson arrival rates (requests per second)')
+    parser.add_argument('--speedup', nargs='+', type=float, default=[1.0],
+                        help='Recorded mode: divide the recorded gaps by these factors')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per load level')
+    parser.add_argument('--endpoints', nargs='+', default=list(ENDPOINTS), choices=list(ENDPOINTS))
+    parser.add_argument('--max-inflight', type=int, default=256, help='Open-loop cap on concurrent requests')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='Highest error rate at which a level counts towards saturation throughput')
+    parser.add_argument('--output', default=None, help='JSON results file (default: stdout)')
+    args = parser.parse_args()
+    
+    if args.serve is not None:
+        serve_werkzeug(args.serve)
+        return 0
+    
+    requests = []
+    try:
+        requests = load_requests(args.source)
+    except Exception as e:
+        logging.warning(f"Could not read recorded requests from {args.source}: {str(e)}")
+    if not requests:
+        if args.mode == 'recorded':
+            logging.error("Recorded mode needs recorded requests")
+            return 1
+        logging.warning("No recorded requests found; replaying synthetic queries")
+        requests = [{'query': q, 'timestamp': None, 'endpoint': None} for q in synthetic_queries(args.requests)]
+    logging.info(f"Replaying {len(requests)} distinct requests")
+    
+    if args.server == 'werkzeug' and args.workers != [1]:
+        logging.warning("Werkzeug runs a single process; use gunicorn to compare worker counts")
+        args.workers = [1]
+    
+    levels = {'closed': args.concurrency, 'poisson': args.rates, 'recorded': args.speedup}[args.mode]
+    runs = []
+    for workers in args.workers:
+        port = free_port()
+        process = start_server(args.server, workers, port)
+        try:
+            for level in levels:
+                if args.mode == 'closed':
+                    samples, elapsed = run_closed_loop(
+                        port, requests, args.requests, level, args.endpoints, args.timeout
+                    )
+                else:
+                    if args.mode == 'poisson':
+                        arrivals = poisson_arrivals(level, args.requests)
+                    else:
+                        arrivals = recorded_arrivals(requests, min(args.requests, len(requests)), level)
+                    samples, elapsed = run_open_loop(
+                        port, requests, arrivals, args.endpoints, args.timeout, args.max_inflight
+                    )
+                result = dict(summarize(samples, elapsed), workers=workers, mode=args.mode, level=level)
+                runs.append(result)
+                logging.info(
+                    f"workers={workers} {args.mode}={level}: {result['throughput_per_s']:.1f} req/s, "
+                    f"p50 {result['latency_ms']['p50']:.1f} ms, p99 {result['latency_ms']['p99']:.1f} ms, "
+                    f"errors {result['error_rate']:.1%}"
+                )
+        finally:
+            stop_server(process)
+    
+    saturation = {}
+    for workers in args.workers:
+        healthy = [r['throughput_per_s'] for r in runs
+                   if r['workers'] == workers and r['error_rate'] <= args.max_error_rate]
+        saturation[workers] = max(healthy) if healthy else 0.0
+        logging.info(f"Saturation throughput with {workers} worker(s): {saturation[workers]:.1f} req/s")
+    
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'source': args.source,
+            'server': args.server,
+            'mode': args.mode,
+            'requests_per_level': args.requests,
+            'endpoints': args.endpoints
+        },
+        'runs': runs,
+        'saturation_throughput_per_s': saturation
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+Run the SkillMentor benchmarks and write the results as JSON
+
+Every benchmark runs in its own process, so the reported peak memory
+belongs to that benchmark alone. Encoders and the LLM are offline stubs.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import subprocess
+import multiprocessing
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Configure logging (before the application modules configure it at INFO)
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+from benchmarks.harness import measure, peak_rss_mb, compare
+from benchmarks.suite import BENCHMARKS
+
+def run_case(name, size, options, results):
+    """
+    Set up and time one benchmark (runs in a child process)
+    
+    Args:
+        name (str): Benchmark name
+        size (int): Corpus size, or None
+        options (dict): Run options
+        results: Queue receiving the result dict
+    """
+    result = {'name': name, 'corpus_size': size}
+    try:
+        setup, _ = BENCHMARKS[name]
+        start = time.perf_counter()
+        func, inputs = setup(size, options)
+        result['setup_s'] = time.perf_counter() - start
+        result.update(measure(func, inputs, iterations=options['iterations'], warmup=options['warmup']))
+        result['status'] = 'ok'
+    except ImportError as e:
+        result.update(status='skipped', reason=str(e))
+    except Exception as e:
+        result.update(status='error', reason=f"{type(e).__name__}: {e}")
+    result['peak_rss_mb'] = peak_rss_mb()
+    results.put(result)
+
+def run_isolated(name, size, options):
+    """
+    Run one benchmark in a fresh process
+    
+    Returns:
+        dict: The benchmark result
+    """
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=run_case, args=(name, size, options, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def git_commit():
+    """Commit of the working tree, if it is a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def main():
+    """
+    Run the selected benchmarks and report them
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--benchmarks', nargs='+', default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000],
+                        help='Synthetic corpus sizes (up to 1000000)')
+    parser.add_argument('--iterations', type=int, default=200, help='Measured calls per benchmark')
+    parser.add_argument('--warmup', type=int, default=10, help='Unmeasured calls per benchmark')
+    parser.add_argument('--queries', type=int, default=500, help='Distinct synthetic queries')
+    parser.add_argument('--dimension', type=int, default=384, help='Stub encoder dimension')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='Seconds the stub LLM sleeps per call')
+    parser.add_argument('--output', default=None, help='JSON results file (default: stdout)')
+    parser.add_argument('--baseline', default=None, help='Previous results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Tolerated relative regression')
+    args = parser.parse_args()
+    
+    options = {
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'queries': args.queries,
+        'dimension': args.dimension,
+        'llm_latency': args.llm_latency
+    }
+    
+    results = []
+    for name in args.benchmarks:
+        _, sized = BENCHMARKS[name]
+        for size in (args.sizes if sized else [None]):
+            result = run_isolated(name, size, options)
+            results.append(result)
+            if result['status'] == 'ok':
+                logging.warning(
+                    f"{name} (size {size}): {result['throughput_per_s']:.1f}/s, "
+                    f"p50 {result['latency_ms']['p50']:.3f} ms, p99 {result['latency_ms']['p99']:.3f} ms, "
+                    f"peak {result['peak_rss_mb']:.0f} MB"
+                )
+            else:
+                logging.warning(f"{name} (size {size}): {result['status']}: {result['reason']}")
+    
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'options': options
+        },
+        'results': results
+    }
+    
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare(results, baseline['results'], threshold=args.threshold)
+        for regression in report['regressions']:
+            logging.warning(
+                f"Regression: {regression['name']} (size {regression['corpus_size']}) "
+                f"{regression['metric']} worse by {regression['change']:.0%}"
+            )
+        exit_code = 1 if report['regressions'] else 0
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Offline stand-ins for the models and synthetic data for the benchmarks
+
+Nothing here downloads a model: the encoder hashes words into a fixed
+random table and the LLM returns canned advice, both deterministically.
+"""
+import re
+import time
+import zlib
+import numpy as np
+from skillmentor.rag.encoders import Encoder, ENCODERS, register_encoder
+
+# Registry name of the hashing encoder
+STUB_ENCODER = 'bench-hash'
+
+WORD_PATTERN = re.compile(r'\w+')
+
+CATEGORIES = [
+    'Pricing Strategies',
+    'Marketing Strategies',
+    'Sustainability Strategies',
+    'Production Efficiency',
+    'Financial Management',
+    'Customer Service',
+    'Digital Transformation',
+    'Growth Strategies'
+]
+
+VOCABULARY = (
+    "price pricing cost margin discount value premium tier bundle revenue profit market marketing "
+    "customer brand social media online shop store email loyalty referral campaign audience local "
+    "community sustainable green waste recycle energy packaging material supplier organic reuse "
+    "production workshop process quality efficiency batch inventory tool equipment schedule craft "
+    "cash flow savings loan budget credit record expense income season tax account payment mobile "
+    "digital website order delivery service feedback complaint repeat trust staff training growth "
+    "expand franchise partner export wholesale capacity demand product design skill handmade "
+    "furniture bakery textile farm vegetables tailoring pottery catering jewelry soap"
+).split()
+
+QUERY_TEMPLATES = [
+    "How should I price my {0} {1}?",
+    "What are effective {0} strategies for a small {1} business?",
+    "How can I reduce {0} costs in my {1} workshop?",
+    "What sustainable {0} practices suit my {1} business?",
+    "How do I manage {0} during the slow {1} season?",
+    "How can I find more {0} customers for my {1}?"
+]
+
+class HashEncoderModel:
+    """
+    Bag-of-words encoder: every word maps to a fixed random vector
+    (chosen by CRC32 of the word) and a text is the normalized sum
+    """
+    
+    def __init__(self, dimension=384, buckets=1 << 14, seed=0):
+        """
+        Initialize the encoder
+        
+        Args:
+            dimension (int): Embedding dimension
+            buckets (int): Rows of the word vector table
+            seed (int): Seed of the word vector table
+        """
+        self.table = np.random.default_rng(seed).standard_normal((buckets, dimension)).astype(np.float32)
+        self.buckets = buckets
+        self._word_ids = {}
+    
+    def _ids(self, text):
+        """Table rows of the words of a text"""
+        ids = []
+        for word in WORD_PATTERN.findall(text.lower()):
+            word_id = self._word_ids.get(word)
+            if word_id is None:
+                word_id = self._word_ids[word] = zlib.crc32(word.encode('utf-8')) % self.buckets
+            ids.append(word_id)
+        return ids
+    
+    def encode(self, texts, batch_size=32):
+        """
+        Encode texts
+        
+        Args:
+            texts (list): Texts to encode
+            batch_size (int): Unused, for compatibility with SentenceTransformer
+            
+        Returns:
+            numpy.ndarray: float32 embeddings
+        """
+        embeddings = np.zeros((len(texts), self.table.shape[1]), dtype=np.float32)
+        for row, text in enumerate(texts):
+            ids = self._ids(text)
+            if ids:
+                embeddings[row] = self.table[ids].sum(axis=0)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+def stub_encoder(dimension=384):
+    """
+    Encoder backed by HashEncoderModel, registered as STUB_ENCODER
+    
+    Args:
+        dimension (int): Embedding dimension
+        
+    Returns:
+        Encoder: The encoder
+    """
+    if ENCODERS.get(STUB_ENCODER, {}).get('dimension') != dimension:
+        register_encoder(STUB_ENCODER, f'stub/hash-{dimension}', dimension)
+    return Encoder(STUB_ENCODER, model=HashEncoderModel(dimension))
+
+class StubLLM:
+    """
+    Deterministic stand-in for the LLM: returns the prompt followed by
+    canned advice chosen from a hash of the prompt, like a text
+    generation pipeline that echoes its input
+    """
+    
+    def __init__(self, latency=0.0):
+        """
+        Initialize the stub
+        
+        Args:
+            latency (float): Seconds to sleep per call, to mimic generation time
+        """
+        self.latency = latency
+        self.calls = 0
+    
+    def __call__(self, prompt):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        digest = zlib.crc32(prompt.encode('utf-8'))
+        focus = VOCABULARY[digest % len(VOCABULARY)]
+        other = VOCABULARY[(digest >> 8) % len(VOCABULARY)]
+        return (f"{prompt} Start with your {focus}: write down what it costs you today, "
+                f"then test one change to your {other} for a month and compare the results.")
+
+def synthetic_corpus(size, seed=0, words_per_document=40):
+    """
+    Generate documents with 'Category:' headers
+    
+    Args:
+        size (int): Number of documents
+        seed (int): Random seed
+        words_per_document (int): Words in each document body
+        
+    Returns:
+        list: Document strings
+    """
+    rng = np.random.default_rng(seed)
+    documents = []
+    for start in range(0, size, 10000):
+        count = min(10000, size - start)
+        categories = rng.integers(len(CATEGORIES), size=count)
+        words = rng.integers(len(VOCABULARY), size=(count, words_per_document), dtype=np.int32)
+        for category, row in zip(categories, words):
+            body = ' '.join(VOCABULARY[i] for i in row)
+            documents.append(f"Category: {CATEGORIES[category]}\n\n{body.capitalize()}.")
+    return documents
+
+def synthetic_queries(count, seed=1):
+    """
+    Generate user queries from templates
+    
+    Args:
+        count (int): Number of queries
+        seed (int): Random seed
+        
+    Returns:
+        list: Query strings
+    """
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(count):
+        template = QUERY_TEMPLATES[rng.integers(len(QUERY_TEMPLATES))]
+        first, second = rng.integers(len(VOCABULARY), size=2)
+        queries.append(template.format(VOCABULARY[first], VOCABULARY[second]))
+    return queries
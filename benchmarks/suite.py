@@ -0,0 +1,101 @@
+"""
+Benchmarks of the SkillMentor components
+
+Each benchmark is a setup function taking the corpus size (None for
+benchmarks that do not depend on it) and the run options, and returning
+the function to time with its argument tuples. Imports happen inside the
+setup functions so a benchmark whose dependencies are missing can be
+skipped on its own.
+"""
+import os
+from benchmarks.stubs import CATEGORIES, StubLLM, stub_encoder, synthetic_corpus, synthetic_queries
+
+def setup_retrieve(size, options, category=False, cache_size=0):
+    """DocumentRetriever.retrieve over a synthetic corpus"""
+    from skillmentor.rag.retriever import DocumentRetriever
+    
+    retriever = DocumentRetriever(encoder=stub_encoder(options['dimension']), cache_size=cache_size)
+    if not retriever.create_index(synthetic_corpus(size)):
+        raise RuntimeError("Index creation failed")
+    
+    queries = synthetic_queries(options['queries'])
+    categories = [CATEGORIES[i % len(CATEGORIES)] if category else None for i in range(len(queries))]
+    return retriever.retrieve, [(query, 3, cat) for query, cat in zip(queries, categories)]
+
+def setup_retrieve_category(size, options):
+    """DocumentRetriever.retrieve restricted to a category"""
+    return setup_retrieve(size, options, category=True)
+
+def setup_retrieve_cached(size, options):
+    """DocumentRetriever.retrieve with the result cache and a small set of popular queries"""
+    func, inputs = setup_retrieve(size, options, cache_size=1024)
+    return func, inputs[:32]
+
+def setup_process_query(size, options):
+    """SkillMentor.process_query end to end with the stub encoder and LLM"""
+    from skillmentor.core import SkillMentor
+    
+    app = SkillMentor(
+        translation_cache_path=None,
+        translation_backend='fake',
+        encoder=stub_encoder(options['dimension']),
+        llm=StubLLM(latency=options['llm_latency'])
+    )
+    if not app.initialize_dataset(synthetic_corpus(size)):
+        raise RuntimeError("Index creation failed")
+    return app.process_query, [(query, 'en') for query in synthetic_queries(options['queries'])]
+
+def setup_generate_advice(size, options):
+    """AdviceGenerator.generate_advice with the stub LLM"""
+    from skillmentor.rag.generator import AdviceGenerator
+    
+    generator = AdviceGenerator(llm=StubLLM(latency=options['llm_latency']))
+    context = synthetic_corpus(3)
+    return generator.generate_advice, [(query, context) for query in synthetic_queries(options['queries'])]
+
+def setup_dashboard(size, options):
+    """Dashboard.generate_full_dashboard"""
+    from skillmentor.viz.dashboard import Dashboard
+    
+    return Dashboard().generate_full_dashboard, [()]
+
+def _simple_app_client():
+    """Flask test client of simple_app, with requests kept out of the persistent store"""
+    os.environ.setdefault('SKILLMENTOR_STORE_URL', 'memory://')
+    import simple_app
+    
+    return simple_app.app.test_client()
+
+def setup_simple_app_api(size, options):
+    """POST /api/advice through the Flask test client"""
+    client = _simple_app_client()
+    
+    def call(query):
+        response = client.post('/api/advice', json={'query': query})
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/advice returned {response.status_code}")
+    
+    return call, [(query,) for query in synthetic_queries(options['queries'])]
+
+def setup_simple_app_query(size, options):
+    """POST /query (HTML result page) through the Flask test client"""
+    client = _simple_app_client()
+    
+    def call(query):
+        response = client.post('/query', data={'query': query})
+        if response.status_code != 200:
+            raise RuntimeError(f"/query returned {response.status_code}")
+    
+    return call, [(query,) for query in synthetic_queries(options['queries'])]
+
+# Benchmark name -> (setup function, whether it runs once per corpus size)
+BENCHMARKS = {
+    'retrieve': (setup_retrieve, True),
+    'retrieve_category': (setup_retrieve_category, True),
+    'retrieve_cached': (setup_retrieve_cached, True),
+    'process_query': (setup_process_query, True),
+    'generate_advice': (setup_generate_advice, False),
+    'dashboard': (setup_dashboard, False),
+    'simple_app_api': (setup_simple_app_api, False),
+    'simple_app_query': (setup_simple_app_query, False)
+}
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Benchmark encoder choices for document retrieval: encode latency,
+category recall and (for reduced variants) agreement with the full-size
+embeddings
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+import faiss
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.encoders import Encoder, ENCODERS
+from simple_create_index import load_raw_documents
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# Evaluation queries and the document category that should answer them
+LABELED_QUERIES = [
+    ("How should I price my handmade wooden furniture?", "Pricing Strategies"),
+    ("Should I give discounts during the slow season?", "Pricing Strategies"),
+    ("What is a fair profit margin for my crafts?", "Pricing Strategies"),
+    ("What are effective marketing strategies for a small bakery?", "Marketing Strategies"),
+    ("How can I promote my shop on social media?", "Marketing Strategies"),
+    ("How can I reduce waste and use eco-friendly materials?", "Sustainability Strategies"),
+    ("Which green practices lower my energy costs?", "Sustainability Strategies"),
+    ("How can I make my workshop more efficient?", "Production Efficiency"),
+    ("How do I produce more items without hiring more people?", "Production Efficiency"),
+    ("How do I manage cash flow during the slow season?", "Financial Management"),
+    ("Should I keep business and personal money separate?", "Financial Management"),
+    ("How do I handle an unhappy customer?", "Customer Service"),
+    ("How can I get repeat customers?", "Customer Service"),
+    ("Should I accept mobile payments?", "Digital Transformation"),
+    ("How can I use WhatsApp to take orders?", "Digital Transformation"),
+    ("How do I expand my business to a new town?", "Growth Strategies")
+]
+
+def document_category(document):
+    """Category header of a document"""
+    first_line = document.split('\n', 1)[0]
+    return first_line.replace('Category:', '').strip()
+
+def evaluate(encoder, documents, k, reference=None):
+    """
+    Build an index with an encoder and measure latency and recall
+    
+    Args:
+        encoder (Encoder): Encoder under test
+        documents (list): Documents to index
+        k (int): Number of documents retrieved per query
+        reference (numpy.ndarray): Top-k ids from the full-size encoder, for
+                                   measuring neighbour agreement
+                                   
+    Returns:
+        tuple: (result dict, top-k ids)
+    """
+    start = time.perf_counter()
+    embeddings = encoder.fit_encode(documents)
+    build_seconds = time.perf_counter() - start
+    
+    index = faiss.IndexFlatL2(embeddings.shape[1])
+    index.add(embeddings)
+    
+    # Encode queries one at a time, as the application does
+    latencies = []
+    query_embeddings = []
+    for query, _ in LABELED_QUERIES:
+        start = time.perf_counter()
+        query_embeddings.append(encoder.encode([query])[0])
+        latencies.append(time.perf_counter() - start)
+    _, ids = index.search(np.vstack(query_embeddings), k)
+    
+    categories = [document_category(doc) for doc in documents]
+    relevant = 0
+    hits = 0
+    for (_, expected), row in zip(LABELED_QUERIES, ids):
+        matches = [categories[i] == expected for i in row]
+        relevant += sum(matches)
+        hits += matches[0]
+    
+    result = {
+        'dimension': encoder.dimension,
+        'build_ms': build_seconds * 1000,
+        'encode_p50_ms': float(np.percentile(latencies, 50)) * 1000,
+        'precision_at_k': relevant / (len(LABELED_QUERIES) * k),
+        'hit_at_1': hits / len(LABELED_QUERIES),
+        'agreement': None
+    }
+    if reference is not None:
+        overlap = sum(len(set(row) & set(ref)) for row, ref in zip(ids, reference))
+        result['agreement'] = overlap / reference.size
+    return result, ids
+
+def main():
+    """
+    Run the benchmark for every requested encoder and reduction
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', default='data/raw/sample_strategies.txt', help='Raw strategies file')
+    parser.add_argument('--encoders', nargs='+', default=['minilm', 'all-minilm', 'bge-small'], choices=sorted(ENCODERS))
+    parser.add_argument('--truncate', nargs='*', type=int, default=[128, 256], help='Truncation sizes to try')
+    parser.add_argument('--pca', nargs='*', type=int, default=[32], help='PCA sizes to try')
+    parser.add_argument('-k', type=int, default=3, help='Documents retrieved per query')
+    args = parser.parse_args()
+    
+    documents = load_raw_documents(args.documents)
+    if not documents:
+        logging.error(f"No documents loaded from {args.documents}")
+        return 1
+    
+    print(f"{'variant':<24} {'dim':>5} {'build ms':>9} {'query p50 ms':>13} {'P@k':>6} {'hit@1':>6} {'agree':>6}")
+    for name in args.encoders:
+        full = Encoder(name)
+        variants = [(name, full)]
+        variants += [(f"{name}/trunc{d}", Encoder(name, truncate_dim=d, model=full.model))
+                     for d in args.truncate if d < full.base_dimension]
+        variants += [(f"{name}/pca{d}", Encoder(name, pca_dim=d, model=full.model))
+                     for d in args.pca if d < min(full.base_dimension, len(documents))]
+        
+        reference = None
+        for label, encoder in variants:
+            result, ids = evaluate(encoder, documents, args.k, reference)
+            if reference is None:
+                reference = ids
+            agreement = '-' if result['agreement'] is None else f"{result['agreement']:.2f}"
+            print(f"{label:<24} {result['dimension']:>5} {result['build_ms']:>9.1f} {result['encode_p50_ms']:>13.2f} "
+                  f"{result['precision_at_k']:>6.2f} {result['hit_at_1']:>6.2f} {agreement:>6}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
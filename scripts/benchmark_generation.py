@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Compare the fixed-length generation setup with per-category budgets
+
+For sample queries of every category, the same model generates advice
+twice: the old way (max_length=512, full text returned and split at
+"YOUR ADVICE:") and with the category's max_new_tokens budget, stop
+sequences and only new tokens returned. Reports new tokens and latency
+per category and the time saved.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.generator import AdviceGenerator, GENERATION_BUDGETS, LEGACY_MAX_LENGTH, format_prompt
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+SAMPLE_QUERIES = {
+    'Pricing': [
+        "How should I price my handmade wooden chairs?",
+        "What price should I charge for home-baked bread at the market?"
+    ],
+    'Marketing': [
+        "How can I find more customers for my tailoring shop?",
+        "What is a cheap way to market my pottery online?"
+    ],
+    'Sustainability': [
+        "How can I reduce packaging waste in my soap business?",
+        "Which eco-friendly materials suit a small furniture workshop?"
+    ],
+    'Production': [
+        "How do I produce more baskets each week without hiring?",
+        "How can I make my jewelry production more consistent?"
+    ],
+    'General': [
+        "I want to start a small business in my village. Where do I begin?",
+        "How do I keep my business running during the rainy season?"
+    ]
+}
+
+SAMPLE_CONTEXT = [
+    "Calculate your base price using (Material Cost + Labor Cost) x (1 + Profit Margin).",
+    "Participate in local markets where your target customers gather.",
+    "Source materials locally to reduce costs and your carbon footprint."
+]
+
+def legacy_generate(generator, prompt):
+    """
+    Generate the way the LangChain pipeline used to: up to max_length tokens in total,
+    then split the decoded prompt and answer
+    
+    Returns:
+        tuple: (advice, new tokens, seconds)
+    """
+    backend = generator.backend
+    start = time.perf_counter()
+    inputs = backend.tokenizer(prompt, return_tensors='pt').to(backend.model.device)
+    output = backend.model.generate(**inputs, max_length=LEGACY_MAX_LENGTH, **backend.generation_kwargs)
+    text = backend.tokenizer.decode(output[0], skip_special_tokens=True)
+    seconds = time.perf_counter() - start
+    new_tokens = output.shape[1] - inputs['input_ids'].shape[1]
+    advice = text.split("YOUR ADVICE:")[1].strip() if "YOUR ADVICE:" in text else text
+    return advice, new_tokens, seconds
+
+def main():
+    """
+    Run both setups on the sample queries and report per category
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='meta-llama/Llama-2-7b-chat-hf', help='HF model name or local path')
+    parser.add_argument('--device', default='cpu', help='Device to run the model on')
+    parser.add_argument('--output', default=None, help='JSON results file')
+    args = parser.parse_args()
+    
+    generator = AdviceGenerator(model_name=args.model, device=args.device)
+    if generator.backend is None:
+        logging.error(f"Could not load {args.model}")
+        return 1
+    
+    results = {}
+    for category, queries in SAMPLE_QUERIES.items():
+        legacy_tokens = legacy_seconds = 0
+        for query in queries:
+            prompt = format_prompt(query, "\n".join(SAMPLE_CONTEXT))
+            _, tokens, seconds = legacy_generate(generator, prompt)
+            legacy_tokens += tokens
+            legacy_seconds += seconds
+            generator.generate_advice(query, SAMPLE_CONTEXT, category=category)
+        
+        budgeted = generator.generation_report()[category]
+        results[category] = {
+            'budget': GENERATION_BUDGETS[category],
+            'legacy_new_tokens': legacy_tokens / len(queries),
+            'legacy_seconds': legacy_seconds / len(queries),
+            'new_tokens': budgeted['mean_new_tokens'],
+            'seconds': budgeted['mean_seconds'],
+            'stopped_early': budgeted['stopped_early'],
+            'seconds_saved': legacy_seconds / len(queries) - budgeted['mean_seconds']
+        }
+        logging.info(
+            f"{category}: {results[category]['legacy_new_tokens']:.0f} -> {results[category]['new_tokens']:.0f} "
+            f"new tokens, {results[category]['legacy_seconds']:.2f}s -> {results[category]['seconds']:.2f}s"
+        )
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Measure per-worker memory and first-query latency of loading the FAISS
+index normally versus memory-mapped, with several worker processes
+holding the index at once (as gunicorn workers do). Linux only: memory
+is read from /proc.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import multiprocessing
+import numpy as np
+import faiss
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.mmap_index import MmapFlatIndex, read_index, save_vectors, vectors_path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def memory_kb():
+    """
+    Memory of the current process
+    
+    Returns:
+        dict: rss, anon (private), file (mapped files) and pss in kB
+    """
+    usage = {}
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                usage[{'VmRSS': 'rss', 'RssAnon': 'anon', 'RssFile': 'file'}[key]] = int(value.split()[0])
+    with open('/proc/self/smaps_rollup', 'r') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                usage['pss'] = int(line.split()[1])
+    return usage
+
+def worker(index_path, mode, query, barrier, results, done):
+    """
+    Load the index, run one query and report memory once every worker is loaded
+    """
+    baseline = memory_kb()
+    start = time.perf_counter()
+    if mode == 'npy':
+        index = MmapFlatIndex(vectors_path(index_path))
+    else:
+        index = read_index(index_path, mmap=(mode == 'mmap'))
+    load_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    index.search(query, 3)
+    first_query_ms = (time.perf_counter() - start) * 1000
+    
+    # Measure while all workers hold the index, so shared pages are split in PSS
+    barrier.wait()
+    usage = memory_kb()
+    results.put({
+        'load_ms': load_ms,
+        'first_query_ms': first_query_ms,
+        **{key: usage[key] - baseline.get(key, 0) for key in usage}
+    })
+    done.wait()
+
+def measure(index_path, mode, workers, query):
+    """
+    Run the workers for one loading mode
+    
+    Returns:
+        list: One result dict per worker
+    """
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    done = context.Event()
+    processes = [
+        context.Process(target=worker, args=(index_path, mode, query, barrier, results, done))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    done.set()
+    for process in processes:
+        process.join()
+    return collected
+
+def main():
+    """
+    Compare loading modes
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--index', default=None, help='Existing index (default: build a synthetic one)')
+    parser.add_argument('--vectors', type=int, default=200000, help='Vectors in the synthetic index')
+    parser.add_argument('--dim', type=int, default=384, help='Dimension of the synthetic index')
+    parser.add_argument('--workers', type=int, default=3, help='Worker processes')
+    parser.add_argument('--modes', nargs='+', default=['copy', 'mmap', 'npy'], choices=['copy', 'mmap', 'npy'],
+                        help='copy: faiss.read_index; mmap: read_index(mmap=True); npy: MmapFlatIndex')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = args.index
+        if not index_path:
+            index_path = os.path.join(tmp, 'index.faiss')
+            rng = np.random.default_rng(0)
+            index = faiss.IndexFlatL2(args.dim)
+            index.add(rng.standard_normal((args.vectors, args.dim)).astype(np.float32))
+            faiss.write_index(index, index_path)
+            save_vectors(index, index_path)
+            del index
+        dimension = faiss.read_index(index_path).d
+        query = np.random.default_rng(1).standard_normal((1, dimension)).astype(np.float32)
+        logging.info(f"Index {index_path}: {os.path.getsize(index_path) / 2**20:.1f} MB, {args.workers} workers")
+        
+        print(f"{'mode':<6} {'load ms':>9} {'1st query ms':>13} {'RSS MB':>8} {'private MB':>11} {'shared MB':>10} {'PSS MB':>8}")
+        for mode in args.modes:
+            if mode == 'npy' and not os.path.exists(vectors_path(index_path)):
+                logging.warning(f"Skipping npy: {vectors_path(index_path)} not found")
+                continue
+            results = measure(index_path, mode, args.workers, query)
+            
+            def mean(key):
+                return sum(r[key] for r in results) / len(results)
+            
+            print(f"{mode:<6} {mean('load_ms'):>9.1f} {mean('first_query_ms'):>13.1f} {mean('rss') / 1024:>8.1f} "
+                  f"{mean('anon') / 1024:>11.1f} {mean('file') / 1024:>10.1f} {mean('pss') / 1024:>8.1f}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
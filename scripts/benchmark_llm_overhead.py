@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Measure what the LangChain wrapper cost around advice generation
+
+Reports, before (LangChain PromptTemplate + HuggingFacePipeline over a
+transformers pipeline) and after (precompiled prompt + direct backend):
+- import time of the generation module's dependencies, each in a fresh
+  interpreter
+- time to format one prompt
+- per-call overhead, as the latency of generating a single new token
+
+Parts that need LangChain are skipped when it is not installed; the
+pipeline path then runs without the HuggingFacePipeline wrapper.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import subprocess
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.generator import AdviceGenerator, PROMPT_TEMPLATE, format_prompt
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# Imports the generator module made before, and makes now
+LEGACY_IMPORTS = "import torch; from langchain import PromptTemplate; from langchain.llms import HuggingFacePipeline; from transformers import pipeline"
+DIRECT_IMPORTS = "import skillmentor.rag.generator"
+BACKEND_IMPORTS = "import skillmentor.rag.llm_backend"
+
+QUERY = "How should I price my handmade wooden chairs?"
+CONTEXT = "\n".join([
+    "Calculate your base price using (Material Cost + Labor Cost) x (1 + Profit Margin).",
+    "Participate in local markets where your target customers gather."
+])
+
+def has_langchain():
+    """Whether LangChain can be imported"""
+    try:
+        import langchain
+        return True
+    except ImportError:
+        return False
+
+def import_seconds(statement, repeats):
+    """
+    Median wall time of running an import statement in a fresh interpreter
+    
+    Args:
+        statement (str): Import statement(s)
+        repeats (int): Interpreters to start
+        
+    Returns:
+        float: Seconds, or None if the import failed
+    """
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    times = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+        if result.returncode != 0:
+            logging.error(f"'{statement}' failed: {result.stderr.strip().splitlines()[-1]}")
+            return None
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+def per_call_ms(func, repeats):
+    """Median milliseconds of calling func, after one warm-up call"""
+    func()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    """
+    Run the measurements and report before and after numbers
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default=None, help='HF model name or local path for per-call overhead (skipped if not given)')
+    parser.add_argument('--device', default='cpu', help='Device to run the model on')
+    parser.add_argument('--import-repeats', type=int, default=3, help='Fresh interpreters per import measurement')
+    parser.add_argument('--repeats', type=int, default=20, help='Calls per per-call measurement')
+    parser.add_argument('--output', default=None, help='JSON results file')
+    args = parser.parse_args()
+    
+    langchain = has_langchain()
+    results = {'import_seconds': {}, 'format_us': {}, 'call_ms': {}}
+    
+    # Import time
+    if langchain:
+        results['import_seconds']['before'] = import_seconds(LEGACY_IMPORTS, args.import_repeats)
+    results['import_seconds']['after'] = import_seconds(DIRECT_IMPORTS, args.import_repeats)
+    results['import_seconds']['after_with_model_backend'] = import_seconds(BACKEND_IMPORTS, args.import_repeats)
+    
+    # Prompt formatting
+    rounds = 10000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        format_prompt(QUERY, CONTEXT)
+    results['format_us']['after'] = (time.perf_counter() - start) / rounds * 1e6
+    if langchain:
+        from langchain import PromptTemplate
+        
+        prompt_template = PromptTemplate(input_variables=["query", "context"], template=PROMPT_TEMPLATE)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            prompt_template.format(query=QUERY, context=CONTEXT)
+        results['format_us']['before'] = (time.perf_counter() - start) / rounds * 1e6
+    
+    # Per-call overhead: one new token, so the model's own work is the same on both paths
+    generator = AdviceGenerator(model_name=args.model, device=args.device) if args.model else None
+    if generator is not None and generator.backend is not None:
+        from transformers import pipeline
+        
+        backend = generator.backend
+        prompt = format_prompt(QUERY, CONTEXT)
+        text_generation = pipeline(
+            "text-generation",
+            model=backend.model,
+            tokenizer=backend.tokenizer,
+            max_new_tokens=1,
+            return_full_text=False,
+            **backend.generation_kwargs
+        )
+        before = lambda: text_generation(prompt)
+        if langchain:
+            from langchain.llms import HuggingFacePipeline
+            
+            before = lambda wrapped=HuggingFacePipeline(pipeline=text_generation): wrapped(prompt)
+        results['call_ms']['before'] = per_call_ms(before, args.repeats)
+        results['call_ms']['after'] = per_call_ms(lambda: backend.generate(prompt, max_new_tokens=1), args.repeats)
+    elif args.model:
+        logging.error(f"Could not load {args.model}")
+        return 1
+    
+    for measure, values in results.items():
+        logging.info(f"{measure}: " + ", ".join(
+            f"{name} {value:.3f}" for name, value in values.items() if value is not None
+        ))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
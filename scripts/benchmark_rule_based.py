@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of the rule-based advice path in simple_app
+"""
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Keep benchmark requests out of the persistent store
+os.environ.setdefault('SKILLMENTOR_STORE_URL', 'memory://')
+
+import simple_app
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+SAMPLE_QUERIES = [
+    "How should I price my handmade wooden furniture?",
+    "What are effective marketing strategies for a small bakery?",
+    "How can I reduce production costs for my handcrafted products?",
+    "What sustainable practices can I implement in my textile business?",
+    "How do I sell more vegetables from my farm at the local market?",
+    "How can I improve the quality of my woven fabric?",
+    "What is the best way to find new customers for my catering service?",
+    "How do I manage cash flow during the slow season?"
+]
+
+
+def time_call(func, args, iterations):
+    """
+    Time repeated calls of a function
+
+    Args:
+        func (callable): Function to call
+        args (list): Argument tuples, cycled through
+        iterations (int): Number of calls
+
+    Returns:
+        float: Mean time per call in microseconds
+    """
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(*args[i % len(args)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    """
+    Run the microbenchmark and log per-call timings
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000, help='Calls per measured function')
+    args = parser.parse_args()
+
+    random.seed(0)
+    analyses = [simple_app.analyze_query(q) for q in SAMPLE_QUERIES]
+    advice = simple_app.storage['business_strategies']['general'][0]
+
+    results = {
+        'analyze_query': time_call(simple_app.analyze_query, [(q,) for q in SAMPLE_QUERIES], args.iterations),
+        'extract_keywords': time_call(simple_app.extract_keywords, [(q,) for q in SAMPLE_QUERIES], args.iterations),
+        'enhance_response': time_call(simple_app.enhance_response, [(advice, a) for a in analyses], args.iterations),
+        'retrieve_relevant_documents': time_call(
+            simple_app.retrieve_relevant_documents, [(a.text, 2, a.keywords) for a in analyses], args.iterations
+        ),
+        'generate_advice': time_call(simple_app.generate_advice, [(q,) for q in SAMPLE_QUERIES], args.iterations)
+    }
+
+    for name, micros in results.items():
+        logging.info(f"{name:<28} {micros:8.2f} us/call")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Benchmark speculative decoding with a draft model on the advice prompts
+
+Generates advice for the sample queries of every category greedily, with
+the main model alone and with the draft model proposing tokens. Checks
+that both give the same text and reports tokens/sec, speedup and the
+draft acceptance rate (share of proposed tokens the main model kept).
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.generator import GENERATION_BUDGETS, STOP_SEQUENCES, format_prompt
+from benchmark_generation import SAMPLE_QUERIES, SAMPLE_CONTEXT
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+class ForwardCounter:
+    """Counts forward passes of a model"""
+    
+    def __init__(self, model):
+        self.calls = 0
+        model.register_forward_hook(self._hook)
+    
+    def _hook(self, module, inputs, output):
+        self.calls += 1
+
+def run(backend, prompts, counters):
+    """
+    Generate advice for each (category, prompt) and collect the counts
+    
+    Returns:
+        dict: Texts, new tokens, seconds, main and draft forward passes
+    """
+    totals = {'texts': [], 'new_tokens': 0, 'seconds': 0.0, 'main_calls': 0, 'draft_calls': 0}
+    for category, prompt in prompts:
+        main_before = counters['main'].calls
+        draft_before = counters['draft'].calls
+        start = time.perf_counter()
+        generation = backend.generate(prompt, max_new_tokens=GENERATION_BUDGETS[category], stop_sequences=STOP_SEQUENCES)
+        totals['seconds'] += time.perf_counter() - start
+        totals['texts'].append(generation.text)
+        totals['new_tokens'] += generation.new_tokens
+        totals['main_calls'] += counters['main'].calls - main_before
+        totals['draft_calls'] += counters['draft'].calls - draft_before
+    return totals
+
+def main():
+    """
+    Run both decoding modes and report throughput and acceptance
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='meta-llama/Llama-2-7b-chat-hf', help='HF model name or local path')
+    parser.add_argument('--draft-model', required=True, help='Draft model with the same tokenizer')
+    parser.add_argument('--device', default='cpu', help='Device to run the models on')
+    parser.add_argument('--output', default=None, help='JSON results file')
+    args = parser.parse_args()
+    
+    from skillmentor.rag.llm_backend import TransformersBackend
+    
+    speculative = TransformersBackend.from_pretrained(args.model, device=args.device, draft_model_name=args.draft_model, do_sample=False)
+    if speculative.draft_model is None:
+        logging.error(f"Could not use {args.draft_model} as draft model")
+        return 1
+    plain = TransformersBackend(speculative.model, speculative.tokenizer, do_sample=False)
+    counters = {'main': ForwardCounter(speculative.model), 'draft': ForwardCounter(speculative.draft_model)}
+    
+    prompts = [
+        (category, format_prompt(query, "\n".join(SAMPLE_CONTEXT)))
+        for category, queries in SAMPLE_QUERIES.items()
+        for query in queries
+    ]
+    # Warm up both paths once
+    run(plain, prompts[:1], counters)
+    run(speculative, prompts[:1], counters)
+    
+    baseline = run(plain, prompts, counters)
+    assisted = run(speculative, prompts, counters)
+    
+    # Every main-model pass yields one token of its own; the rest are accepted draft tokens
+    accepted = assisted['new_tokens'] - assisted['main_calls']
+    results = {
+        'prompts': len(prompts),
+        'identical_outputs': sum(a == b for a, b in zip(baseline['texts'], assisted['texts'])),
+        'baseline_tokens_per_s': baseline['new_tokens'] / baseline['seconds'],
+        'speculative_tokens_per_s': assisted['new_tokens'] / assisted['seconds'],
+        'speedup': baseline['seconds'] / assisted['seconds'],
+        'main_passes_per_token': assisted['main_calls'] / max(1, assisted['new_tokens']),
+        'acceptance_rate': accepted / max(1, assisted['draft_calls'])
+    }
+    logging.info(
+        f"{results['baseline_tokens_per_s']:.1f} -> {results['speculative_tokens_per_s']:.1f} tokens/s "
+        f"({results['speedup']:.2f}x), acceptance rate {results['acceptance_rate']:.0%}, "
+        f"{results['identical_outputs']}/{results['prompts']} outputs identical"
+    )
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"Results written to {args.output}")
+    return 0 if results['identical_outputs'] == results['prompts'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Benchmark the shared regex tokenizer against nltk's word_tokenize
+on logged queries
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.nlp.tokenizer import tokenize, extract_keywords
+from skillmentor.nlp import processor
+from skillmentor.storage.store import create_event_store
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+DEFAULT_STORE_URL = 'sqlite:///' + os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'processed', 'skillmentor.db'
+)
+
+SAMPLE_QUERIES = [
+    "How should I price my handmade wooden furniture?",
+    "What are effective marketing strategies for a small bakery?",
+    "How can I reduce production costs for my handcrafted products?",
+    "What sustainable practices can I implement in my textile business?",
+    "How do I sell more vegetables from my farm at the local market?",
+    "I don't know if $5.00 is too cheap... what's a fair price?",
+    "What is the best way to find new customers for my catering service?",
+    "How do I manage cash flow during the slow season?"
+]
+
+def load_queries(url, limit):
+    """
+    Load logged queries from the event store
+    
+    Args:
+        url (str): Event store URL
+        limit (int): Maximum number of queries
+        
+    Returns:
+        list: Query strings (the sample queries if the log is empty)
+    """
+    try:
+        store = create_event_store(url)
+        queries = [record['query'] for record in store.log('advice_requests').read(limit=limit) if record.get('query')]
+        store.close()
+    except Exception as e:
+        logging.error(f"Error reading query log: {str(e)}")
+        queries = []
+    
+    if not queries:
+        logging.info("No logged queries found, using sample queries")
+        return list(SAMPLE_QUERIES)
+    return queries
+
+def time_per_query(func, queries, repeats):
+    """
+    Time a tokenizer over the queries
+    
+    Returns:
+        float: Mean time per query in microseconds
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (repeats * len(queries)) * 1e6
+
+def main():
+    """
+    Run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--store', default=os.environ.get('SKILLMENTOR_STORE_URL', DEFAULT_STORE_URL), help='Event store URL')
+    parser.add_argument('--limit', type=int, default=10000, help='Maximum logged queries to use')
+    parser.add_argument('--repeats', type=int, default=20, help='Passes over the queries')
+    args = parser.parse_args()
+    
+    # The text pipeline must not pull in nltk (and its data downloads)
+    if 'nltk' in sys.modules:
+        logging.error(f"{processor.__name__} imported nltk")
+        return 1
+    logging.info(f"{processor.__name__} imports without nltk")
+    
+    queries = load_queries(args.store, args.limit)
+    logging.info(f"Benchmarking {len(queries)} queries x {args.repeats} passes")
+    
+    logging.info(f"{'tokenize':<16} {time_per_query(tokenize, queries, args.repeats):8.2f} us/query")
+    logging.info(f"{'extract_keywords':<16} {time_per_query(extract_keywords, queries, args.repeats):8.2f} us/query")
+    
+    try:
+        from nltk.tokenize import word_tokenize
+    except ImportError:
+        logging.info("nltk not installed, skipping word_tokenize comparison")
+        return 0
+    
+    # Queries are single lines, so sentence splitting (and its punkt data) is skipped
+    nltk_tokenize = lambda query: word_tokenize(query.lower(), preserve_line=True)
+    logging.info(f"{'word_tokenize':<16} {time_per_query(nltk_tokenize, queries, args.repeats):8.2f} us/query")
+    
+    matches = sum(1 for query in queries if tokenize(query) == nltk_tokenize(query))
+    logging.info(f"Identical token lists: {matches}/{len(queries)} ({matches / len(queries):.1%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Benchmark translation throughput and fallback behaviour of TextProcessor
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.nlp.processor import TextProcessor
+from skillmentor.nlp.translation import TranslationCache
+from skillmentor.nlp.backends import create_translation_backend
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+SAMPLE_TEXTS = [
+    "How should I price my handmade wooden furniture?",
+    "What are effective marketing strategies for a small bakery?",
+    "How can I reduce production costs for my handcrafted products?",
+    "What sustainable practices can I implement in my textile business?",
+    "How do I sell more vegetables from my farm at the local market?",
+    "How can I improve the quality of my woven fabric?",
+    "What is the best way to find new customers for my catering service?",
+    "How do I manage cash flow during the slow season?"
+]
+
+def run(processor, texts, dest, src, repeats, batch_size, cached):
+    """
+    Translate the texts repeatedly and measure throughput
+    
+    Args:
+        processor (TextProcessor): Processor under test
+        texts (list): Texts to translate
+        dest (str): Target language code
+        src (str): Source language code
+        repeats (int): Passes over the texts
+        batch_size (int): Texts per translate_batch call (1 = one call per text)
+        cached (bool): Keep the translation cache between passes
+        
+    Returns:
+        dict: Elapsed seconds, texts per second and fallback rate
+    """
+    total = 0
+    fallbacks = 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        if not cached:
+            processor.cache.memory.clear()
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            results = processor.translate_batch(batch, dest=dest, src=src)
+            total += len(batch)
+            fallbacks += sum(1 for text, result in zip(batch, results) if text == result)
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed': elapsed,
+        'texts_per_second': total / elapsed if elapsed else 0.0,
+        'fallback_rate': fallbacks / total if total else 0.0
+    }
+
+def main():
+    """
+    Run the benchmark for each batch size, with and without the cache
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--backend', default='fake', help="Backend name ('fake', 'marian' or 'google')")
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated seconds per call (fake backend)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Simulated failure rate (fake backend)')
+    parser.add_argument('--timeout', type=float, default=None, help='Hard deadline per call in seconds')
+    parser.add_argument('--src', default='en', help='Source language code')
+    parser.add_argument('--dest', default='sw', help='Target language code')
+    parser.add_argument('--repeats', type=int, default=5, help='Passes over the sample texts')
+    args = parser.parse_args()
+    
+    backend_kwargs = {}
+    if args.backend == 'fake':
+        backend_kwargs = {'latency': args.latency, 'failure_rate': args.failure_rate}
+    backend = create_translation_backend(args.backend, timeout=args.timeout, **backend_kwargs)
+    
+    print(f"{'batch':>5} {'cache':>5} {'seconds':>9} {'texts/s':>10} {'fallback':>9}")
+    for batch_size in (1, len(SAMPLE_TEXTS)):
+        for cached in (False, True):
+            processor = TextProcessor(cache=TranslationCache(), backend=backend)
+            result = run(processor, SAMPLE_TEXTS, args.dest, args.src, args.repeats, batch_size, cached)
+            print(f"{batch_size:>5} {str(cached):>5} {result['elapsed']:>9.3f} "
+                  f"{result['texts_per_second']:>10.1f} {result['fallback_rate']:>9.1%}")
+    
+    backend.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Build a versioned index bundle from the raw strategies file and publish it
+"""
+import os
+import sys
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.encoders import Encoder, ENCODERS, DEFAULT_ENCODER
+from skillmentor.rag.retriever import DocumentRetriever
+from skillmentor.rag.index_store import prune_versions
+from simple_create_index import load_raw_documents
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """
+    Build, write and publish the bundle
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', default='data/raw/sample_strategies.txt', help='Raw strategies file')
+    parser.add_argument('--root', default='data/processed/bundles', help='Bundle root directory')
+    parser.add_argument('--encoder', default=DEFAULT_ENCODER, choices=sorted(ENCODERS), help='Registered encoder name')
+    parser.add_argument('--truncate-dim', type=int, default=None, help='Keep only the first N embedding dimensions')
+    parser.add_argument('--pca-dim', type=int, default=None, help='Project embeddings onto N principal components')
+    parser.add_argument('--no-publish', action='store_true', help='Write the version without making it current')
+    parser.add_argument('--keep', type=int, default=3, help='Number of versions to keep')
+    args = parser.parse_args()
+    
+    documents = load_raw_documents(args.documents)
+    if not documents:
+        logging.error(f"No documents loaded from {args.documents}")
+        return 1
+    
+    encoder = Encoder(args.encoder, truncate_dim=args.truncate_dim, pca_dim=args.pca_dim)
+    retriever = DocumentRetriever(encoder=encoder)
+    if not retriever.create_index(documents):
+        return 1
+    
+    params = {
+        'source': args.documents,
+        'index_type': 'IndexFlatL2',
+        'truncate_dim': args.truncate_dim,
+        'pca_dim': args.pca_dim
+    }
+    version = retriever.save_bundle(args.root, params=params, make_current=not args.no_publish)
+    if not version:
+        return 1
+    
+    prune_versions(args.root, keep=args.keep)
+    state = 'written' if args.no_publish else 'published'
+    logging.info(f"Index bundle {version} {state} in {args.root}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
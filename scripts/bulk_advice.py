@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""
+Generate advice for a file of queries and stream the results as JSONL
+
+Queries are read from a CSV file (one column holds the query), a JSONL
+file ({"query": ..., "id": ...} per line) or a text file (one query per
+line). Chunks of queries are spread over a pool of worker processes and
+written in input order as soon as they are done. The rule-based engine
+runs simple_app.generate_advice; the pipeline engine runs
+SkillMentor.process_batch, which retrieves documents for a whole chunk
+at once. Each pipeline worker loads its own model, so size --processes
+by memory.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# Engine of the current worker process, set by init_worker
+_engine = None
+
+def read_queries(path, column='query'):
+    """
+    Read queries from a CSV, JSONL or text file
+    
+    Args:
+        path (str): Input file
+        column (str): CSV column (or JSONL field) holding the query
+        
+    Returns:
+        list: (id, query) tuples; the id is the row's 'id' field when present
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if extension == '.csv':
+            rows = list(csv.DictReader(f))
+        elif extension in ('.jsonl', '.ndjson'):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = [{column: line.strip()} for line in f]
+    
+    queries = []
+    for number, row in enumerate(rows, 1):
+        query = (row.get(column) or '').strip()
+        if query:
+            queries.append((row.get('id', number), query))
+    return queries
+
+def init_worker(engine, options):
+    """
+    Set up the engine of a worker process
+    
+    Args:
+        engine (str): 'rule' or 'pipeline'
+        options (dict): Pipeline options (paths, model name, source language)
+    """
+    global _engine
+    if engine == 'rule':
+        # Keep bulk requests out of the persistent store unless asked otherwise
+        os.environ.setdefault('SKILLMENTOR_STORE_URL', 'memory://')
+        import simple_app
+        
+        def advise(queries):
+            return [simple_app.advice_response(query, simple_app.generate_advice(query)) for query in queries]
+    else:
+        from skillmentor.core import SkillMentor
+        
+        app = SkillMentor(
+            index_path=options['index_path'],
+            documents_path=options['documents_path'],
+            index_bundle_root=options['bundle_root'],
+            index_mmap=options['bundle_root'] is not None,
+            model_name=options['model_name']
+        )
+        
+        def advise(queries):
+            return app.process_batch(queries, source_lang=options['source_lang'])
+    _engine = advise
+
+def process_chunk(chunk):
+    """
+    Advise one chunk of queries in a worker
+    
+    A chunk that fails is retried query by query, so one bad query only
+    costs its own result.
+    
+    Args:
+        chunk (list): (id, query) tuples
+        
+    Returns:
+        list: Result dicts with the query id
+    """
+    try:
+        results = _engine([query for _, query in chunk])
+    except Exception as e:
+        logging.warning(f"Chunk failed ({str(e)}); retrying its queries one by one")
+        results = []
+        for _, query in chunk:
+            try:
+                results.append(_engine([query])[0])
+            except Exception as query_error:
+                results.append({'query': query, 'error': str(query_error)})
+    return [dict(result, ref=query_id) for (query_id, _), result in zip(chunk, results)]
+
+def main():
+    """
+    Advise every query in the input and report the throughput
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('input', help='CSV, JSONL or text file of queries')
+    parser.add_argument('--column', default='query', help='CSV column or JSONL field holding the query')
+    parser.add_argument('--output', default=None, help='JSONL output file (default: stdout)')
+    parser.add_argument('--engine', default='rule', choices=['rule', 'pipeline'])
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--chunk-size', type=int, default=64, help='Queries per worker task')
+    parser.add_argument('--index-path', default='data/processed/faiss_index.bin', help='Pipeline FAISS index')
+    parser.add_argument('--documents-path', default='data/processed/documents.txt', help='Pipeline documents')
+    parser.add_argument('--bundle-root', default=None, help='Pipeline index bundle root (memory-mapped)')
+    parser.add_argument('--model-name', default='meta-llama/Llama-2-7b-chat-hf', help='Pipeline LLM')
+    parser.add_argument('--source-lang', default='en', help="Language of the queries ('auto' to detect)")
+    args = parser.parse_args()
+    
+    queries = read_queries(args.input, column=args.column)
+    if not queries:
+        logging.error(f"No queries found in {args.input}")
+        return 1
+    
+    options = {
+        'index_path': args.index_path,
+        'documents_path': args.documents_path,
+        'bundle_root': args.bundle_root,
+        'model_name': args.model_name,
+        'source_lang': args.source_lang
+    }
+    chunks = [queries[i:i + args.chunk_size] for i in range(0, len(queries), args.chunk_size)]
+    processes = max(1, min(args.processes, len(chunks)))
+    logging.info(f"Advising {len(queries)} queries with the {args.engine} engine in {processes} process(es)")
+    
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    start_time = time.perf_counter()
+    done = errors = 0
+    pool = None
+    try:
+        if processes == 1:
+            init_worker(args.engine, options)
+            results = map(process_chunk, chunks)
+        else:
+            # Spawned workers do not inherit the parent's threads or open files
+            pool = multiprocessing.get_context('spawn').Pool(
+                processes, initializer=init_worker, initargs=(args.engine, options)
+            )
+            results = pool.imap(process_chunk, chunks)
+        
+        for chunk_results in results:
+            for result in chunk_results:
+                output.write(json.dumps(result) + '\n')
+            output.flush()
+            done += len(chunk_results)
+            errors += sum(1 for result in chunk_results if 'error' in result)
+            elapsed = time.perf_counter() - start_time
+            logging.info(f"{done}/{len(queries)} queries ({done / elapsed:.1f} queries/sec)")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if output is not sys.stdout:
+            output.close()
+    
+    elapsed = time.perf_counter() - start_time
+    logging.info(
+        f"Advised {done} queries in {elapsed:.2f} seconds ({done / elapsed:.1f} queries/sec, {errors} errors)"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Export an encoder to ONNX with int8 quantization, then check parity
+and latency against the PyTorch model
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.encoders import Encoder, ENCODERS, DEFAULT_ENCODER
+from skillmentor.rag.onnx_encoder import OnnxEncoderModel, export_onnx_encoder, cosine_similarities
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+PARITY_TEXTS = [
+    "How should I price my handmade wooden furniture?",
+    "What are effective marketing strategies for a small bakery?",
+    "How can I reduce production costs for my handcrafted products?",
+    "What sustainable practices can I implement in my textile business?",
+    "How do I manage cash flow during the slow season?",
+    "Category: Pricing Strategies\n\nConsider cost-plus pricing for products with stable input costs, "
+    "but value-based pricing for services where you provide unique expertise."
+]
+
+def per_query_ms(model, texts, repeats=20):
+    """
+    Median latency of encoding one query
+    
+    Returns:
+        float: Milliseconds per query
+    """
+    latencies = []
+    for _ in range(repeats):
+        for text in texts:
+            start = time.perf_counter()
+            model.encode([text])
+            latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies)) * 1000
+
+def main():
+    """
+    Export the encoder and report parity, latency and size
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--encoder', default=DEFAULT_ENCODER, choices=sorted(ENCODERS), help='Registered encoder name')
+    parser.add_argument('--output', default=None, help='Export directory (default: data/models/<encoder>-onnx)')
+    parser.add_argument('--no-quantize', action='store_true', help='Keep float32 weights')
+    parser.add_argument('--tolerance', type=float, default=0.99, help='Minimum cosine similarity to the PyTorch embeddings')
+    args = parser.parse_args()
+    
+    output_dir = args.output or os.path.join('data', 'models', f"{args.encoder}-onnx")
+    encoder = Encoder(args.encoder)
+    export_onnx_encoder(encoder, output_dir, quantize=not args.no_quantize)
+    
+    onnx_model = OnnxEncoderModel(output_dir)
+    similarities = cosine_similarities(encoder.model.encode(PARITY_TEXTS), onnx_model.encode(PARITY_TEXTS))
+    logging.info(f"Cosine similarity to PyTorch: min {similarities.min():.4f}, mean {similarities.mean():.4f}")
+    
+    torch_ms = per_query_ms(encoder.model, PARITY_TEXTS)
+    onnx_ms = per_query_ms(onnx_model, PARITY_TEXTS)
+    logging.info(f"Per-query encode: PyTorch {torch_ms:.2f} ms, ONNX {onnx_ms:.2f} ms ({torch_ms / onnx_ms:.1f}x)")
+    
+    model_path = os.path.join(output_dir, onnx_model.config['model_file'])
+    logging.info(f"Model file: {model_path} ({os.path.getsize(model_path) / 2**20:.1f} MB)")
+    
+    if similarities.min() < args.tolerance:
+        logging.error(f"Parity check failed: minimum cosine {similarities.min():.4f} < {args.tolerance}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
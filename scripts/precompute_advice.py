@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Precompute advice for the most frequent questions
+
+Recorded queries are encoded with the retriever's encoder and clustered
+with k-means, weighted by how often each was asked. For the clusters
+covering the most traffic, the question closest to the centroid gets
+advice from the full pipeline (retrieval and the LLM) and translations
+into every supported language. The results are written to the table
+SkillMentor serves from when precomputed_path is set.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.core import SkillMentor
+from skillmentor.nlp.translation import SUPPORTED_LANGUAGES
+from skillmentor.rag.precomputed import PrecomputedAdvice, DEFAULT_PRECOMPUTED_PATH, cluster_queries
+from skillmentor.serving.warmup import top_queries
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+DEFAULT_STORE_URL = 'sqlite:///' + os.path.join('data', 'processed', 'skillmentor.db')
+
+def read_records(source):
+    """
+    Read recorded advice requests
+    
+    Args:
+        source (str): Event store URL ('sqlite:///...') or JSONL file
+        
+    Returns:
+        list: Request records with a 'query'
+    """
+    if source.startswith(('sqlite:///', 'memory://')):
+        from skillmentor.storage.store import create_event_store
+        
+        store = create_event_store(source)
+        records = store.log('advice_requests').read()
+        store.close()
+        return records
+    
+    with open(source, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main():
+    """
+    Cluster the recorded queries, advise the representatives and write the table
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--source', default=DEFAULT_STORE_URL, help='Event store URL or JSONL file of recorded requests')
+    parser.add_argument('--questions', type=int, default=300, help='Number of clusters (precomputed questions)')
+    parser.add_argument('--min-count', type=int, default=2, help='Fewest requests a cluster needs to be precomputed')
+    parser.add_argument('--languages', nargs='+', default=list(SUPPORTED_LANGUAGES), help='Languages to translate the advice into')
+    parser.add_argument('--output', default=DEFAULT_PRECOMPUTED_PATH, help='Precomputed advice table')
+    parser.add_argument('--index-path', default='data/processed/faiss_index.bin', help='FAISS index')
+    parser.add_argument('--documents-path', default='data/processed/documents.txt', help='Documents file')
+    parser.add_argument('--bundle-root', default=None, help='Index bundle root (instead of --index-path)')
+    parser.add_argument('--encoder', default=None, help='Encoder name (default: minilm)')
+    parser.add_argument('--model-name', default='meta-llama/Llama-2-7b-chat-hf', help='LLM generating the advice')
+    parser.add_argument('--device', default='cpu', help='Device to run the LLM on')
+    parser.add_argument('--translation-backend', default='google', help="Translation backend ('google' or 'marian')")
+    args = parser.parse_args()
+    
+    queries = [(query, count) for query, _, count in top_queries(read_records(args.source), n=None)]
+    if not queries:
+        logging.error(f"No recorded queries in {args.source}")
+        return 1
+    
+    app = SkillMentor(
+        index_path=args.index_path,
+        documents_path=args.documents_path,
+        index_bundle_root=args.bundle_root,
+        encoder=args.encoder,
+        model_name=args.model_name,
+        device=args.device,
+        translation_backend=args.translation_backend,
+        coalesce_max_waiters=0,
+        llm_timeout=None
+    )
+    if app.generator.llm is None:
+        logging.error(f"Could not load {args.model_name}; refusing to precompute fallback advice")
+        return 1
+    
+    start_time = time.perf_counter()
+    texts = [query for query, _ in queries]
+    embeddings = app.retriever.generate_embeddings(texts)
+    clusters = cluster_queries(texts, embeddings, [count for _, count in queries], args.questions)
+    clusters = [cluster for cluster in clusters if cluster['count'] >= args.min_count]
+    covered = sum(cluster['count'] for cluster in clusters)
+    total = sum(count for _, count in queries)
+    logging.info(f"{len(queries)} distinct queries in {len(clusters)} clusters covering {covered}/{total} requests")
+    
+    questions = [cluster['question'] for cluster in clusters]
+    results = [result for result in app.process_batch(questions, 'en', record=False) if not result['degraded']]
+    if len(results) < len(questions):
+        logging.warning(f"Skipping {len(questions) - len(results)} questions the LLM did not answer")
+    if not results:
+        logging.error("No advice generated")
+        return 1
+    
+    advice = {'en': [result['advice'] for result in results]}
+    for lang in args.languages:
+        translations = app.text_processor.translate_batch(advice['en'], dest=lang, src='en')
+        # A failed translation comes back unchanged; those are translated at serve time
+        advice[lang] = [None if translation == text else translation for translation, text in zip(translations, advice['en'])]
+    
+    table = PrecomputedAdvice(
+        app.retriever.generate_embeddings([result['processed_query'] for result in results]),
+        [result['processed_query'] for result in results],
+        [result['query_type'] for result in results],
+        advice,
+        encoder=app.retriever.encoder.metadata()
+    )
+    table.save(args.output)
+    logging.info(f"Precomputed {len(table)} questions in {time.perf_counter() - start_time:.1f} seconds")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
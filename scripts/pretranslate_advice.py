@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Pre-translate the static advice pool into every supported language
+so back-translation of those texts becomes a cache lookup
+"""
+import os
+import sys
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importing simple_app must not touch the persistent request store
+os.environ.setdefault('SKILLMENTOR_STORE_URL', 'memory://')
+
+import simple_app
+from skillmentor.nlp.processor import TextProcessor
+from skillmentor.nlp.translation import TranslationCache, DEFAULT_CACHE_PATH, SUPPORTED_LANGUAGES
+from skillmentor.rag.generator import FALLBACK_ADVICE
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def collect_advice_texts():
+    """
+    Collect every fixed advice text the application can return
+    
+    Response templates are not included: they are only ever returned
+    with generated advice substituted in, so the composed string differs
+    per response.
+    
+    Returns:
+        list: Unique English advice texts
+    """
+    texts = []
+    for strategies in simple_app.business_strategies.values():
+        texts.extend(strategies)
+    for strategies in simple_app.storage['business_strategies'].values():
+        texts.extend(strategies)
+    for advice in simple_app.business_specific_advice.values():
+        texts.extend(advice)
+    texts.extend(FALLBACK_ADVICE.values())
+    return list(dict.fromkeys(texts))
+
+def main():
+    """
+    Fill the translation cache
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='Path to the translation cache')
+    parser.add_argument('--languages', nargs='+', default=list(SUPPORTED_LANGUAGES), help='Target language codes')
+    parser.add_argument('--backend', default='google', help="Translation backend ('google' or 'marian')")
+    args = parser.parse_args()
+    
+    texts = collect_advice_texts()
+    logging.info(f"Pre-translating {len(texts)} advice texts into {', '.join(args.languages)}")
+    
+    cache = TranslationCache(path=args.cache)
+    processor = TextProcessor(cache=cache, backend=args.backend)
+    counts = processor.pretranslate(texts, args.languages)
+    cache.close()
+    
+    for lang, count in counts.items():
+        logging.info(f"{lang}: {count}/{len(texts)} texts cached")
+    
+    return 0 if all(count == len(texts) for count in counts.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,16 @@
 import os
 import sys
 import logging
+import argparse
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 import random
 
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.encoders import Encoder, ENCODERS, DEFAULT_ENCODER
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,48 +26,41 @@ logger = logging.getLogger('simple_index_builder')
 try:
     import faiss
     from sentence_transformers import SentenceTransformer
+    from skillmentor.rag.mmap_index import save_vectors
     HAS_ADVANCED_DEPS = True
     logger.info("Advanced dependencies found. Using FAISS and SentenceTransformer.")
 except ImportError:
     HAS_ADVANCED_DEPS = False
     logger.warning("FAISS or SentenceTransformer not found. Using simple text index.")
 
-def generate_embeddings(texts: List[str], model_name: str = 'paraphrase-MiniLM-L6-v2') -> np.ndarray:
+def generate_embeddings(texts: List[str], encoder: Encoder) -> Optional[np.ndarray]:
     """
-    Generate embeddings for a list of texts using SentenceTransformer.
+    Generate embeddings for a list of texts with a registered encoder.
     
     Args:
         texts: List of text documents
-        model_name: Name of the SentenceTransformer model to use
+        encoder: Encoder to use (its PCA projection is fitted here if configured)
         
     Returns:
-        Numpy array of embeddings
+        Numpy array of embeddings, or None if the encoder failed
     """
-    if not HAS_ADVANCED_DEPS:
-        # Return random embeddings if we don't have the dependencies
-        logger.warning("Generating random embeddings as placeholder")
-        return np.random.rand(len(texts), 384).astype(np.float32)
-    
     try:
-        logger.info(f"Loading model: {model_name}")
-        model = SentenceTransformer(model_name)
-        logger.info("Generating embeddings")
-        embeddings = model.encode(texts, show_progress_bar=True)
-        return embeddings.astype(np.float32)
+        logger.info(f"Generating embeddings with {encoder.name} ({encoder.model_id})")
+        return encoder.fit_encode(texts)
     except Exception as e:
         logger.error(f"Error generating embeddings: {e}")
-        # Fallback to random embeddings
-        logger.warning("Falling back to random embeddings")
-        return np.random.rand(len(texts), 384).astype(np.float32)
+        return None
 
-def create_index(documents: List[str], index_path: str, docs_path: str) -> bool:
+def create_index(documents: List[str], index_path: str, docs_path: str, encoder: Encoder) -> bool:
     """
-    Create a FAISS index from documents and save it to disk.
+    Create a FAISS index from documents and save it to disk, together
+    with metadata naming the encoder that produced it.
     
     Args:
         documents: List of text documents
         index_path: Path to save the FAISS index
         docs_path: Path to save the documents
+        encoder: Encoder for the document embeddings
         
     Returns:
         True if successful, False otherwise
@@ -76,9 +75,13 @@ def create_index(documents: List[str], index_path: str, docs_path: str) -> bool:
         if not HAS_ADVANCED_DEPS:
             logger.info("Skipping FAISS index creation (dependencies not available)")
             return True
-            
+        
         # Generate embeddings
-        embeddings = generate_embeddings(documents)
+        embeddings = generate_embeddings(documents, encoder)
+        if embeddings is None:
+            # An index built from placeholder vectors would silently return
+            # arbitrary documents, so none is written
+            return False
         dimension = embeddings.shape[1]
         
         # Create FAISS index
@@ -87,7 +90,9 @@ def create_index(documents: List[str], index_path: str, docs_path: str) -> bool:
         
         # Save index to disk
         faiss.write_index(index, index_path)
-        logger.info(f"Created FAISS index with {len(documents)} documents and saved to {index_path}")
+        save_vectors(index, index_path)
+        encoder.save(index_path, len(documents))
+        logger.info(f"Created FAISS index with {len(documents)} documents ({dimension} dimensions) and saved to {index_path}")
         
         return True
     except Exception as e:
@@ -107,7 +112,7 @@ def load_raw_documents(file_path: str) -> List[str]:
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-            
+        
         # Split content by section headers
         documents = []
         sections = content.split('# ')
@@ -115,7 +120,7 @@ def load_raw_documents(file_path: str) -> List[str]:
         for section in sections:
             if not section.strip():
                 continue
-                
+            
             # Process each paragraph in the section
             paragraphs = section.strip().split('\n\n')
             section_title = paragraphs[0].strip()
@@ -132,6 +137,12 @@ def load_raw_documents(file_path: str) -> List[str]:
 
 def main():
     """Main function to create the index."""
+    parser = argparse.ArgumentParser(description="Create the FAISS index of business strategies")
+    parser.add_argument('--encoder', default=DEFAULT_ENCODER, choices=sorted(ENCODERS), help='Registered encoder name')
+    parser.add_argument('--truncate-dim', type=int, default=None, help='Keep only the first N embedding dimensions')
+    parser.add_argument('--pca-dim', type=int, default=None, help='Project embeddings onto N principal components')
+    args = parser.parse_args()
+    
     try:
         # Define paths
         raw_path = 'data/raw/sample_strategies.txt'
@@ -153,7 +164,8 @@ def main():
         logger.info(f"Loaded {len(documents)} documents")
         
         # Create index
-        success = create_index(documents, index_path, docs_path)
+        encoder = Encoder(args.encoder, truncate_dim=args.truncate_dim, pca_dim=args.pca_dim)
+        success = create_index(documents, index_path, docs_path, encoder)
         
         if success:
             logger.info("Index creation completed successfully")
@@ -167,4 +179,4 @@ def main():
 
 if __name__ == "__main__":
     success = main()
-    sys.exit(0 if success else 1) 
\ No newline at end of file
+    sys.exit(0 if success else 1) 
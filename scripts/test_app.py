@@ -14,6 +14,8 @@ from skillmentor.nlp.processor import TextProcessor
 from skillmentor.rag.retriever import DocumentRetriever
 from skillmentor.rag.generator import AdviceGenerator
 from skillmentor.viz.dashboard import Dashboard
+from skillmentor.rag.encoders import Encoder
+from skillmentor.rag.onnx_encoder import cosine_similarities
 
 # Configure logging
 logging.basicConfig(
@@ -62,8 +64,35 @@ def test_document_retriever():
     for i, doc in enumerate(results):
         logging.info(f"Result {i+1}: {doc}")
     
+    # Batched retrieval must agree with one query at a time
+    queries = [query, "How do I market my products?", query]
+    if retriever.retrieve_batch(queries, k=2) != [retriever.retrieve(q, k=2) for q in queries]:
+        logging.error("Batched retrieval differs from single-query retrieval")
+        return False
+    
     return True
 
+def test_onnx_encoder_parity():
+    """Test that the ONNX encoder export matches the PyTorch encoder"""
+    logging.info("Testing ONNX encoder parity...")
+    
+    onnx_path = os.environ.get('SKILLMENTOR_ONNX_ENCODER', 'data/models/minilm-onnx')
+    if not os.path.exists(onnx_path):
+        logging.info(f"No ONNX export at {onnx_path}, skipping (run scripts/export_onnx_encoder.py)")
+        return True
+    
+    texts = [
+        "How should I price my handmade wooden crafts?",
+        "Source materials locally to reduce carbon footprint.",
+        "Plan for seasonal income fluctuations by saving during high seasons."
+    ]
+    reference = Encoder('minilm').encode(texts)
+    exported = Encoder('minilm', onnx_path=onnx_path).encode(texts)
+    
+    similarities = cosine_similarities(reference, exported)
+    logging.info(f"Minimum cosine similarity: {similarities.min():.4f}")
+    return bool(similarities.min() >= 0.99)
+
 def test_advice_generator():
     """Test the advice generator functionality"""
     logging.info("Testing AdviceGenerator...")
@@ -131,6 +160,7 @@ def main():
     tests = [
         test_text_processor,
         test_document_retriever,
+        test_onnx_encoder_parity,
         test_advice_generator,
         test_dashboard,
         test_full_pipeline
@@ -155,4 +185,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main()) 
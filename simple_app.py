@@ -2,19 +2,26 @@
 SkillMentor Flask Web Application (Simplified Version)
 """
 import os
+import atexit
 import logging
 import random
 import io
 import base64
 import matplotlib.pyplot as plt
-from flask import Flask, request, render_template, jsonify, session, flash, redirect, url_for
+from flask import Flask, request, render_template, jsonify, session, flash, redirect, url_for, Response
 from datetime import datetime
 import re
-import hashlib
 import string
 import uuid
 import time
 import json
+import threading
+from collections import namedtuple, Counter
+from skillmentor.storage.store import create_event_store, RetentionPolicy
+from skillmentor.storage.cache import LRUCache
+from skillmentor.storage.columnar import RequestHistory
+from skillmentor.monitoring.latency import LatencyRecorder
+from skillmentor.nlp.tokenizer import normalize_query, query_hash, extract_keywords, extract_key_terms
 
 # Configure logging
 logging.basicConfig(
@@ -28,9 +35,30 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'default-dev-key')
 
+# Largest number of queries accepted by /api/advice/batch
+MAX_BATCH_QUERIES = int(os.environ.get('SKILLMENTOR_MAX_BATCH_QUERIES', 1000))
+
+# Persistent, bounded event store shared by all workers (SQLite in WAL mode).
+# Events are written behind the request path by a background flusher.
+DEFAULT_STORE_URL = 'sqlite:///' + os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'processed', 'skillmentor.db'
+)
+event_store = create_event_store(
+    os.environ.get('SKILLMENTOR_STORE_URL', DEFAULT_STORE_URL),
+    retention=RetentionPolicy(
+        max_events=int(os.environ.get('SKILLMENTOR_MAX_EVENTS', 100000)),
+        max_age=float(os.environ.get('SKILLMENTOR_MAX_EVENT_AGE', 30 * 86400))
+    ),
+    batch_size=int(os.environ.get('SKILLMENTOR_FLUSH_SIZE', 100)),
+    write_behind=True,
+    flush_interval=float(os.environ.get('SKILLMENTOR_FLUSH_INTERVAL', 1.0)),
+    max_queue=int(os.environ.get('SKILLMENTOR_WRITE_QUEUE_SIZE', 10000))
+)
+atexit.register(event_store.close)
+
 # Expanded business strategies database with more detailed advice
 storage = {
-    'advice_requests': [],
+    'advice_requests': event_store.log('advice_requests'),
     'business_strategies': {
         'pricing': [
             "Calculate your base price using the formula: (Material Cost + Labor Cost) × (1 + Profit Margin). For artisan products, aim for a 30-50% margin to reflect your craftsmanship value.",
@@ -88,10 +116,39 @@ storage = {
             "Allocate specific time blocks for production, business management, and creative development. Without this structure, administrative tasks often get neglected."
         ]
     },
-    'user_feedback': [],
-    'previous_advice': {}  # Track previous advice to avoid repetition
+    'user_feedback': event_store.log('user_feedback'),
+    'previous_advice': LRUCache(maxsize=10000)  # Track previous advice to avoid repetition
 }
 
+# Columnar copy of the request history used for dashboard aggregates
+request_history = RequestHistory(
+    capacity=int(os.environ.get('SKILLMENTOR_HISTORY_CAPACITY', 1000000))
+)
+request_history.extend(storage['advice_requests'].read())
+
+# Feedback rating counts for the dashboards, loaded from the store at startup
+# and then updated with the worker's own feedback
+feedback_ratings = Counter()
+feedback_lock = threading.Lock()
+
+def count_feedback_rating(rating):
+    """Count a feedback rating for the dashboards if it is between 1 and 5."""
+    if isinstance(rating, (int, float)) and 1 <= rating <= 5:
+        with feedback_lock:
+            feedback_ratings[rating] += 1
+
+for feedback in storage['user_feedback'].read():
+    count_feedback_rating(feedback.get('rating'))
+
+# Per-stage latency histograms for the rule-based pipeline
+latency = LatencyRecorder(stages=[
+    'keyword_extraction',
+    'retrieval',
+    'generation',
+    'rendering',
+    'total'
+])
+
 # AI-like response templates for more varied outputs
 response_templates = [
     "Based on my analysis of successful micro-entrepreneurs in your sector, {advice} This approach has shown a 30% increase in customer retention for similar businesses.",
@@ -168,6 +225,11 @@ sample_documents = [
     }
 ]
 
+# Sample documents partitioned by their (lowercased) category
+DOCUMENTS_BY_CATEGORY = {}
+for _doc in sample_documents:
+    DOCUMENTS_BY_CATEGORY.setdefault(_doc["category"].lower(), []).append(_doc)
+
 # Business strategies database
 business_strategies = {
     "pricing": [
@@ -207,93 +269,196 @@ business_strategies = {
     ]
 }
 
+# Business-type detection terms, in priority order
+BUSINESS_TYPE_TERMS = [
+    ("woodworking", ['wood', 'carpentry', 'furniture', 'carve', 'carving']),
+    ("textile", ['fabric', 'textile', 'cloth', 'sew', 'weave', 'stitch']),
+    ("food", ['food', 'cook', 'bake', 'meal', 'recipe']),
+    ("farming", ['farm', 'crop', 'agriculture', 'harvest', 'plant'])
+]
+
+# Lookup tables: key term -> business type, and business type -> priority
+BUSINESS_TYPE_BY_TERM = {
+    term: business_type
+    for business_type, terms in BUSINESS_TYPE_TERMS
+    for term in terms
+}
+BUSINESS_TYPE_PRIORITY = {business_type: i for i, (business_type, _) in enumerate(BUSINESS_TYPE_TERMS)}
+
+# Closing personalization sentences, in priority order
+PERSONALIZATION_RULES = [
+    ({'cost', 'price', 'profit'}, " Remember that accurate pricing is fundamental to sustainable business growth."),
+    ({'customer', 'market', 'sell'}, " Building strong customer relationships will be key to your long-term success."),
+    ({'quality', 'improve'}, " Consistent quality will set you apart in an increasingly competitive marketplace.")
+]
+
+# Response templates split around the advice placeholder once at startup
+RESPONSE_TEMPLATE_PARTS = [template.split("{advice}", 1) for template in response_templates]
+
+# Query analysis computed once per request and shared by every stage
+QueryAnalysis = namedtuple('QueryAnalysis', [
+    'text',           # lowercased query
+    'normalized',     # lowercased query with collapsed whitespace
+    'query_id',       # MD5 hex digest of the normalized query
+    'query_hash',     # query_id as an integer
+    'key_terms',      # words of four or more characters
+    'keywords',       # keywords used for categorization
+    'business_type',  # detected business sector ('' if none)
+    'category'        # advice category
+])
+
 def generate_unique_id_from_query(query):
     """
     Generate a stable but unique ID from a query to track repeated questions
     """
     # Create a hash from the query after normalizing
-    normalized_query = re.sub(r'\s+', ' ', query.lower().strip())
-    return hashlib.md5(normalized_query.encode()).hexdigest()
+    return query_hash(query)
 
-def enhance_response(advice, query):
+def detect_business_type(key_terms):
+    """Detect the business sector from key terms using the term lookup table"""
+    best = None
+    for term in key_terms:
+        business_type = BUSINESS_TYPE_BY_TERM.get(term)
+        if business_type and (best is None or BUSINESS_TYPE_PRIORITY[business_type] < BUSINESS_TYPE_PRIORITY[best]):
+            best = business_type
+    return best or ""
+
+def select_template(hash_value):
+    """Select the (prefix, suffix) template parts for a query hash"""
+    return RESPONSE_TEMPLATE_PARTS[hash_value % len(RESPONSE_TEMPLATE_PARTS)]
+
+def enhance_response(advice, analysis):
     """
     Makes the response more AI-like by adding variety and personalization
-    """
-    # Extract key terms from query to personalize response
-    key_terms = re.findall(r'\b\w{4,}\b', query.lower())
-    business_type = ""
-    
-    if any(term in ['wood', 'carpentry', 'furniture', 'carve', 'carving'] for term in key_terms):
-        business_type = "woodworking"
-    elif any(term in ['fabric', 'textile', 'cloth', 'sew', 'weave', 'stitch'] for term in key_terms):
-        business_type = "textile"
-    elif any(term in ['food', 'cook', 'bake', 'meal', 'recipe'] for term in key_terms):
-        business_type = "food"
-    elif any(term in ['farm', 'crop', 'agriculture', 'harvest', 'plant'] for term in key_terms):
-        business_type = "farming"
     
+    Args:
+        advice (str): Selected strategy text
+        analysis (QueryAnalysis): Precomputed analysis of the query
+    """
     # Choose a response template based on query hash for consistency
-    query_hash = int(generate_unique_id_from_query(query), 16)
-    template_index = query_hash % len(response_templates)
-    template = response_templates[template_index]
-    
-    # Format the response with the advice
-    response = template.format(advice=advice)
+    prefix, suffix = select_template(analysis.query_hash)
+    response = prefix + advice + suffix
     
     # Add business-specific advice if type detected
-    if business_type:
+    if analysis.business_type:
         # Select business advice based on query hash for consistency
-        specific_advice_index = query_hash % len(business_specific_advice[business_type])
-        business_advice = business_specific_advice[business_type][specific_advice_index]
-        response += f" {business_advice}"
+        sector_advice = business_specific_advice[analysis.business_type]
+        response += f" {sector_advice[analysis.query_hash % len(sector_advice)]}"
     
     # Add more personalization based on extracted terms
-    if 'cost' in key_terms or 'price' in key_terms or 'profit' in key_terms:
-        response += " Remember that accurate pricing is fundamental to sustainable business growth."
-    elif 'customer' in key_terms or 'market' in key_terms or 'sell' in key_terms:
-        response += " Building strong customer relationships will be key to your long-term success."
-    elif 'quality' in key_terms or 'improve' in key_terms:
-        response += " Consistent quality will set you apart in an increasingly competitive marketplace."
+    key_terms = set(analysis.key_terms)
+    for terms, sentence in PERSONALIZATION_RULES:
+        if key_terms & terms:
+            response += sentence
+            break
     
     return response
 
-def extract_keywords(text):
-    """Extract meaningful keywords from text for better categorization"""
-    # Convert to lowercase and remove punctuation
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    
-    # Split into words
-    words = text.split()
-    
-    # Remove common stopwords
-    stopwords = {'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours',
-                 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers',
-                 'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves',
-                 'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are',
-                 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does',
-                 'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until',
-                 'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 'into',
-                 'through', 'during', 'before', 'after', 'above', 'below', 'to', 'from', 'up', 'down',
-                 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here',
-                 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more',
-                 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so',
-                 'than', 'too', 'very', 's', 't', 'can', 'will', 'just', 'don', 'should', 'now'}
-    
-    keywords = [word for word in words if word not in stopwords and len(word) > 3]
-    return keywords
+# Category keywords, in scoring priority order
+CATEGORY_KEYWORDS = [
+    ('pricing', {'price', 'pricing', 'cost', 'charge', 'profit', 'margin', 'worth',
+                 'expensive', 'cheap', 'afford', 'value', 'discount', 'money', 'financial',
+                 'income', 'revenue', 'earning', 'dollar', 'rupee', 'sale', 'budget'}),
+    ('marketing', {'market', 'sell', 'customer', 'promote', 'advertise', 'publicity',
+                   'brand', 'client', 'social', 'media', 'facebook', 'instagram', 'platform',
+                   'audience', 'target', 'position', 'visibility', 'display', 'showcase'}),
+    ('sustainability', {'sustain', 'environment', 'eco', 'green', 'waste', 'recycle',
+                        'reuse', 'carbon', 'footprint', 'natural', 'organic', 'renewable',
+                        'biodegradable', 'impact', 'conservation', 'preserve', 'energy',
+                        'efficient', 'climate', 'friendly'}),
+    ('production', {'product', 'quality', 'improve', 'make', 'create', 'production',
+                    'manufacture', 'craft', 'skill', 'technique', 'process', 'material',
+                    'supply', 'chain', 'inventory', 'design', 'equipment', 'tool',
+                    'efficiency', 'output', 'workshop'})
+]
+
+# Lookup table: keyword -> category (the highest-priority category wins)
+CATEGORY_BY_KEYWORD = {}
+for _category, _keywords in reversed(CATEGORY_KEYWORDS):
+    CATEGORY_BY_KEYWORD.update(dict.fromkeys(_keywords, _category))
+
+def categorize_query(text, keywords):
+    """
+    Select the advice category for a lowercased query
+    
+    Args:
+        text (str): Lowercased query
+        keywords (list): Keywords extracted from the query
+    """
+    category_scores = {
+        'pricing': 0,
+        'marketing': 0,
+        'sustainability': 0,
+        'production': 0,
+        'general': 0
+    }
+    
+    # Score each category based on keyword presence
+    for keyword in keywords:
+        category = CATEGORY_BY_KEYWORD.get(keyword)
+        if category:
+            category_scores[category] += 2
+    
+    # Additional pattern matching for more context (applied once per keyword)
+    if keywords and 'how' in text:
+        bonus = 3 * len(keywords)
+        if 'price' in text:
+            category_scores['pricing'] += bonus
+        if 'market' in text or 'sell' in text:
+            category_scores['marketing'] += bonus
+        if 'sustainable' in text or 'eco' in text:
+            category_scores['sustainability'] += bonus
+        if 'make' in text or 'produce' in text:
+            category_scores['production'] += bonus
+    
+    # Default to general if no clear category emerges
+    category_scores['general'] = 1  # Minimal base score
+    
+    # Select the highest scoring category
+    category = max(category_scores, key=category_scores.get)
+    
+    # If all scores are very low, default to general
+    if category_scores[category] <= 1:
+        category = 'general'
+    
+    return category
+
+def analyze_query(query):
+    """
+    Analyze a query once so every stage can reuse the results
+    
+    Args:
+        query (str): Raw user query
+        
+    Returns:
+        QueryAnalysis: Normalized form, hash, tokens, business type and category
+    """
+    text = query.lower()
+    normalized = normalize_query(query)
+    query_id = query_hash(normalized)
+    key_terms = extract_key_terms(text)
+    keywords = extract_keywords(text)
+    
+    return QueryAnalysis(
+        text=text,
+        normalized=normalized,
+        query_id=query_id,
+        query_hash=int(query_id, 16),
+        key_terms=key_terms,
+        keywords=keywords,
+        business_type=detect_business_type(key_terms),
+        category=categorize_query(text, keywords)
+    )
 
 def generate_unique_id():
     """Generate a unique ID for tracking advice requests."""
     return str(uuid.uuid4())
 
-def retrieve_relevant_documents(query, top_k=2):
-    """Retrieve relevant documents based on keyword matching."""
-    keywords = extract_keywords(query)
-    
+def rank_documents(documents, keywords, top_k):
+    """Rank documents by keyword matches, keeping the top_k with any match"""
     # Calculate relevance scores for each document
     doc_scores = []
-    for doc in sample_documents:
+    for doc in documents:
         score = 0
         doc_text = doc["title"] + " " + doc["content"]
         doc_text = doc_text.lower()
@@ -311,137 +476,117 @@ def retrieve_relevant_documents(query, top_k=2):
     doc_scores.sort(key=lambda x: x[1], reverse=True)
     return [doc for doc, score in doc_scores[:top_k] if score > 0]
 
-def generate_advice(query):
-    """
-    Enhanced rule-based advice generation with more varied responses
+def retrieve_relevant_documents(query, top_k=2, keywords=None, category=None):
     """
-    query = query.lower()
-    query_id = generate_unique_id_from_query(query)
-    
-    # Extract keywords for better categorization
-    keywords = extract_keywords(query)
-    
-    # Enhanced categorization with keyword weights
-    category_scores = {
-        'pricing': 0,
-        'marketing': 0,
-        'sustainability': 0,
-        'production': 0,
-        'general': 0
-    }
-    
-    # Pricing keywords
-    pricing_keywords = {'price', 'pricing', 'cost', 'charge', 'profit', 'margin', 'worth', 
-                       'expensive', 'cheap', 'afford', 'value', 'discount', 'money', 'financial',
-                       'income', 'revenue', 'earning', 'dollar', 'rupee', 'sale', 'budget'}
-    
-    # Marketing keywords
-    marketing_keywords = {'market', 'sell', 'customer', 'promote', 'advertise', 'publicity', 
-                         'brand', 'client', 'social', 'media', 'facebook', 'instagram', 'platform',
-                         'audience', 'target', 'position', 'visibility', 'display', 'showcase'}
-    
-    # Sustainability keywords
-    sustainability_keywords = {'sustain', 'environment', 'eco', 'green', 'waste', 'recycle',
-                              'reuse', 'carbon', 'footprint', 'natural', 'organic', 'renewable',
-                              'biodegradable', 'impact', 'conservation', 'preserve', 'energy',
-                              'efficient', 'climate', 'friendly'}
-    
-    # Production keywords
-    production_keywords = {'product', 'quality', 'improve', 'make', 'create', 'production',
-                           'manufacture', 'craft', 'skill', 'technique', 'process', 'material',
-                           'supply', 'chain', 'inventory', 'design', 'equipment', 'tool',
-                           'efficiency', 'output', 'workshop'}
+    Retrieve relevant documents based on keyword matching
     
-    # Score each category based on keyword presence
-    for keyword in keywords:
-        if keyword in pricing_keywords:
-            category_scores['pricing'] += 2
-        elif keyword in marketing_keywords:
-            category_scores['marketing'] += 2
-        elif keyword in sustainability_keywords:
-            category_scores['sustainability'] += 2
-        elif keyword in production_keywords:
-            category_scores['production'] += 2
-        
-        # Additional pattern matching for more context
-        if 'how' in query and 'price' in query:
-            category_scores['pricing'] += 3
-        if 'how' in query and ('market' in query or 'sell' in query):
-            category_scores['marketing'] += 3
-        if 'how' in query and ('sustainable' in query or 'eco' in query):
-            category_scores['sustainability'] += 3
-        if 'how' in query and ('make' in query or 'produce' in query):
-            category_scores['production'] += 3
-    
-    # Default to general if no clear category emerges
-    category_scores['general'] = 1  # Minimal base score
+    With a category, only that category's documents are searched; the
+    whole collection fills any remaining slots.
+    """
+    if keywords is None:
+        keywords = extract_keywords(query)
     
-    # Select the highest scoring category
-    category = max(category_scores, key=category_scores.get)
+    partition = DOCUMENTS_BY_CATEGORY.get(category)
+    if partition is None:
+        return rank_documents(sample_documents, keywords, top_k)
     
-    # If all scores are very low, default to general
-    if category_scores[category] <= 1:
-        category = 'general'
+    docs = rank_documents(partition, keywords, top_k)
+    if len(docs) < top_k:
+        docs += [doc for doc in rank_documents(sample_documents, keywords, top_k) if doc not in docs][:top_k - len(docs)]
+    return docs
+
+def generate_advice(query):
+    """
+    Enhanced rule-based advice generation with more varied responses
     
-    # Record the request
-    storage['advice_requests'].append({
-        'query': query,
-        'timestamp': time.time(),
-        'category': category,
-        'query_id': query_id
-    })
-    
-    # Check if we've given advice for this query before to avoid repetition
-    if query_id in storage['previous_advice']:
-        # Get different advice than what was given before
-        previous_indices = storage['previous_advice'][query_id]
-        available_advice = [advice for i, advice in enumerate(storage['business_strategies'][category]) 
-                           if i not in previous_indices]
-        
-        # If we've used all advice for this category, reset
-        if not available_advice:
+    Returns the recorded request, plus the retrieved 'documents' (which
+    are not stored) so callers can show references without retrieving again.
+    """
+    start_time = time.perf_counter()
+    
+    with latency.span('keyword_extraction'):
+        analysis = analyze_query(query)
+        query = analysis.text
+        query_id = analysis.query_id
+        category = analysis.category
+    
+    with latency.span('retrieval'):
+        # Retrieve relevant documents
+        relevant_docs = retrieve_relevant_documents(query, keywords=analysis.keywords, category=category)
+    
+    with latency.span('generation'):
+        # Check if we've given advice for this query before to avoid repetition
+        if query_id in storage['previous_advice']:
+            # Get different advice than what was given before
+            previous_indices = storage['previous_advice'][query_id]
+            available_advice = [advice for i, advice in enumerate(storage['business_strategies'][category]) 
+                               if i not in previous_indices]
+            
+            # If we've used all advice for this category, reset
+            if not available_advice:
+                storage['previous_advice'][query_id] = []
+                available_advice = storage['business_strategies'][category]
+        else:
             storage['previous_advice'][query_id] = []
             available_advice = storage['business_strategies'][category]
-    else:
-        storage['previous_advice'][query_id] = []
-        available_advice = storage['business_strategies'][category]
-    
-    # Select advice from appropriate category
-    advice = random.choice(available_advice)
-    
-    # Record which advice was given
-    advice_index = storage['business_strategies'][category].index(advice)
-    storage['previous_advice'][query_id].append(advice_index)
-    
-    # Retrieve relevant documents
-    relevant_docs = retrieve_relevant_documents(query)
-    
-    # Generate response based on relevant documents and business strategies
-    if relevant_docs:
-        # Use information from retrieved documents
-        doc_advice = relevant_docs[0]["content"]
         
-        # Add a strategy from our database
-        strategy = random.choice(business_strategies[category])
+        # Select advice from appropriate category
+        advice = random.choice(available_advice)
         
-        # Combine document-based advice with strategic advice
-        response = f"{doc_advice}\n\nStrategy recommendation: {strategy}"
-    else:
-        # Enhance the response to make it more AI-like
-        response = enhance_response(advice, query)
+        # Record which advice was given
+        advice_index = storage['business_strategies'][category].index(advice)
+        storage['previous_advice'][query_id].append(advice_index)
+        
+        # Generate response based on relevant documents and business strategies
+        if relevant_docs:
+            # Use information from retrieved documents
+            doc_advice = relevant_docs[0]["content"]
+            
+            # Add a strategy from our database
+            strategy = random.choice(business_strategies[category])
+            
+            # Combine document-based advice with strategic advice
+            response = f"{doc_advice}\n\nStrategy recommendation: {strategy}"
+        else:
+            # Enhance the response to make it more AI-like
+            response = enhance_response(advice, analysis)
+    
+    processing_time = time.perf_counter() - start_time
+    latency.record('total', processing_time)
     
     # Record the advice request
     request_data = {
         "id": generate_unique_id(),
         "query": query,
+        "query_id": query_id,
         "response": response,
         "category": category,
         "timestamp": time.time(),
-        "processing_time": random.uniform(0.5, 2.0)  # Simulated processing time
+        "processing_time": processing_time,
+        "doc_count": len(relevant_docs)
     }
     storage['advice_requests'].append(request_data)
+    request_history.append(
+        request_data['timestamp'],
+        category,
+        request_data['processing_time'],
+        query_id,
+        request_data['doc_count']
+    )
     
-    return request_data
+    return dict(request_data, documents=relevant_docs)
+
+def advice_response(query, result):
+    """API representation of an advice request with its document references."""
+    relevant_docs = result['documents']
+    return {
+        "id": result['id'],
+        "query": query,
+        "advice": result['response'],
+        "category": result['category'],
+        "references": [{"id": doc['id'], "title": doc['title']} for doc in relevant_docs],
+        "processing_time": result['processing_time']
+    }
 
 def generate_dashboard():
     """Generate dashboard visualization using actual collected data."""
@@ -457,46 +602,13 @@ def generate_dashboard():
         ('Last month', 2592000)
     ]
     
-    # Categorize and analyze queries
-    category_counts = {
-        'pricing': 0,
-        'marketing': 0,
-        'sustainability': 0,
-        'production': 0,
-        'general': 0
-    }
-    
-    # Time-based query analysis
-    period_query_counts = {period: 0 for period, _ in time_periods}
-    
-    # Feedback analysis
-    feedback_ratings = []
+    # Vectorized aggregates over the columnar request history
+    category_counts = request_history.category_counts()
+    period_query_counts = request_history.window_counts(dict(time_periods), current_time)
     
-    # Process stored advice requests
-    for req in storage['advice_requests']:
-        try:
-            req_time = req.get('timestamp', 0)
-            
-            # Categorize by time periods
-            for period, duration in time_periods:
-                if current_time - req_time <= duration:
-                    period_query_counts[period] += 1
-            
-            # Categorize by query type
-            category = req.get('category', 'general').lower()
-            if category in category_counts:
-                category_counts[category] += 1
-        except Exception as e:
-            logging.error(f"Error processing advice request: {e}")
-    
-    # Process user feedback
-    for feedback in storage['user_feedback']:
-        try:
-            rating = feedback.get('rating', 0)
-            if isinstance(rating, (int, float)) and 1 <= rating <= 5:
-                feedback_ratings.append(rating)
-        except Exception as e:
-            logging.error(f"Error processing feedback: {e}")
+    # Feedback analysis from the running rating counts
+    with feedback_lock:
+        rating_counts = dict(feedback_ratings)
     
     # Ensure we have a plot even with minimal data
     plt.subplot(2, 2, 1)
@@ -522,8 +634,9 @@ def generate_dashboard():
     
     # Plot 3: Feedback Ratings Distribution
     plt.subplot(2, 2, 3)
-    if feedback_ratings:
-        plt.hist(feedback_ratings, bins=5, range=(0.5, 5.5), color='green', alpha=0.7)
+    if rating_counts:
+        plt.hist(list(rating_counts), bins=5, range=(0.5, 5.5), weights=list(rating_counts.values()),
+                 color='green', alpha=0.7)
         plt.title('User Feedback Ratings')
         plt.xlabel('Rating')
         plt.ylabel('Frequency')
@@ -533,9 +646,9 @@ def generate_dashboard():
     
     # Plot 4: Processing Time Analysis
     plt.subplot(2, 2, 4)
-    processing_times = [req.get('processing_time', 1.0) for req in storage['advice_requests']]
-    if processing_times:
-        plt.hist(processing_times, bins=10, color='purple', alpha=0.7)
+    if len(request_history):
+        time_counts, time_bins = request_history.processing_time_histogram(bins=10)
+        plt.hist(time_bins[:-1], bins=time_bins, weights=time_counts, color='purple', alpha=0.7)
         plt.title('Response Time Distribution')
         plt.xlabel('Time (seconds)')
         plt.ylabel('Frequency')
@@ -573,18 +686,18 @@ def process_query():
     
     result = generate_advice(query)
     
-    # Get document references to display
-    relevant_docs = retrieve_relevant_documents(query)
-    doc_references = [doc['title'] for doc in relevant_docs]
-    
-    return render_template(
-        'result.html',
-        query=query,
-        advice=result['response'],
-        category=result['category'],
-        processing_time=f"{result['processing_time']:.2f}",
-        doc_references=doc_references
-    )
+    # Document references to display, as retrieved for the advice
+    doc_references = [doc['title'] for doc in result['documents']]
+    
+    with latency.span('rendering'):
+        return render_template(
+            'result.html',
+            query=query,
+            advice=result['response'],
+            category=result['category'],
+            processing_time=f"{result['processing_time']:.4f}",
+            doc_references=doc_references
+        )
 
 @app.route('/feedback', methods=['POST'])
 def record_feedback():
@@ -631,6 +744,7 @@ def record_feedback():
         # Safely append to storage
         try:
             storage['user_feedback'].append(feedback)
+            count_feedback_rating(rating)
         except Exception as storage_error:
             logging.error(f"Error storing feedback: {storage_error}")
             flash('Unable to save feedback. Please try again.')
@@ -658,46 +772,34 @@ def show_metrics():
     # Actual metrics calculation
     current_time = time.time()
     
-    # Category counts with safe counting
-    category_counts = {}
-    for req in storage['advice_requests']:
-        category = req.get('category', 'Unknown').capitalize()
-        category_counts[category] = category_counts.get(category, 0) + 1
-    
-    # Usage data with safe calculation
-    usage_data = {
-        'Last 24h': len([r for r in storage['advice_requests'] if current_time - r.get('timestamp', 0) < 86400]),
-        'Last week': len([r for r in storage['advice_requests'] if current_time - r.get('timestamp', 0) < 604800]),
-        'Last month': len(storage['advice_requests'])
+    # Category counts from the columnar history
+    category_counts = {
+        category.capitalize(): count
+        for category, count in request_history.category_counts().items()
+        if count
     }
     
-    # Feedback analysis with robust handling
-    feedback_ratings = [f['rating'] for f in storage['user_feedback'] if isinstance(f.get('rating'), (int, float)) and 1 <= f['rating'] <= 5]
-    avg_rating = sum(feedback_ratings) / len(feedback_ratings) if feedback_ratings else 0
+    # Usage data with vectorized window counts
+    usage_data = request_history.window_counts({
+        'Last 24h': 86400,
+        'Last week': 604800,
+        'Last month': 2592000
+    }, current_time)
     
-    # Document retrieval stats with error prevention
-    doc_counts = []
-    for req in storage['advice_requests']:
-        try:
-            if 'query' in req:
-                doc_count = len(retrieve_relevant_documents(req['query']))
-                doc_counts.append(doc_count)
-        except Exception as e:
-            logging.error(f"Error retrieving documents for query: {e}")
+    # Feedback analysis from the running rating counts
+    with feedback_lock:
+        rating_total = sum(feedback_ratings.values())
+        avg_rating = sum(rating * count for rating, count in feedback_ratings.items()) / rating_total if rating_total else 0
     
-    # Safe average calculation
-    avg_docs_retrieved = sum(doc_counts) / len(doc_counts) if doc_counts else 0
+    # Document retrieval stats recorded at request time
+    avg_docs_retrieved = request_history.mean_doc_count()
     
-    # Recent queries with error handling
+    # Recent queries from the in-memory ring buffer, newest first
     recent_queries = []
     try:
-        recent_queries = sorted(
-            storage['advice_requests'], 
-            key=lambda x: x.get('timestamp', 0), 
-            reverse=True
-        )[:10]  # Increased to 10 for more comprehensive view
+        recent_queries = storage['advice_requests'].recent(10)[::-1]
     except Exception as e:
-        logging.error(f"Error sorting recent queries: {e}")
+        logging.error(f"Error reading recent queries: {e}")
     
     return render_template(
         'metrics.html',
@@ -705,11 +807,17 @@ def show_metrics():
         category_counts=category_counts,
         recent_queries=recent_queries,
         usage_data=usage_data,
-        total_queries=len(storage['advice_requests']),
+        total_queries=len(request_history),
         avg_docs_retrieved=f"{avg_docs_retrieved:.1f}",
-        avg_user_rating=f"{avg_rating:.1f}"
+        avg_user_rating=f"{avg_rating:.1f}",
+        stage_latencies=latency.snapshot()
     )
 
+@app.route('/metrics/prometheus')
+def prometheus_metrics():
+    """Export stage latencies in the Prometheus text format."""
+    return Response(latency.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/advice', methods=['POST'])
 def api_get_advice():
     """API endpoint to get advice based on query."""
@@ -723,21 +831,65 @@ def api_get_advice():
         return jsonify({"error": "Query is required"}), 400
     
     result = generate_advice(query)
+    response = advice_response(query, result)
     
-    # Get document references
-    relevant_docs = retrieve_relevant_documents(query)
-    doc_references = [{"id": doc['id'], "title": doc['title']} for doc in relevant_docs]
+    with latency.span('rendering'):
+        return jsonify(response)
+
+@app.route('/api/advice/batch', methods=['POST'])
+def api_get_advice_batch():
+    """
+    API endpoint to get advice for many queries, streamed as NDJSON.
     
-    response = {
-        "id": result['id'],
-        "query": query,
-        "advice": result['response'],
-        "category": result['category'],
-        "references": doc_references,
-        "processing_time": result['processing_time']
-    }
+    The body is {"queries": [...]} with query strings or {"id": ..., "query": ...}
+    objects. Each result line carries the query's index (and id); a query that
+    fails gets an error line and the stream goes on. A final {"summary": ...}
+    line reports the throughput in queries per second.
     
-    return jsonify(response)
+    Queries are answered one after another on the same path as /api/advice;
+    the worker pool and batched retrieval are in scripts/bulk_advice.py.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+    
+    items = (request.get_json() or {}).get('queries')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Queries must be a non-empty list"}), 400
+    if len(items) > MAX_BATCH_QUERIES:
+        return jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}), 413
+    
+    def generate():
+        start_time = time.perf_counter()
+        errors = 0
+        for index, item in enumerate(items):
+            line = {"index": index}
+            if isinstance(item, dict):
+                line["ref"] = item.get('id')
+                query = item.get('query')
+            else:
+                query = item
+            if not query or not isinstance(query, str):
+                errors += 1
+                line["error"] = "Query is required"
+            else:
+                # The stream is already under way, so errors become lines instead of responses
+                try:
+                    line.update(advice_response(query, generate_advice(query)))
+                except Exception as e:
+                    errors += 1
+                    logging.error(f"Error generating advice for batch query {index}: {e}")
+                    line["error"] = "Could not generate advice"
+            yield json.dumps(line) + "\n"
+        
+        seconds = time.perf_counter() - start_time
+        yield json.dumps({"summary": {
+            "queries": len(items),
+            "errors": errors,
+            "seconds": seconds,
+            "queries_per_s": len(items) / seconds if seconds else 0.0
+        }}) + "\n"
+    
+    return Response(generate(), mimetype='application/x-ndjson')
 
 @app.errorhandler(404)
 def page_not_found(e):
@@ -797,6 +949,8 @@ process_query = safe_route_wrapper(process_query)
 record_feedback = safe_route_wrapper(record_feedback)
 show_metrics = safe_route_wrapper(show_metrics)
 api_get_advice = safe_route_wrapper(api_get_advice)
+api_get_advice_batch = safe_route_wrapper(api_get_advice_batch)
+prometheus_metrics = safe_route_wrapper(prometheus_metrics)
 
 if __name__ == '__main__':
     # Ensure templates directory exists
@@ -1047,4 +1201,4 @@ if __name__ == '__main__':
 </html>
             ''')
     
-    app.run(host='0.0.0.0', debug=True) 
\ No newline at end of file
+    app.run(host='0.0.0.0', debug=True) 
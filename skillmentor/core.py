@@ -5,9 +5,31 @@ import os
 import logging
 import time
 from skillmentor.nlp.processor import TextProcessor
-from skillmentor.rag.retriever import DocumentRetriever
+from skillmentor.nlp.translation import TranslationCache, DEFAULT_CACHE_PATH
+from skillmentor.nlp.backends import create_translation_backend
+from skillmentor.rag.retriever import DocumentRetriever, DOCUMENT_SEPARATOR
+from skillmentor.rag.encoders import create_encoder
 from skillmentor.rag.generator import AdviceGenerator
+from skillmentor.rag.precomputed import PrecomputedAdvice
 from skillmentor.viz.dashboard import Dashboard
+from skillmentor.monitoring.latency import LatencyRecorder
+from skillmentor.nlp.tokenizer import query_hash
+from skillmentor.serving.singleflight import SingleFlight, TooManyWaiters
+from skillmentor.serving.admission import AdmissionController, CircuitBreaker
+from skillmentor.serving.warmup import CacheWarmer, top_queries
+
+# Pipeline stages, in the order they run
+PIPELINE_STAGES = [
+    'language_detection',
+    'translation',
+    'keyword_extraction',
+    'precomputed_lookup',
+    'retrieval',
+    'generation',
+    'back_translation',
+    'rendering',
+    'total'
+]
 
 # Configure logging
 logging.basicConfig(
@@ -24,7 +46,24 @@ class SkillMentor:
                  index_path=None, 
                  documents_path=None, 
                  model_name="meta-llama/Llama-2-7b-chat-hf",
-                 device="cpu"):
+                 device="cpu",
+                 translation_cache_path=DEFAULT_CACHE_PATH,
+                 translation_backend='google',
+                 translation_timeout=10.0,
+                 encoder=None,
+                 encoder_onnx_path=None,
+                 index_bundle_root=None,
+                 index_mmap=False,
+                 llm=None,
+                 coalesce_max_waiters=100,
+                 coalesce_timeout=None,
+                 llm_concurrency=1,
+                 llm_queue_size=8,
+                 llm_slo=10.0,
+                 llm_timeout=60.0,
+                 draft_model_name=None,
+                 precomputed_path=None,
+                 precomputed_threshold=0.9):
         """
         Initialize the SkillMentor application
         
@@ -33,14 +72,77 @@ class SkillMentor:
             documents_path (str): Path to the documents file
             model_name (str): HF model name or path to local model
             device (str): Device to run the model on (cpu or cuda)
+            translation_cache_path (str): Path to the persistent translation cache
+                                          (None keeps translations in memory only)
+            translation_backend (str or TranslationBackend): 'google', 'marian', 'fake' or a backend instance
+            translation_timeout (float): Hard deadline per translation call in seconds
+                                         (None for no deadline)
+            encoder (str or Encoder): Document/query encoder name or instance (default: minilm)
+            encoder_onnx_path (str): Directory of an ONNX export of the encoder to run instead of PyTorch
+                                     (with an encoder name; an Encoder instance raises ValueError)
+            index_bundle_root (str): Directory of versioned index bundles; the published
+                                     version is loaded instead of index_path/documents_path
+            index_mmap (bool): Memory-map the index so worker processes share one copy
+            llm (callable): Already constructed LLM to generate advice with, instead of
+                            loading model_name (optional)
+            coalesce_max_waiters (int): Identical concurrent queries allowed to wait on the
+                                        first one's result (0 disables coalescing)
+            coalesce_timeout (float): Seconds a coalesced query waits for that result
+                                      (default: long enough for the first query's
+                                      LLM queueing, LLM call and both translations)
+            llm_concurrency (int): LLM calls allowed to run at once
+            llm_queue_size (int): Queries allowed to wait for the LLM
+            llm_slo (float): Longest wait in seconds for the LLM before serving
+                             degraded (cached or rule-based) advice
+            llm_timeout (float): Seconds to wait for one LLM call (None for no limit);
+                                 repeated timeouts open the circuit breaker
+            draft_model_name (str): Small model sharing model_name's tokenizer for
+                                    speculative decoding (optional)
+            precomputed_path (str): Precomputed advice table for frequent questions
+                                    (see scripts/precompute_advice.py; optional)
+            precomputed_threshold (float): Lowest cosine similarity to a precomputed
+                                           question for its advice to be served
         """
-        self.text_processor = TextProcessor()
-        self.retriever = DocumentRetriever(index_path=index_path, documents_path=documents_path)
-        self.generator = AdviceGenerator(model_name=model_name, device=device)
+        self.latency = LatencyRecorder(stages=PIPELINE_STAGES)
+        if isinstance(translation_backend, str):
+            translation_backend = create_translation_backend(translation_backend, timeout=translation_timeout)
+        self.text_processor = TextProcessor(
+            latency=self.latency,
+            cache=TranslationCache(path=translation_cache_path),
+            backend=translation_backend
+        )
+        if encoder_onnx_path:
+            encoder = create_encoder(encoder, onnx_path=encoder_onnx_path)
+        self.index_bundle_root = index_bundle_root
+        if index_bundle_root:
+            self.retriever = DocumentRetriever(encoder=encoder, mmap=index_mmap)
+            self.retriever.load_bundle(index_bundle_root)
+        else:
+            self.retriever = DocumentRetriever(
+                index_path=index_path, documents_path=documents_path, encoder=encoder, mmap=index_mmap
+            )
+        self.generator = AdviceGenerator(
+            model_name=model_name,
+            device=device,
+            llm=llm,
+            admission=AdmissionController(max_concurrency=llm_concurrency, max_queue=llm_queue_size, slo=llm_slo),
+            breaker=CircuitBreaker(),
+            timeout=llm_timeout,
+            draft_model_name=draft_model_name
+        )
         self.dashboard = Dashboard()
+        if coalesce_timeout is None and llm_timeout is not None and translation_timeout is not None:
+            # A waiter must not give up while the query it waits for is still within its deadlines
+            coalesce_timeout = llm_slo + llm_timeout + 2 * translation_timeout
+        self.singleflight = (
+            SingleFlight(max_waiters=coalesce_max_waiters, timeout=coalesce_timeout) if coalesce_max_waiters else None
+        )
+        self.warmer = None
+        self.precomputed = None
+        if precomputed_path and os.path.exists(precomputed_path):
+            self.precomputed = self._load_precomputed(precomputed_path, precomputed_threshold)
         
         self.metrics = {
-            'response_times': [],
             'query_types': {},
             'bleu_scores': {},
             'user_feedback': []
@@ -54,7 +156,7 @@ class SkillMentor:
         
         Args:
             query (str): User's business query
-            source_lang (str): Source language code
+            source_lang (str): Source language code ('auto' to rely on detection)
             
         Returns:
             dict: Response information
@@ -62,37 +164,81 @@ class SkillMentor:
                 - processed_query: The processed query (translated if needed)
                 - advice: Generated business advice
                 - advice_source_lang: Advice in the source language
+                - source_lang: Language the query was treated as
+                - detection_confidence: Confidence of the local language detection
                 - dashboard_image: Base64 encoded dashboard image
                 - response_time: Time taken to generate response
+                - degraded: Whether the advice is cached or rule-based instead of from the LLM
+                - degraded_reason: Why the LLM was skipped (None if it answered)
+                - precomputed: Whether the advice came from the precomputed table
+                - coalesced: Whether the result was shared from an identical query in flight
+                
+        A query that cannot wait on an identical one, because too many
+        copies already wait or it did not finish in time, runs on its own;
+        the LLM's admission control still bounds how many of those reach it.
         """
-        start_time = time.time()
+        if self.singleflight is None:
+            return dict(self._process_query(query, source_lang), coalesced=False)
+        
+        # Identical queries arriving together (e.g. after an SMS campaign) wait
+        # for the first one instead of each running translation, retrieval and the LLM
+        key = (query_hash(query), source_lang)
+        try:
+            result, shared = self.singleflight.do(key, lambda: self._process_query(query, source_lang))
+        except (TooManyWaiters, TimeoutError) as e:
+            logging.warning(f"Not coalescing query ({str(e)}), processing it separately")
+            result, shared = self._process_query(query, source_lang), False
+        return dict(result, original_query=query, coalesced=shared)
+    
+    def _process_query(self, query, source_lang):
+        """Run the pipeline for one query (see process_query)"""
+        start_time = time.perf_counter()
         
         # Process the input text
         processed_input = self.text_processor.process_input(query, source_lang)
+        source_lang = processed_input['source_lang']
         
-        # Retrieve relevant documents
         processed_query = processed_input['processed_text']
-        relevant_docs = self.retriever.retrieve(processed_query, k=3)
         
-        # Generate advice
-        advice = self.generator.generate_advice(processed_query, relevant_docs)
+        # Frequent questions are answered from the precomputed table
+        precomputed = None
+        if self.precomputed is not None:
+            with self.latency.span('precomputed_lookup'):
+                # The embedding is cached, so retrieval reuses it on a miss
+                precomputed = self.precomputed.match(self.retriever.embed_query(processed_query), source_lang)
+        
+        if precomputed is not None:
+            query_type = precomputed['category']
+            advice, degraded_reason = precomputed['advice'], None
+        else:
+            # Retrieve relevant documents
+            # Classify the query first so retrieval can search its category only
+            query_type = self._classify_query(processed_query)
+            with self.latency.span('retrieval'):
+                relevant_docs = self.retriever.retrieve(processed_query, k=3, category=query_type)
+            
+            # Generate advice
+            with self.latency.span('generation'):
+                advice, degraded_reason = self.generator.generate(processed_query, relevant_docs, category=query_type)
         
         # Translate advice back to source language if needed
         advice_source_lang = advice
         if source_lang != 'en':
-            advice_source_lang = self.text_processor.translate_to_source(advice, source_lang)
+            if precomputed is not None and precomputed['advice_source_lang'] is not None:
+                advice_source_lang = precomputed['advice_source_lang']
+            else:
+                with self.latency.span('back_translation'):
+                    advice_source_lang = self.text_processor.translate_to_source(advice, source_lang)
         
         # Generate dashboard visualization
-        dashboard_image = self.dashboard.generate_full_dashboard()
+        with self.latency.span('rendering'):
+            dashboard_image = self.dashboard.generate_full_dashboard()
         
         # Calculate response time
-        response_time = time.time() - start_time
-        
-        # Update metrics
-        self.metrics['response_times'].append(response_time)
+        response_time = time.perf_counter() - start_time
+        self.latency.record('total', response_time)
         
-        # Determine query type for metrics (simple keyword-based classification)
-        query_type = self._classify_query(processed_query)
+        # Record the query type for metrics
         if query_type in self.metrics['query_types']:
             self.metrics['query_types'][query_type] += 1
         else:
@@ -106,10 +252,189 @@ class SkillMentor:
             'processed_query': processed_query,
             'advice': advice,
             'advice_source_lang': advice_source_lang,
+            'source_lang': source_lang,
+            'detection_confidence': processed_input['detection_confidence'],
             'dashboard_image': dashboard_image,
-            'response_time': response_time
+            'response_time': response_time,
+            'degraded': degraded_reason is not None,
+            'degraded_reason': degraded_reason,
+            'precomputed': precomputed is not None
         }
     
+    def process_batch(self, queries, source_lang='en', record=True):
+        """
+        Process many queries, retrieving documents for all of them at once
+        
+        Queries are encoded in one call and matched against the precomputed
+        table, and those it does not answer are searched together; advice
+        is still generated per query. No dashboard is rendered, and the
+        lookup, retrieval and total latencies recorded per query are the
+        batch time divided by the number of queries.
+        
+        Args:
+            queries (list): User queries
+            source_lang (str): Source language code of every query ('auto' to rely on detection)
+            record (bool): Record latencies and query types in the metrics
+                           (False for cache warm-up)
+                           
+        Returns:
+            list: One dict per query with the fields of process_query() except
+                  dashboard_image and coalesced, plus query_type
+        """
+        if not queries:
+            return []
+        start_time = time.perf_counter()
+        
+        processed_inputs = [self.text_processor.process_input(query, source_lang) for query in queries]
+        processed_queries = [processed['processed_text'] for processed in processed_inputs]
+        
+        # Frequent questions are answered from the precomputed table
+        precomputed = [None] * len(queries)
+        if self.precomputed is not None:
+            lookup_start = time.perf_counter()
+            # The embeddings are cached, so retrieval reuses them for the misses
+            embeddings = self.retriever.embed_queries(processed_queries)
+            precomputed = [
+                self.precomputed.match(embedding, processed['source_lang'])
+                for embedding, processed in zip(embeddings, processed_inputs)
+            ]
+            if record:
+                lookup_time = (time.perf_counter() - lookup_start) / len(queries)
+                for _ in queries:
+                    self.latency.record('precomputed_lookup', lookup_time)
+        
+        misses = [i for i, match in enumerate(precomputed) if match is None]
+        query_types = [match['category'] if match is not None else None for match in precomputed]
+        advice = [match['advice'] if match is not None else None for match in precomputed]
+        degraded_reasons = [None] * len(queries)
+        for i in misses:
+            query_types[i] = self._classify_query(processed_queries[i])
+        
+        if misses:
+            retrieval_start = time.perf_counter()
+            relevant_docs = self.retriever.retrieve_batch(
+                [processed_queries[i] for i in misses], k=3, categories=[query_types[i] for i in misses]
+            )
+            retrieval_time = (time.perf_counter() - retrieval_start) / len(misses)
+            
+            for i, docs in zip(misses, relevant_docs):
+                generation_start = time.perf_counter()
+                advice[i], degraded_reasons[i] = self.generator.generate(processed_queries[i], docs, category=query_types[i])
+                if record:
+                    self.latency.record('retrieval', retrieval_time)
+                    self.latency.record('generation', time.perf_counter() - generation_start)
+        
+        # Translate advice back, one batch per source language, unless precomputed
+        advice_source_lang = list(advice)
+        for i, match in enumerate(precomputed):
+            if match is not None and match['advice_source_lang'] is not None:
+                advice_source_lang[i] = match['advice_source_lang']
+        languages = {processed['source_lang'] for processed in processed_inputs} - {'en'}
+        for lang in languages:
+            positions = [
+                i for i, processed in enumerate(processed_inputs)
+                if processed['source_lang'] == lang and (precomputed[i] is None or precomputed[i]['advice_source_lang'] is None)
+            ]
+            if not positions:
+                continue
+            translation_start = time.perf_counter()
+            translations = self.text_processor.translate_batch([advice[i] for i in positions], dest=lang, src='en')
+            if record:
+                self.latency.record('back_translation', time.perf_counter() - translation_start)
+            for i, translation in zip(positions, translations):
+                advice_source_lang[i] = translation
+        
+        response_time = (time.perf_counter() - start_time) / len(queries)
+        results = []
+        for i, query in enumerate(queries):
+            if record:
+                self.latency.record('total', response_time)
+                self.metrics['query_types'][query_types[i]] = self.metrics['query_types'].get(query_types[i], 0) + 1
+            results.append({
+                'original_query': query,
+                'processed_query': processed_queries[i],
+                'advice': advice[i],
+                'advice_source_lang': advice_source_lang[i],
+                'source_lang': processed_inputs[i]['source_lang'],
+                'detection_confidence': processed_inputs[i]['detection_confidence'],
+                'query_type': query_types[i],
+                'response_time': response_time,
+                'degraded': degraded_reasons[i] is not None,
+                'degraded_reason': degraded_reasons[i],
+                'precomputed': precomputed[i] is not None
+            })
+        
+        logging.info(f"Generated advice for {len(queries)} queries in {response_time * len(queries):.2f} seconds")
+        return results
+    
+    def _load_precomputed(self, path, threshold):
+        """
+        Load the precomputed advice table if it was built with the retriever's encoder
+        
+        Returns:
+            PrecomputedAdvice: The table, or None if it cannot be used
+        """
+        try:
+            table = PrecomputedAdvice.load(path, threshold=threshold)
+        except Exception as e:
+            logging.error(f"Error loading precomputed advice from {path}: {str(e)}")
+            return None
+        
+        expected = self.retriever.encoder.metadata()
+        built_with = {key: table.encoder.get(key) for key in ('encoder', 'dimension')}
+        if built_with != {key: expected[key] for key in ('encoder', 'dimension')}:
+            logging.error(f"Precomputed advice in {path} was built with encoder {built_with}, "
+                          f"not {expected['encoder']} ({expected['dimension']} dimensions); not using it")
+            return None
+        return table
+    
+    def start_warmup(self, records, n=100, **kwargs):
+        """
+        Warm the caches with the most frequent recorded queries in the background
+        
+        Each query goes through translation, encoding, retrieval, generation
+        and back-translation without being recorded in the metrics, filling
+        the translation, embedding, retrieval and advice caches. Warming
+        waits while live queries are being processed.
+        
+        Args:
+            records (iterable): Recorded advice requests (e.g. the event store's
+                                advice_requests log)
+            n (int): Number of most frequent queries to warm
+            **kwargs: Further arguments for CacheWarmer (batch_size, pause, ready_fraction, ...)
+            
+        Returns:
+            CacheWarmer: The running warmer (also kept as self.warmer)
+        """
+        self.warmer = CacheWarmer(self._warm, top_queries(records, n), idle=self._idle, **kwargs)
+        self.warmer.start()
+        return self.warmer
+    
+    def _warm(self, batch):
+        """Run a warm-up batch of (query, source_lang) pairs, one process_batch per language"""
+        by_lang = {}
+        for query, source_lang in batch:
+            by_lang.setdefault(source_lang, []).append(query)
+        for source_lang, queries in by_lang.items():
+            self.process_batch(queries, source_lang, record=False)
+    
+    def _idle(self):
+        """Whether no live query is using the LLM or waiting on an identical one"""
+        admission = self.generator.admission.stats() if self.generator.admission else {'running': 0, 'queued': 0}
+        in_flight = self.singleflight.in_flight() if self.singleflight else 0
+        return not (admission['running'] or admission['queued'] or in_flight)
+    
+    def readiness(self):
+        """
+        Get the readiness of the application to take traffic
+        
+        Returns:
+            dict: Cache warm-up status (see CacheWarmer.status); ready without a warm-up
+        """
+        if self.warmer is None:
+            return {'state': 'disabled', 'ready': True}
+        return self.warmer.status()
+    
     def _classify_query(self, query):
         """
         Simple keyword-based query classification
@@ -162,16 +487,22 @@ class SkillMentor:
         Returns:
             dict: Performance metrics
         """
-        if not self.metrics['response_times']:
+        total = self.latency.histogram('total')
+        if not total.count:
             return {
                 'avg_response_time': 0,
                 'num_queries': 0,
                 'query_distribution': {},
-                'avg_user_rating': 0
+                'avg_user_rating': 0,
+                'stage_latencies': {},
+                'retrieval_cache': self.retriever.cache_stats(),
+                'coalescing': self.singleflight.stats() if self.singleflight else {},
+                'generation': self.generator.stats(),
+                'precomputed': self.precomputed.stats() if self.precomputed else {}
             }
         
-        avg_response_time = sum(self.metrics['response_times']) / len(self.metrics['response_times'])
-        num_queries = len(self.metrics['response_times'])
+        avg_response_time = total.mean()
+        num_queries = total.count
         
         # Calculate average user rating
         ratings = [feedback['rating'] for feedback in self.metrics['user_feedback']]
@@ -181,9 +512,46 @@ class SkillMentor:
             'avg_response_time': avg_response_time,
             'num_queries': num_queries,
             'query_distribution': self.metrics['query_types'],
-            'avg_user_rating': avg_user_rating
+            'avg_user_rating': avg_user_rating,
+            'stage_latencies': self.latency.snapshot(),
+            'retrieval_cache': self.retriever.cache_stats(),
+            'coalescing': self.singleflight.stats() if self.singleflight else {},
+            'generation': self.generator.stats(),
+            'precomputed': self.precomputed.stats() if self.precomputed else {}
         }
     
+    def prometheus_metrics(self):
+        """
+        Export the pipeline stage latencies in the Prometheus text format
+        
+        Serve the result from a scrape endpoint with the mimetype
+        'text/plain; version=0.0.4', like simple_app's /metrics/prometheus.
+        
+        Returns:
+            str: Metrics text, one summary series per stage in PIPELINE_STAGES
+        """
+        return self.latency.to_prometheus()
+    
+    def reload_index(self, version=None):
+        """
+        Hot-swap the document index to another bundle version
+        
+        The new version is loaded in the background; queries keep using
+        the current one until it is ready.
+        
+        Args:
+            version (str): Version to load (default: the published one, if it changed)
+            
+        Returns:
+            threading.Thread: The loading thread, or None if there is nothing to load
+        """
+        if not self.index_bundle_root:
+            logging.error("No index bundle root configured")
+            return None
+        if version:
+            return self.retriever.swap_bundle(self.index_bundle_root, version)
+        return self.retriever.refresh(self.index_bundle_root)
+    
     def initialize_dataset(self, documents, save_index_path=None, save_documents_path=None):
         """
         Initialize the dataset and create index
@@ -204,10 +572,10 @@ class SkillMentor:
             try:
                 with open(save_documents_path, 'w', encoding='utf-8') as f:
                     for doc in documents:
-                        f.write(doc + '\n')
+                        f.write(doc.strip() + DOCUMENT_SEPARATOR)
                 logging.info(f"Documents saved to {save_documents_path}")
             except Exception as e:
                 logging.error(f"Error saving documents: {str(e)}")
                 return False
         
-        return success 
\ No newline at end of file
+        return success 
@@ -0,0 +1,3 @@
+"""
+Monitoring module for latency instrumentation and metrics export
+"""
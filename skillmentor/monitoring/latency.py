@@ -0,0 +1,241 @@
+"""
+Low-overhead per-stage latency histograms
+"""
+import time
+import threading
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of durations with log-linear buckets.
+
+    Values are recorded in whole microseconds. Below 2**precision_bits
+    every microsecond has its own bucket; above that each power of two is
+    split into 2**(precision_bits - 1) buckets, so the relative error of
+    any reported value stays below 1 / 2**(precision_bits - 1).
+    """
+
+    def __init__(self, precision_bits=7, max_seconds=3600):
+        """
+        Initialize the histogram
+
+        Args:
+            precision_bits (int): Bits of precision per power of two
+            max_seconds (float): Largest trackable duration; longer ones are clamped
+        """
+        self.precision_bits = precision_bits
+        self._sub_count = 1 << precision_bits
+        self._half_count = self._sub_count >> 1
+        self.max_value = int(max_seconds * 1e6)
+        self._counts = [0] * (self._index(self.max_value) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def _index(self, value):
+        """Bucket index for a value in microseconds"""
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        mantissa = value >> shift
+        return self._sub_count + (shift - 1) * self._half_count + (mantissa - self._half_count)
+
+    def _value(self, index):
+        """Midpoint (in microseconds) of the values mapped to a bucket"""
+        if index < self._sub_count:
+            return index
+        shift = (index - self._sub_count) // self._half_count + 1
+        mantissa = (index - self._sub_count) % self._half_count + self._half_count
+        low = mantissa << shift
+        return low + ((1 << shift) - 1) / 2
+
+    def record(self, seconds):
+        """
+        Record a duration
+
+        Args:
+            seconds (float): Duration in seconds
+        """
+        value = min(max(int(seconds * 1e6), 0), self.max_value)
+        index = self._index(value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, percent):
+        """
+        Get a percentile of the recorded durations
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: Duration in seconds (0 if nothing was recorded)
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, int(round(percent / 100.0 * self.count)))
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= target:
+                    return min(self._value(index), self.max) / 1e6
+            return self.max / 1e6
+
+    def mean(self):
+        """Get the mean duration in seconds"""
+        with self._lock:
+            return self.total / self.count / 1e6 if self.count else 0.0
+
+    def summary(self):
+        """
+        Summarize the recorded durations
+
+        Returns:
+            dict: count, sum, mean, min, max and p50/p90/p95/p99 in seconds
+        """
+        return {
+            'count': self.count,
+            'sum': self.total / 1e6,
+            'mean': self.mean(),
+            'min': (self.min or 0) / 1e6,
+            'max': self.max / 1e6,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99)
+        }
+
+    def reset(self):
+        """Discard all recorded durations"""
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+            self.count = 0
+            self.total = 0
+            self.min = None
+            self.max = 0
+
+
+class Span:
+    """
+    Context manager that times a block with the monotonic clock
+    and records the duration into a stage histogram
+    """
+
+    def __init__(self, recorder, stage):
+        self.recorder = recorder
+        self.stage = stage
+        self.start = None
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.recorder.record(self.stage, self.elapsed)
+        return False
+
+
+class LatencyRecorder:
+    """
+    Collection of per-stage latency histograms
+    """
+
+    def __init__(self, stages=None, precision_bits=7):
+        """
+        Initialize the recorder
+
+        Args:
+            stages (list): Stage names to register up front (keeps export order stable)
+            precision_bits (int): Histogram precision
+        """
+        self.precision_bits = precision_bits
+        self._histograms = {}
+        self._lock = threading.Lock()
+        for stage in stages or []:
+            self.histogram(stage)
+
+    def histogram(self, stage):
+        """
+        Get (or create) the histogram for a stage
+
+        Args:
+            stage (str): Stage name
+
+        Returns:
+            LatencyHistogram: The stage histogram
+        """
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    stage, LatencyHistogram(precision_bits=self.precision_bits)
+                )
+        return histogram
+
+    def record(self, stage, seconds):
+        """
+        Record a duration for a stage
+
+        Args:
+            stage (str): Stage name
+            seconds (float): Duration in seconds
+        """
+        self.histogram(stage).record(seconds)
+
+    def span(self, stage):
+        """
+        Time a block of code
+
+        Example:
+            with recorder.span('retrieval') as span:
+                docs = retriever.retrieve(query)
+            elapsed = span.elapsed
+
+        Args:
+            stage (str): Stage name
+
+        Returns:
+            Span: Context manager recording the block's duration
+        """
+        return Span(self, stage)
+
+    def snapshot(self):
+        """
+        Summarize all stages
+
+        Returns:
+            dict: Stage name -> histogram summary
+        """
+        return {stage: histogram.summary() for stage, histogram in list(self._histograms.items())}
+
+    def to_prometheus(self, name='skillmentor_stage_latency_seconds'):
+        """
+        Export all stages in the Prometheus text exposition format
+
+        Args:
+            name (str): Metric name
+
+        Returns:
+            str: Metrics text
+        """
+        lines = [
+            f"# HELP {name} Latency of SkillMentor pipeline stages in seconds",
+            f"# TYPE {name} summary"
+        ]
+        for stage, summary in self.snapshot().items():
+            for quantile, key in (('0.5', 'p50'), ('0.9', 'p90'), ('0.95', 'p95'), ('0.99', 'p99')):
+                lines.append(f'{name}{{stage="{stage}",quantile="{quantile}"}} {summary[key]:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {summary["sum"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {summary["count"]}')
+        return "\n".join(lines) + "\n"
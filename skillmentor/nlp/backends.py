@@ -0,0 +1,278 @@
+"""
+Translation backends for SkillMentor
+"""
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+class TranslationError(Exception):
+    """
+    Raised when a backend cannot translate a batch
+    """
+
+class TranslationBackend:
+    """
+    Interface for translation backends.
+    
+    A backend translates a batch of texts from one language to another
+    and raises TranslationError (or any other exception) on failure;
+    callers fall back to the untranslated text.
+    """
+    
+    name = 'base'
+    
+    def translate(self, texts, dest, src='auto'):
+        """
+        Translate a batch of texts
+        
+        Args:
+            texts (list): Texts to translate
+            dest (str): Target language code
+            src (str): Source language code (default: auto-detect)
+            
+        Returns:
+            list: Translations in input order
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        """Release any resources held by the backend"""
+        pass
+
+class GoogleTranslateBackend(TranslationBackend):
+    """
+    Backend using the googletrans web client.
+    
+    One client (and therefore one pooled HTTP connection) is reused for
+    every call. Each request is bounded by `timeout`, and failed calls are
+    retried with exponential backoff as long as the total time spent stays
+    within `budget`.
+    """
+    
+    name = 'google'
+    
+    def __init__(self, timeout=5.0, retries=2, backoff=0.5, budget=10.0):
+        """
+        Initialize the backend
+        
+        Args:
+            timeout (float): Seconds allowed per HTTP request
+            retries (int): Retries after a failed call
+            backoff (float): Seconds to wait before the first retry (doubled after each retry)
+            budget (float): Maximum seconds spent on one batch, including retries
+        """
+        from googletrans import Translator
+        
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.budget = budget
+        self.translator = Translator(timeout=timeout)
+        self._lock = threading.Lock()
+        logging.info(f"Google translation backend initialized (timeout {timeout}s, {retries} retries)")
+    
+    def translate(self, texts, dest, src='auto'):
+        deadline = time.monotonic() + self.budget
+        attempt = 0
+        while True:
+            try:
+                # The underlying HTTP client is shared, so calls are serialized
+                with self._lock:
+                    results = self.translator.translate(list(texts), dest=dest, src=src)
+                return [result.text for result in results]
+            except Exception as e:
+                delay = self.backoff * (2 ** attempt)
+                if attempt >= self.retries or time.monotonic() + delay >= deadline:
+                    raise TranslationError(f"Google translation failed after {attempt + 1} attempts: {str(e)}")
+                logging.warning(f"Translation attempt {attempt + 1} failed, retrying in {delay:.2f}s: {str(e)}")
+                time.sleep(delay)
+                attempt += 1
+    
+    def close(self):
+        client = getattr(self.translator, 'client', None)
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                logging.error(f"Error closing translation client: {str(e)}")
+
+class MarianBackend(TranslationBackend):
+    """
+    Offline backend running MarianMT models (Helsinki-NLP opus-mt) locally.
+    
+    One model is loaded lazily per language pair and kept in memory.
+    Models can be loaded from a local directory so no network access is
+    needed at request time.
+    """
+    
+    name = 'marian'
+    
+    def __init__(self, model_template="Helsinki-NLP/opus-mt-{src}-{dest}", device="cpu", batch_size=16, max_length=512):
+        """
+        Initialize the backend
+        
+        Args:
+            model_template (str): HF model name or local path, formatted with src and dest
+            device (str): Device to run the models on (cpu or cuda)
+            batch_size (int): Texts per generate call
+            max_length (int): Maximum tokens per input and output text
+        """
+        self.model_template = model_template
+        self.device = device
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._models = {}
+        self._lock = threading.Lock()
+        logging.info(f"Marian translation backend initialized ({model_template} on {device})")
+    
+    def _load(self, src, dest):
+        """
+        Load (or reuse) the model for a language pair
+        
+        Args:
+            src (str): Source language code
+            dest (str): Target language code
+            
+        Returns:
+            tuple: (tokenizer, model)
+        """
+        key = (src, dest)
+        with self._lock:
+            if key not in self._models:
+                from transformers import MarianMTModel, MarianTokenizer
+                
+                model_name = self.model_template.format(src=src, dest=dest)
+                logging.info(f"Loading translation model {model_name}")
+                tokenizer = MarianTokenizer.from_pretrained(model_name)
+                model = MarianMTModel.from_pretrained(model_name).to(self.device)
+                model.eval()
+                self._models[key] = (tokenizer, model)
+            return self._models[key]
+    
+    def translate(self, texts, dest, src='auto'):
+        if src == 'auto':
+            raise TranslationError("MarianBackend needs an explicit source language")
+        
+        import torch
+        
+        tokenizer, model = self._load(src, dest)
+        translations = []
+        for i in range(0, len(texts), self.batch_size):
+            batch = list(texts[i:i + self.batch_size])
+            inputs = tokenizer(batch, return_tensors="pt", padding=True, truncation=True, max_length=self.max_length)
+            inputs = {name: tensor.to(self.device) for name, tensor in inputs.items()}
+            with torch.no_grad():
+                outputs = model.generate(**inputs, max_length=self.max_length)
+            translations.extend(tokenizer.batch_decode(outputs, skip_special_tokens=True))
+        return translations
+    
+    def close(self):
+        with self._lock:
+            self._models.clear()
+
+class FakeBackend(TranslationBackend):
+    """
+    Deterministic backend for benchmarks and offline development.
+    
+    Texts are "translated" by tagging them with the target language.
+    Latency and failures can be simulated; failures are drawn from a
+    seeded generator so runs are reproducible.
+    """
+    
+    name = 'fake'
+    
+    def __init__(self, latency=0.0, per_text_latency=0.0, failure_rate=0.0, seed=0):
+        """
+        Initialize the backend
+        
+        Args:
+            latency (float): Simulated seconds per call
+            per_text_latency (float): Additional simulated seconds per text
+            failure_rate (float): Probability that a call fails
+            seed (int): Seed for the failure generator
+        """
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.texts = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def translate(self, texts, dest, src='auto'):
+        with self._lock:
+            self.calls += 1
+            self.texts += len(texts)
+            failed = self._random.random() < self.failure_rate
+        
+        delay = self.latency + self.per_text_latency * len(texts)
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise TranslationError("Simulated translation failure")
+        return [f"[{dest}] {text}" for text in texts]
+
+class DeadlineBackend(TranslationBackend):
+    """
+    Wrapper that puts a hard deadline on any backend.
+    
+    Calls run on a small worker pool; if the wrapped backend does not
+    answer within `timeout` seconds the caller gets a TranslationError
+    immediately and the late result is discarded.
+    """
+    
+    def __init__(self, backend, timeout=5.0, max_workers=4):
+        """
+        Initialize the wrapper
+        
+        Args:
+            backend (TranslationBackend): Backend to wrap
+            timeout (float): Maximum seconds to wait for a batch
+            max_workers (int): Maximum concurrent calls to the wrapped backend
+        """
+        self.backend = backend
+        self.timeout = timeout
+        self.name = backend.name
+        self.timeouts = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translation')
+    
+    def translate(self, texts, dest, src='auto'):
+        future = self._executor.submit(self.backend.translate, texts, dest, src)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self.timeouts += 1
+            raise TranslationError(f"{self.name} translation timed out after {self.timeout}s")
+    
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.backend.close()
+
+# Available backends by name
+BACKENDS = {
+    'google': GoogleTranslateBackend,
+    'marian': MarianBackend,
+    'fake': FakeBackend
+}
+
+def create_translation_backend(name='google', timeout=None, **kwargs):
+    """
+    Create a translation backend by name
+    
+    Args:
+        name (str): Backend name ('google', 'marian' or 'fake')
+        timeout (float): Hard deadline per batch (None for no deadline)
+        **kwargs: Arguments for the backend class
+        
+    Returns:
+        TranslationBackend: The backend
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translation backend '{name}' (available: {', '.join(BACKENDS)})")
+    
+    backend = BACKENDS[name](**kwargs)
+    if timeout is not None:
+        backend = DeadlineBackend(backend, timeout=timeout)
+    return backend
@@ -0,0 +1,180 @@
+"""
+Fast local language identification for SkillMentor queries
+"""
+import math
+import logging
+from collections import Counter
+
+# Seed text per language for the character trigram profiles. Romanized
+# Hindi ('hi') covers queries typed in Latin script; Devanagari text is
+# recognized from its script alone.
+SEED_TEXTS = {
+    'en': (
+        "How should I price my handmade products? What are good marketing strategies for a small shop? "
+        "I want to sell more of my goods at the local market and find new customers. "
+        "How can I reduce production costs and improve the quality of my work? "
+        "My business makes furniture, clothes, baskets, pottery and food for the people in my town. "
+        "What is the best way to grow my business, save money and manage cash flow during the slow season? "
+        "Should I use social media to show my work and talk with customers? "
+        "Which sustainable practices can help the environment and also lower my costs? "
+        "Where can I get a loan to buy new tools and materials for the business? "
+        "The price of raw materials is going up and my profit is getting smaller every month. "
+        "I need advice about the cost of labor, the right profit margin and how much to charge."
+    ),
+    'sw': (
+        "Ninawezaje kuweka bei ya bidhaa zangu za mikono? Ni mbinu gani nzuri za masoko kwa duka dogo? "
+        "Nataka kuuza bidhaa zaidi sokoni na kupata wateja wapya katika mji wangu. "
+        "Ninawezaje kupunguza gharama za uzalishaji na kuboresha ubora wa kazi yangu? "
+        "Biashara yangu inatengeneza samani, nguo, vikapu, vyungu na chakula kwa watu wa kijiji. "
+        "Njia bora ya kukuza biashara yangu ni ipi, na nitawezaje kuweka akiba ya pesa wakati wa msimu mbaya? "
+        "Je, nitumie mitandao ya kijamii kuonyesha kazi yangu na kuzungumza na wateja? "
+        "Ni mbinu zipi endelevu zinazoweza kusaidia mazingira na pia kupunguza gharama zangu? "
+        "Ninaweza kupata mkopo wapi ili kununua zana na malighafi mpya kwa ajili ya biashara? "
+        "Bei ya malighafi inapanda na faida yangu inazidi kupungua kila mwezi. "
+        "Nahitaji ushauri kuhusu gharama ya kazi, kiwango sahihi cha faida na kiasi gani cha kutoza."
+    ),
+    'hi': (
+        "Main apne haath se bane saamaan ki keemat kaise tay karun? Chhoti dukaan ke liye achhi marketing kya hai? "
+        "Mujhe local bazaar mein zyada maal bechna hai aur naye graahak dhoondhne hain. "
+        "Main utpadan ki laagat kaise kam karun aur apne kaam ki quality kaise sudhaarun? "
+        "Mera vyapaar furniture, kapde, tokri, mitti ke bartan aur khaana banata hai gaon ke logon ke liye. "
+        "Apna dhandha badhane ka sabse achha tarika kya hai, aur mandi ke samay mein paise kaise bachaun? "
+        "Kya mujhe apna kaam dikhane aur graahakon se baat karne ke liye social media ka istemaal karna chahiye? "
+        "Kaun se tareeke paryavaran ki madad karte hain aur meri laagat bhi kam karte hain? "
+        "Naye auzaar aur kachcha maal kharidne ke liye mujhe karz kahan se mil sakta hai? "
+        "Kachche maal ka daam badh raha hai aur mera munafa har mahine kam ho raha hai. "
+        "Mujhe majdoori ki laagat, sahi munafe aur kitna paisa lena chahiye is baare mein salah chahiye."
+    )
+}
+
+# Unicode blocks that identify a language on their own
+SCRIPT_RANGES = (
+    ('hi', 0x0900, 0x097F),  # Devanagari
+)
+
+def _trigrams(text):
+    """
+    Split text into padded, lowercased character trigrams
+    
+    Args:
+        text (str): Input text
+        
+    Returns:
+        list: Trigrams, with word boundaries marked by spaces
+    """
+    grams = []
+    for word in text.lower().split():
+        word = ''.join(ch for ch in word if ch.isalpha())
+        if not word:
+            continue
+        padded = f" {word} "
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class LanguageIdentifier:
+    """
+    Character trigram language identifier.
+    
+    Text in a distinctive script (e.g. Devanagari) is identified from its
+    characters alone. Latin-script text is scored with a naive Bayes model
+    over character trigrams learned from small seed texts, which takes a
+    few tens of microseconds per query and needs no network access.
+    """
+    
+    def __init__(self, seed_texts=None, threshold=0.8, min_trigrams=12, sharpness=5.0):
+        """
+        Initialize the identifier
+        
+        Args:
+            seed_texts (dict): Language code -> training text (default: SEED_TEXTS)
+            threshold (float): Minimum confidence for a detection to be trusted
+            min_trigrams (int): Number of trigrams needed for full confidence;
+                                shorter texts get proportionally less
+            sharpness (float): Scale of the mean per-trigram log-likelihood gap
+                               when turning scores into a confidence
+        """
+        seed_texts = seed_texts or SEED_TEXTS
+        self.threshold = threshold
+        self.min_trigrams = min_trigrams
+        self.sharpness = sharpness
+        self.languages = list(seed_texts)
+        
+        counts = {lang: Counter(_trigrams(text)) for lang, text in seed_texts.items()}
+        vocabulary = set()
+        for lang_counts in counts.values():
+            vocabulary.update(lang_counts)
+        
+        # One lookup per trigram yields the log-probabilities for every language
+        self._unseen = []
+        self._log_probs = {gram: [] for gram in vocabulary}
+        for lang in self.languages:
+            total = sum(counts[lang].values()) + len(vocabulary) + 1
+            self._unseen.append(math.log(1.0 / total))
+            for gram in vocabulary:
+                self._log_probs[gram].append(math.log((counts[lang][gram] + 1.0) / total))
+        logging.info(f"LanguageIdentifier initialized for {', '.join(self.languages)}")
+    
+    def _script_language(self, text):
+        """
+        Identify text by its script
+        
+        Args:
+            text (str): Input text
+            
+        Returns:
+            tuple: (language code, share of letters in that script), or (None, 0.0)
+        """
+        letters = 0
+        in_script = Counter()
+        for ch in text:
+            if not ch.isalpha():
+                continue
+            letters += 1
+            code = ord(ch)
+            if code < 0x0250:
+                continue
+            for lang, low, high in SCRIPT_RANGES:
+                if low <= code <= high:
+                    in_script[lang] += 1
+                    break
+        
+        if not letters or not in_script:
+            return None, 0.0
+        lang, count = in_script.most_common(1)[0]
+        return lang, count / letters
+    
+    def detect(self, text):
+        """
+        Identify the language of a text
+        
+        Args:
+            text (str): Input text
+            
+        Returns:
+            tuple: (language code, confidence between 0 and 1)
+        """
+        lang, share = self._script_language(text)
+        if lang is not None and share >= 0.5:
+            return lang, share
+        
+        grams = _trigrams(text)
+        if not grams:
+            return 'en', 0.0
+        
+        scores = [0.0] * len(self.languages)
+        for gram in grams:
+            log_probs = self._log_probs.get(gram, self._unseen)
+            for i, log_prob in enumerate(log_probs):
+                scores[i] += log_prob
+        
+        # Softmax over the mean per-trigram scores, damped for short texts
+        # so that a couple of trigrams cannot produce a near-certain detection
+        weight = self.sharpness * min(len(grams), self.min_trigrams) / self.min_trigrams
+        best = max(scores)
+        exps = [math.exp((score - best) / len(grams) * weight) for score in scores]
+        index = scores.index(best)
+        return self.languages[index], exps[index] / sum(exps)
+    
+    def is_confident(self, confidence):
+        """Check whether a detection confidence clears the threshold"""
+        return confidence >= self.threshold
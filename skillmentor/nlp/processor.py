@@ -1,16 +1,12 @@
 """
 Text processing utilities for SkillMentor
 """
-import nltk
-from nltk.tokenize import word_tokenize
-from googletrans import Translator
 import logging
-
-# Ensure NLTK data is downloaded
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+from skillmentor.monitoring.latency import LatencyRecorder
+from skillmentor.nlp.translation import TranslationCache
+from skillmentor.nlp.backends import TranslationBackend, create_translation_backend
+from skillmentor.nlp.langid import LanguageIdentifier
+from skillmentor.nlp.tokenizer import tokenize, extract_keywords
 
 class TextProcessor:
     """
@@ -18,27 +14,80 @@ class TextProcessor:
     including multilingual support
     """
     
-    def __init__(self):
-        """Initialize the text processor with translator"""
-        self.translator = Translator()
+    def __init__(self, latency=None, cache=None, backend='google', identifier=None):
+        """
+        Initialize the text processor with translator
+        
+        Args:
+            latency (LatencyRecorder): Recorder for per-stage latencies
+            cache (TranslationCache): Translation cache (default: in-memory only)
+            backend (TranslationBackend or str): Translation backend, or the name
+                                                 of one ('google', 'marian' or 'fake')
+            identifier (LanguageIdentifier): Local language identifier
+        """
+        if not isinstance(backend, TranslationBackend):
+            backend = create_translation_backend(backend)
+        self.backend = backend
+        self.identifier = identifier or LanguageIdentifier()
+        self.latency = latency or LatencyRecorder()
+        self.cache = cache or TranslationCache()
         logging.info("TextProcessor initialized")
     
+    def translate_batch(self, texts, dest, src='auto'):
+        """
+        Translate many texts, serving repeated texts from the cache and
+        sending all cache misses to the translator in a single call
+        
+        Args:
+            texts (list): Texts to translate
+            dest (str): Target language code
+            src (str): Source language code (default: auto-detect)
+            
+        Returns:
+            list: Translations in input order (the original text where translation failed)
+        """
+        if not texts:
+            return []
+        
+        translations = self.cache.get_many(texts, src, dest)
+        missing = list(dict.fromkeys(text for text in texts if text not in translations))
+        
+        if missing:
+            try:
+                results = self.backend.translate(missing, dest=dest, src=src)
+                translated = dict(zip(missing, results))
+                self.cache.put_many(translated, src, dest)
+                translations.update(translated)
+                logging.info(f"Translated {len(missing)} texts to {dest} with {self.backend.name} ({len(texts) - len(missing)} cached)")
+            except Exception as e:
+                logging.error(f"Translation error ({self.backend.name}): {str(e)}")
+        
+        return [translations.get(text, text) for text in texts]
+    
     def process_input(self, text, source_lang='en'):
         """
         Process input text:
-        1. Translate non-English text to English if needed
-        2. Tokenize and normalize the text
+        1. Identify the language of the text
+        2. Translate non-English text to English if needed
+        3. Tokenize and normalize the text
+        
+        A confident local detection overrides the provided source language,
+        so English text flagged as another language is not translated.
         
         Args:
             text (str): The input text query
-            source_lang (str): The source language code (default: 'en')
+            source_lang (str): The source language code (default: 'en', or 'auto')
             
         Returns:
             dict: Processed text information
                 - original_text: The original input text
                 - processed_text: The processed text (translated if needed)
                 - tokens: List of tokens
+                - keywords: Keywords for categorization (stopwords removed)
                 - source_lang: The detected or provided source language
+                - detected_lang: The locally detected language
+                - detection_confidence: Confidence of the detection (0-1)
+                - translated: Whether the text was sent for translation
         """
         if not text or not isinstance(text, str):
             raise ValueError("Input text must be a non-empty string")
@@ -46,27 +95,38 @@ class TextProcessor:
         original_text = text
         processed_text = text
         
+        # Identify the language locally before paying for a translation
+        with self.latency.span('language_detection'):
+            detected_lang, confidence = self.identifier.detect(text)
+        
+        translate_src = source_lang
+        if self.identifier.is_confident(confidence):
+            source_lang = translate_src = detected_lang
+        elif source_lang == 'auto':
+            # Let the backend detect the language; the local guess is only
+            # used to pick the language of the answer
+            source_lang = detected_lang
+        
         # Translate text if not in English
-        if source_lang != 'en':
-            try:
-                translation = self.translator.translate(text, dest='en')
-                processed_text = translation.text
-                # Update source language in case it was auto-detected
-                source_lang = translation.src
-                logging.info(f"Translated text from {source_lang} to English")
-            except Exception as e:
-                logging.error(f"Translation error: {str(e)}")
-                # Continue with original text if translation fails
-                processed_text = text
+        translated = source_lang != 'en'
+        if translated:
+            with self.latency.span('translation'):
+                processed_text = self.translate_batch([text], dest='en', src=translate_src)[0]
         
         # Tokenize the text
-        tokens = word_tokenize(processed_text.lower())
+        with self.latency.span('keyword_extraction'):
+            tokens = tokenize(processed_text)
+            keywords = extract_keywords(processed_text)
         
         return {
             "original_text": original_text,
             "processed_text": processed_text,
             "tokens": tokens,
-            "source_lang": source_lang
+            "keywords": keywords,
+            "source_lang": source_lang,
+            "detected_lang": detected_lang,
+            "detection_confidence": confidence,
+            "translated": translated
         }
     
     def translate_to_source(self, text, target_lang):
@@ -83,9 +143,23 @@ class TextProcessor:
         if target_lang == 'en':
             return text
         
-        try:
-            translation = self.translator.translate(text, dest=target_lang)
-            return translation.text
-        except Exception as e:
-            logging.error(f"Translation error: {str(e)}")
-            return text 
\ No newline at end of file
+        return self.translate_batch([text], dest=target_lang, src='en')[0]
+    
+    def pretranslate(self, texts, languages):
+        """
+        Fill the cache with translations of a fixed set of English texts
+        
+        Args:
+            texts (list): English texts (e.g. the static advice pool)
+            languages (list): Target language codes
+            
+        Returns:
+            dict: Language code -> number of texts translated
+        """
+        counts = {}
+        for lang in languages:
+            if lang == 'en':
+                continue
+            self.translate_batch(list(texts), dest=lang, src='en')
+            counts[lang] = len(self.cache.get_many(list(texts), 'en', lang))
+        return counts
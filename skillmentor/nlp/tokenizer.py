@@ -0,0 +1,72 @@
+"""
+Regex tokenizer shared by the SkillMentor text pipelines
+
+Everything here is built from precompiled patterns and static tables,
+so importing the module never loads or downloads tokenizer data.
+"""
+import re
+import hashlib
+
+# Precompiled patterns
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+KEY_TERM_PATTERN = re.compile(r'\b\w{4,}\b')
+
+# Word tokens in the style of nltk's word_tokenize: decimal numbers stay
+# whole, contractions are split ("don't" -> "do", "n't"; "it's" -> "it", "'s")
+# and every other punctuation mark is its own token
+TOKEN_PATTERN = re.compile(
+    r"\d+(?:[.,]\d+)+"
+    r"|\w+(?=n't\b)|n't\b"
+    r"|'(?:s|m|d|ll|re|ve)\b"
+    r"|\w+"
+    r"|\.\.\.|[^\w\s]"
+)
+
+# Common stopwords removed during keyword extraction
+STOPWORDS = frozenset({
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours',
+    'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers',
+    'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves',
+    'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does',
+    'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until',
+    'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 'into',
+    'through', 'during', 'before', 'after', 'above', 'below', 'to', 'from', 'up', 'down',
+    'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here',
+    'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more',
+    'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so',
+    'than', 'too', 'very', 's', 't', 'can', 'will', 'just', 'don', 'should', 'now'
+})
+
+def tokenize(text):
+    """
+    Split text into word and punctuation tokens
+    
+    Args:
+        text (str): Input text
+        
+    Returns:
+        list: Tokens, lowercased
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def normalize_query(query):
+    """Lowercase a query and collapse whitespace"""
+    return WHITESPACE_PATTERN.sub(' ', query.lower().strip())
+
+def query_hash(query):
+    """Stable ID of a query: MD5 hex digest of its normalized form"""
+    return hashlib.md5(normalize_query(query).encode()).hexdigest()
+
+def extract_keywords(text):
+    """Extract meaningful keywords from text for better categorization"""
+    # Convert to lowercase and remove punctuation
+    text = PUNCTUATION_PATTERN.sub('', text.lower())
+    
+    # Split into words and remove common stopwords
+    return [word for word in text.split() if word not in STOPWORDS and len(word) > 3]
+
+def extract_key_terms(text):
+    """Extract the words of four or more characters from lowercased text"""
+    return KEY_TERM_PATTERN.findall(text)
@@ -0,0 +1,165 @@
+"""
+Persistent translation cache for SkillMentor
+"""
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+from skillmentor.storage.cache import LRUCache
+
+# Default location of the persistent cache (relative to the project root)
+DEFAULT_CACHE_PATH = os.path.join('data', 'processed', 'translations.db')
+
+# Languages the static advice pool is pre-translated into
+SUPPORTED_LANGUAGES = ('hi', 'sw')
+
+def text_hash(text):
+    """
+    Hash a text for use as a cache key
+    
+    Args:
+        text (str): Text to hash
+        
+    Returns:
+        str: SHA-1 hex digest of the UTF-8 text
+    """
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+class TranslationCache:
+    """
+    Translation cache keyed by (text hash, source language, target language).
+    
+    Lookups go to an in-memory LRU first and then to an optional SQLite
+    table, so translations survive restarts and are shared by workers.
+    """
+    
+    def __init__(self, path=None, maxsize=10000):
+        """
+        Initialize the translation cache
+        
+        Args:
+            path (str): Path to the SQLite cache file (None keeps the cache in memory only)
+            maxsize (int): Number of translations kept in memory
+        """
+        self.path = path
+        self.memory = LRUCache(maxsize=maxsize)
+        self._conn = None
+        self._lock = threading.Lock()
+        
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "text_hash TEXT NOT NULL, "
+                    "source TEXT NOT NULL, "
+                    "target TEXT NOT NULL, "
+                    "translation TEXT NOT NULL, "
+                    "PRIMARY KEY (text_hash, source, target))"
+                )
+                self._conn.commit()
+                logging.info(f"Translation cache opened at {path}")
+            except Exception as e:
+                logging.error(f"Error opening translation cache: {str(e)}")
+                self._conn = None
+    
+    def get_many(self, texts, source, target):
+        """
+        Look up translations for several texts
+        
+        Args:
+            texts (list): Texts to look up
+            source (str): Source language code
+            target (str): Target language code
+            
+        Returns:
+            dict: Text -> translation for every cached text
+        """
+        found = {}
+        missing = {}
+        for text in texts:
+            key = (text_hash(text), source, target)
+            translation = self.memory.get(key)
+            if translation is not None:
+                found[text] = translation
+            else:
+                missing[key[0]] = text
+        
+        if missing and self._conn is not None:
+            hashes = list(missing)
+            try:
+                with self._lock:
+                    rows = []
+                    # Stay well below SQLite's bound parameter limit
+                    for i in range(0, len(hashes), 500):
+                        chunk = hashes[i:i + 500]
+                        placeholders = ", ".join("?" * len(chunk))
+                        rows.extend(self._conn.execute(
+                            "SELECT text_hash, translation FROM translations "
+                            f"WHERE source = ? AND target = ? AND text_hash IN ({placeholders})",
+                            [source, target] + chunk
+                        ).fetchall())
+            except Exception as e:
+                logging.error(f"Error reading translation cache: {str(e)}")
+                rows = []
+            
+            for digest, translation in rows:
+                found[missing[digest]] = translation
+                self.memory.put((digest, source, target), translation)
+        
+        return found
+    
+    def get(self, text, source, target):
+        """
+        Look up one translation
+        
+        Args:
+            text (str): Text to look up
+            source (str): Source language code
+            target (str): Target language code
+            
+        Returns:
+            str: Cached translation, or None
+        """
+        return self.get_many([text], source, target).get(text)
+    
+    def put_many(self, translations, source, target):
+        """
+        Store several translations
+        
+        Args:
+            translations (dict): Text -> translation
+            source (str): Source language code
+            target (str): Target language code
+        """
+        rows = []
+        for text, translation in translations.items():
+            digest = text_hash(text)
+            self.memory.put((digest, source, target), translation)
+            rows.append((digest, source, target, translation))
+        
+        if rows and self._conn is not None:
+            try:
+                with self._lock:
+                    with self._conn:
+                        self._conn.executemany(
+                            "INSERT OR REPLACE INTO translations "
+                            "(text_hash, source, target, translation) VALUES (?, ?, ?, ?)",
+                            rows
+                        )
+            except Exception as e:
+                logging.error(f"Error writing translation cache: {str(e)}")
+    
+    def put(self, text, source, target, translation):
+        """Store one translation"""
+        self.put_many({text: translation}, source, target)
+    
+    def close(self):
+        """Close the persistent cache"""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
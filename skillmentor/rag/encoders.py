@@ -0,0 +1,313 @@
+"""
+Registry of sentence encoders used to embed documents and queries
+"""
+import os
+import json
+import logging
+import numpy as np
+
+# Known encoders: name -> model id, native dimension and whether the model
+# was trained so that leading dimensions can be kept (Matryoshka)
+ENCODERS = {
+    'minilm': {
+        'model_id': 'sentence-transformers/paraphrase-MiniLM-L6-v2',
+        'dimension': 384,
+        'matryoshka': False
+    },
+    'all-minilm': {
+        'model_id': 'sentence-transformers/all-MiniLM-L6-v2',
+        'dimension': 384,
+        'matryoshka': False
+    },
+    'bge-small': {
+        'model_id': 'BAAI/bge-small-en-v1.5',
+        'dimension': 384,
+        'matryoshka': False
+    },
+    'mpnet': {
+        'model_id': 'sentence-transformers/all-mpnet-base-v2',
+        'dimension': 768,
+        'matryoshka': False
+    },
+    'mxbai-large': {
+        'model_id': 'mixedbread-ai/mxbai-embed-large-v1',
+        'dimension': 1024,
+        'matryoshka': True
+    },
+    'codebert': {
+        'model_id': 'microsoft/codebert-base',
+        'dimension': 768,
+        'matryoshka': False
+    }
+}
+
+# Encoder used when none is configured
+DEFAULT_ENCODER = 'minilm'
+
+def register_encoder(name, model_id, dimension, matryoshka=False):
+    """
+    Add an encoder to the registry
+    
+    Args:
+        name (str): Short name used in configuration
+        model_id (str): SentenceTransformer model name or local path
+        dimension (int): Native embedding dimension
+        matryoshka (bool): Whether the model supports truncating its embeddings
+    """
+    ENCODERS[name] = {'model_id': model_id, 'dimension': dimension, 'matryoshka': matryoshka}
+
+def metadata_path(index_path):
+    """Path of the metadata file stored next to an index"""
+    return index_path + '.meta.json'
+
+def pca_path(index_path):
+    """Path of the PCA projection stored next to an index"""
+    return index_path + '.pca.npz'
+
+class Encoder:
+    """
+    Sentence encoder with optional dimension reduction.
+    
+    Embeddings can be shortened either by keeping the leading dimensions
+    (Matryoshka-style truncation) or with a PCA projection fitted on the
+    document embeddings. The SentenceTransformer model is loaded on first use.
+    """
+    
+    def __init__(self, name=DEFAULT_ENCODER, truncate_dim=None, pca_dim=None, normalize=False, device='cpu', model=None,
+                 onnx_path=None):
+        """
+        Initialize the encoder
+        
+        Args:
+            name (str): Registered encoder name
+            truncate_dim (int): Keep only the first N dimensions
+            pca_dim (int): Project embeddings onto N principal components
+            normalize (bool): L2-normalize the final embeddings
+            device (str): Device to run the model on (cpu or cuda)
+            model: Already loaded model with an encode() method (optional)
+            onnx_path (str): Directory of an ONNX export of this encoder, run with
+                             ONNX Runtime instead of PyTorch
+        """
+        if name not in ENCODERS:
+            raise ValueError(f"Unknown encoder '{name}' (available: {', '.join(ENCODERS)})")
+        if truncate_dim and pca_dim:
+            raise ValueError("Use either truncate_dim or pca_dim, not both")
+        
+        spec = ENCODERS[name]
+        if truncate_dim and not spec['matryoshka']:
+            logging.warning(f"Encoder '{name}' was not trained for truncation; recall may drop")
+        
+        self.name = name
+        self.model_id = spec['model_id']
+        self.base_dimension = spec['dimension']
+        self.truncate_dim = truncate_dim
+        self.pca_dim = pca_dim
+        self.normalize = normalize
+        self.device = device
+        self.pca_mean = None
+        self.pca_components = None
+        self.onnx_path = onnx_path
+        self._model = model
+        
+        if onnx_path and model is None:
+            from skillmentor.rag.onnx_encoder import OnnxEncoderModel
+            
+            self._model = OnnxEncoderModel(onnx_path)
+            if self._model.config['model_id'] != self.model_id:
+                raise ValueError(
+                    f"ONNX export in {onnx_path} is of {self._model.config['model_id']}, "
+                    f"not {self.model_id}"
+                )
+    
+    @property
+    def model(self):
+        """The underlying SentenceTransformer model, loaded on first use"""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            
+            logging.info(f"Loading encoder {self.name} ({self.model_id})")
+            self._model = SentenceTransformer(self.model_id, device=self.device)
+        return self._model
+    
+    @property
+    def dimension(self):
+        """Dimension of the embeddings returned by encode()"""
+        return self.truncate_dim or self.pca_dim or self.base_dimension
+    
+    def encode_raw(self, texts, batch_size=32):
+        """
+        Encode texts with the model, without dimension reduction
+        
+        Args:
+            texts (list): Texts to encode
+            batch_size (int): Texts per model call
+            
+        Returns:
+            numpy.ndarray: float32 embeddings of the native dimension
+        """
+        embeddings = self.model.encode(list(texts), batch_size=batch_size)
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+    
+    def reduce(self, embeddings):
+        """
+        Apply the configured truncation or PCA projection
+        
+        Args:
+            embeddings (numpy.ndarray): Native embeddings
+            
+        Returns:
+            numpy.ndarray: float32 embeddings of the output dimension
+        """
+        if self.truncate_dim:
+            embeddings = embeddings[:, :self.truncate_dim]
+        elif self.pca_dim:
+            if self.pca_components is None:
+                raise ValueError("PCA projection has not been fitted")
+            embeddings = (embeddings - self.pca_mean) @ self.pca_components.T
+        
+        if self.normalize or self.truncate_dim:
+            # Truncated Matryoshka embeddings are only meaningful once renormalized
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def encode(self, texts, batch_size=32):
+        """
+        Encode texts
+        
+        Args:
+            texts (list): Texts to encode
+            batch_size (int): Texts per model call
+            
+        Returns:
+            numpy.ndarray: float32 embeddings of shape (len(texts), dimension)
+        """
+        return self.reduce(self.encode_raw(texts, batch_size=batch_size))
+    
+    def fit_pca(self, embeddings):
+        """
+        Fit the PCA projection on native document embeddings
+        
+        Args:
+            embeddings (numpy.ndarray): Native embeddings
+        """
+        if not self.pca_dim:
+            return
+        if self.pca_dim > min(embeddings.shape):
+            raise ValueError(f"pca_dim {self.pca_dim} exceeds what {embeddings.shape[0]} documents can support")
+        
+        self.pca_mean = embeddings.mean(axis=0)
+        _, _, vt = np.linalg.svd(embeddings - self.pca_mean, full_matrices=False)
+        self.pca_components = vt[:self.pca_dim].astype(np.float32)
+        logging.info(f"Fitted PCA projection {self.base_dimension} -> {self.pca_dim}")
+    
+    def fit_encode(self, texts, batch_size=32):
+        """
+        Encode the documents of a new index, fitting the PCA projection
+        on them first if one is configured
+        
+        Args:
+            texts (list): Documents to encode
+            batch_size (int): Texts per model call
+            
+        Returns:
+            numpy.ndarray: float32 embeddings of shape (len(texts), dimension)
+        """
+        embeddings = self.encode_raw(texts, batch_size=batch_size)
+        self.fit_pca(embeddings)
+        return self.reduce(embeddings)
+    
+    def metadata(self):
+        """
+        Describe the encoder for the index metadata
+        
+        Returns:
+            dict: Encoder name, model id and dimensions
+        """
+        return {
+            'encoder': self.name,
+            'model_id': self.model_id,
+            'dimension': self.dimension,
+            'base_dimension': self.base_dimension,
+            'truncate_dim': self.truncate_dim,
+            'pca_dim': self.pca_dim,
+            'normalize': self.normalize
+        }
+    
+    def save(self, index_path, doc_count):
+        """
+        Write the metadata (and PCA projection) next to an index
+        
+        Args:
+            index_path (str): Path of the saved index
+            doc_count (int): Number of indexed documents
+        """
+        metadata = dict(self.metadata(), doc_count=doc_count)
+        with open(metadata_path(index_path), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+        if self.pca_dim:
+            np.savez(pca_path(index_path), mean=self.pca_mean, components=self.pca_components)
+        logging.info(f"Index metadata saved to {metadata_path(index_path)}")
+    
+    def check(self, index_path, index_dimension):
+        """
+        Check that an index was built with this encoder, loading its PCA
+        projection if it has one
+        
+        Args:
+            index_path (str): Path of the index
+            index_dimension (int): Dimension of the loaded index
+            
+        Returns:
+            dict: The index metadata (empty for indexes without metadata)
+            
+        Raises:
+            ValueError: If the index does not match this encoder
+        """
+        metadata = {}
+        if os.path.exists(metadata_path(index_path)):
+            with open(metadata_path(index_path), 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            expected = self.metadata()
+            for key in ('model_id', 'dimension', 'truncate_dim', 'pca_dim', 'normalize'):
+                if metadata.get(key) != expected[key]:
+                    raise ValueError(
+                        f"Index {index_path} was built with {key}={metadata.get(key)!r}, "
+                        f"but the encoder uses {key}={expected[key]!r}"
+                    )
+            if self.pca_dim:
+                projection = np.load(pca_path(index_path))
+                self.pca_mean = projection['mean']
+                self.pca_components = projection['components']
+        else:
+            logging.warning(f"No metadata found for index {index_path}, only checking its dimension")
+        
+        if index_dimension != self.dimension:
+            raise ValueError(
+                f"Index {index_path} has dimension {index_dimension}, "
+                f"but encoder '{self.name}' produces {self.dimension}"
+            )
+        return metadata
+
+def create_encoder(encoder=None, **kwargs):
+    """
+    Get an encoder from a name or an existing instance
+    
+    Args:
+        encoder (str or Encoder): Encoder name or instance (default: DEFAULT_ENCODER)
+        **kwargs: Arguments for a newly created Encoder
+        
+    Returns:
+        Encoder: The encoder
+        
+    Raises:
+        ValueError: If arguments are given along with an existing instance
+    """
+    if isinstance(encoder, Encoder):
+        if kwargs:
+            raise ValueError(
+                f"Cannot apply {', '.join(sorted(kwargs))} to an existing Encoder; "
+                "pass the encoder name instead"
+            )
+        return encoder
+    return Encoder(encoder or DEFAULT_ENCODER, **kwargs)
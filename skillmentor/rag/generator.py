@@ -1,32 +1,21 @@
 """
-Advice generation module using LangChain and LLMs
+Advice generation module using LLMs
+
+The model is called directly through skillmentor.rag.llm_backend, which
+(like LangChain, available as an optional adapter) is only imported when
+a model is loaded.
 """
 import os
+import time
 import logging
-from langchain import PromptTemplate
-from langchain.llms import HuggingFacePipeline
-from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from skillmentor.storage.cache import LRUCache
+from skillmentor.serving.admission import Overloaded
+from skillmentor.nlp.tokenizer import query_hash
 
-class AdviceGenerator:
-    """
-    Generates tailored business advice using LLM and retrieved context
-    """
-    
-    def __init__(self, model_name="meta-llama/Llama-2-7b-chat-hf", device="cpu"):
-        """
-        Initialize the advice generator with specified LLM model
-        
-        Args:
-            model_name (str): HF model name or path to local model
-            device (str): Device to run the model on (cpu or cuda)
-        """
-        self.model_name = model_name
-        self.device = device
-        self.llm = None
-        self.initialize_llm()
-        
-        # Define the prompt template
-        self.template = """
+# Prompt of every generation call
+PROMPT_TEMPLATE = """
         You are SkillMentor, an AI business advisor for micro-entrepreneurs in underserved communities.
         Your goal is to provide actionable, sustainable business advice.
         
@@ -43,86 +32,337 @@ class AdviceGenerator:
         
         YOUR ADVICE:
         """
+
+# PROMPT_TEMPLATE split around its fields once, so formatting is concatenation
+PROMPT_PARTS = [PROMPT_TEMPLATE.split("{query}", 1)[0]] + PROMPT_TEMPLATE.split("{query}", 1)[1].split("{context}", 1)
+
+# Fixed advice used when the LLM is unavailable
+FALLBACK_ADVICE = {
+    'pricing': "To price your products effectively, consider your material costs, labor time, and a reasonable profit margin. Research what similar products sell for in your local market and adjust accordingly.",
+    'marketing': "Focus on highlighting the unique features of your products. Start with local markets and use word-of-mouth marketing. Consider collaborating with other local businesses for cross-promotion.",
+    'sustainability': "Adopt sustainable practices like using local materials, minimizing waste, and reusing resources when possible. This can both reduce costs and appeal to environmentally conscious customers.",
+    'general': "Start by identifying your business strengths and the specific needs of your local community. Focus on delivering quality products or services consistently, and gradually expand your offerings based on customer feedback."
+}
+
+# New-token budget per query category (SkillMentor._classify_query); short
+# factual answers need less room than open-ended strategy questions
+GENERATION_BUDGETS = {
+    'Pricing': 128,
+    'Marketing': 192,
+    'Sustainability': 160,
+    'Production': 160,
+    'General': 128
+}
+DEFAULT_MAX_NEW_TOKENS = 160
+
+# Text that means the answer is over: the model starting another prompt
+# section, or a run of blank lines after the last point
+STOP_SEQUENCES = ["USER QUERY:", "RELEVANT CONTEXT:", "YOUR ADVICE:", "\n\n\n"]
+
+# Total length (prompt included) the pipeline used to generate up to;
+# used to estimate the time the budgets save
+LEGACY_MAX_LENGTH = 512
+
+def format_prompt(query, context_text):
+    """
+    Fill PROMPT_TEMPLATE
+    
+    Args:
+        query (str): User's business query
+        context_text (str): Retrieved documents, one per line
         
-        self.prompt_template = PromptTemplate(
-            input_variables=["query", "context"],
-            template=self.template
-        )
+    Returns:
+        str: The prompt
+    """
+    head, middle, tail = PROMPT_PARTS
+    return head + query + middle + context_text + tail
+
+def truncate_at_stop(text, stop_sequences=STOP_SEQUENCES):
+    """Cut generated text at the first stop sequence"""
+    end = len(text)
+    for stop in stop_sequences:
+        position = text.find(stop)
+        if position != -1:
+            end = min(end, position)
+    return text[:end].strip()
+
+class AdviceGenerator:
+    """
+    Generates tailored business advice using LLM and retrieved context
+    """
+    
+    def __init__(self, model_name="meta-llama/Llama-2-7b-chat-hf", device="cpu", llm=None,
+                 admission=None, breaker=None, timeout=None, advice_cache_size=256,
+                 draft_model_name=None):
+        """
+        Initialize the advice generator with specified LLM model
+        
+        Args:
+            model_name (str): HF model name or path to local model
+            device (str): Device to run the model on (cpu or cuda)
+            llm (callable): Already constructed LLM mapping a prompt to its completion;
+                            skips loading model_name (optional)
+            admission (AdmissionController): Limits concurrent LLM calls and their queue
+                                             wait; turned-away queries get degraded advice
+            breaker (CircuitBreaker): Stops calling an LLM that keeps failing or timing out
+            timeout (float): Seconds to wait for one LLM call (None for no limit)
+            advice_cache_size (int): Recent LLM answers kept to serve again, per query,
+                                     when degraded (0 disables)
+            draft_model_name (str): Small model with the same tokenizer as model_name
+                                    for speculative decoding (None decodes with
+                                    model_name alone)
+        """
+        self.model_name = model_name
+        self.draft_model_name = draft_model_name
+        self.device = device
+        self.llm = llm
+        self.backend = None
+        self.generation_stats = {}
+        self.admission = admission
+        self.breaker = breaker
+        self.timeout = timeout
+        self.advice_cache = LRUCache(maxsize=advice_cache_size) if advice_cache_size else None
+        self.degraded = {}
+        # Guards the statistics, which concurrent requests update
+        self._stats_lock = threading.Lock()
+        self._executor = None
+        if timeout is not None:
+            max_workers = admission.max_concurrency if admission else 4
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='generation')
+        if llm is None:
+            self.initialize_llm()
+        
+        # Define the prompt template
+        self.template = PROMPT_TEMPLATE
         
         logging.info(f"AdviceGenerator initialized with model {model_name}")
     
     def initialize_llm(self):
         """
-        Initialize the LLM pipeline
+        Load the model for direct generation
         
         Returns:
             bool: Success status
         """
         try:
-            # Load tokenizer and model
-            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            model = AutoModelForCausalLM.from_pretrained(
-                self.model_name,
-                device_map=self.device,
-                load_in_8bit=True if self.device == "cuda" else False
-            )
+            from skillmentor.rag.llm_backend import TransformersBackend
             
-            # Create text generation pipeline
-            text_generation_pipeline = pipeline(
-                "text-generation",
-                model=model,
-                tokenizer=tokenizer,
-                max_length=512,
+            # Each call sets its own max_new_tokens budget and gets only the new tokens back
+            self.backend = TransformersBackend.from_pretrained(
+                self.model_name,
+                device=self.device,
+                draft_model_name=self.draft_model_name,
+                max_new_tokens=DEFAULT_MAX_NEW_TOKENS,
                 temperature=0.7,
                 top_p=0.95,
                 repetition_penalty=1.15
             )
-            
-            # Create LangChain HF pipeline
-            self.llm = HuggingFacePipeline(pipeline=text_generation_pipeline)
+            self.llm = self.backend
             
             return True
         except Exception as e:
             logging.error(f"Error initializing LLM: {str(e)}")
             # Fallback to a dummy generator for testing purposes
+            self.backend = None
             self.llm = None
             return False
     
-    def generate_advice(self, query, context):
+    def langchain_llm(self):
+        """
+        The loaded model as a LangChain LLM (requires langchain)
+        
+        Returns:
+            langchain.llms.base.LLM: Adapter over the direct backend, or None if no model is loaded
+        """
+        if self.backend is None:
+            return None
+        from skillmentor.rag.llm_backend import langchain_llm
+        
+        return langchain_llm(self.backend)
+    
+    def generate_advice(self, query, context, category=None):
         """
         Generate advice based on user query and retrieved context
         
         Args:
             query (str): User's business query
             context (list): List of retrieved relevant documents
+            category (str): Query category, which sets the generation budget (optional)
             
         Returns:
             str: Generated business advice
         """
+        return self.generate(query, context, category=category)[0]
+    
+    def generate(self, query, context, category=None):
+        """
+        Generate advice, degrading to cached or fallback advice under load
+        
+        The LLM is skipped when the admission controller turns the query
+        away (its queue wait would exceed the SLO) or the circuit breaker is
+        open. Its previous answer to the same query is then served if it is
+        still cached, and the rule-based fallback otherwise.
+        
+        Args:
+            query (str): User's business query
+            context (list): List of retrieved relevant documents
+            category (str): Query category, which sets the generation budget (optional)
+            
+        Returns:
+            tuple: (advice, degraded_reason); the reason is None when the LLM answered,
+                   otherwise 'unavailable', 'error', 'timeout', 'circuit_open' or an
+                   Overloaded reason ('queue_full', 'slo', 'deadline')
+        """
         if not self.llm:
             logging.warning("LLM not initialized, using fallback response")
-            return self._generate_fallback_advice(query, context)
+            return self._degrade(query, context, 'unavailable')
+        
+        # An open circuit answers at once, without queueing for a slot
+        if self.breaker and not self.breaker.allow():
+            return self._degrade(query, context, 'circuit_open')
+        try:
+            release = self.admission.acquire() if self.admission else (lambda: None)
+        except Overloaded as e:
+            if self.breaker:
+                self.breaker.record_skipped()
+            logging.warning(f"LLM overloaded ({str(e)}), serving degraded advice")
+            return self._degrade(query, context, e.reason)
+        
+        try:
+            # The slot is released when the LLM call finishes, not when we stop waiting
+            advice = self._call_llm(query, context, category, on_done=release)
+        except FutureTimeoutError:
+            if self.breaker:
+                self.breaker.record_failure()
+            logging.error(f"LLM did not answer within {self.timeout}s")
+            return self._degrade(query, context, 'timeout')
+        except Exception as e:
+            if self.breaker:
+                self.breaker.record_failure()
+            logging.error(f"Error generating advice: {str(e)}")
+            return self._degrade(query, context, 'error')
+        if self.breaker:
+            self.breaker.record_success()
+        
+        if self.advice_cache is not None:
+            self.advice_cache.put(query_hash(query), advice)
+        return advice, None
+    
+    def _call_llm(self, query, context, category=None, on_done=None):
+        """
+        Prompt the LLM and extract the advice, within the timeout if one is set
         
+        on_done is called once the call has finished, which for a call that
+        timed out is after this method has already raised.
+        """
+        on_done = on_done or (lambda: None)
+        future = None
         try:
             # Format context as a single string
             context_text = "\n".join(context)
             
             # Create the prompt
-            prompt = self.prompt_template.format(
-                query=query,
-                context=context_text
-            )
-            
-            # Generate response
-            response = self.llm(prompt)
+            prompt = format_prompt(query, context_text)
             
-            # Extract the advice part
-            advice = response.split("YOUR ADVICE:")[1].strip() if "YOUR ADVICE:" in response else response
-            
-            return advice
-        except Exception as e:
-            logging.error(f"Error generating advice: {str(e)}")
-            return self._generate_fallback_advice(query, context)
+            if self.backend is not None:
+                generate, args = self._run_backend, (prompt, category)
+            else:
+                generate, args = self._run_llm, (prompt,)
+            if self._executor is None:
+                return generate(*args)
+            future = self._executor.submit(generate, *args)
+        finally:
+            if future is None:
+                on_done()
+        
+        # Generate response; a call that times out keeps running in its worker
+        future.add_done_callback(lambda _: on_done())
+        return future.result(timeout=self.timeout)
+    
+    def _run_llm(self, prompt):
+        """Call an LLM that echoes the prompt and extract the advice part"""
+        response = self.llm(prompt)
+        return response.split("YOUR ADVICE:")[1].strip() if "YOUR ADVICE:" in response else response
+    
+    def _run_backend(self, prompt, category):
+        """
+        Generate only the answer tokens, within the category's budget and
+        until a stop sequence, and record tokens and time per category
+        """
+        budget = GENERATION_BUDGETS.get(category, DEFAULT_MAX_NEW_TOKENS)
+        start = time.perf_counter()
+        generation = self.backend.generate(prompt, max_new_tokens=budget, stop_sequences=STOP_SEQUENCES)
+        self._record_generation(category, budget, generation, time.perf_counter() - start)
+        return truncate_at_stop(generation.text)
+    
+    def _record_generation(self, category, budget, generation, seconds):
+        """Add one generation to the per-category statistics"""
+        # Tokens the fixed max_length would have let the model run on for
+        legacy = max(0, LEGACY_MAX_LENGTH - generation.prompt_tokens)
+        with self._stats_lock:
+            stats = self.generation_stats.setdefault(category or 'default', {
+                'calls': 0, 'new_tokens': 0, 'seconds': 0.0, 'stopped_early': 0, 'tokens_saved': 0
+            })
+            stats['calls'] += 1
+            stats['new_tokens'] += generation.new_tokens
+            stats['seconds'] += seconds
+            stats['stopped_early'] += int(generation.stopped or generation.new_tokens < budget)
+            stats['tokens_saved'] += max(0, legacy - generation.new_tokens)
+    
+    def _degrade(self, query, context, reason):
+        """Cached LLM advice for the query if there is any, else the rule-based fallback"""
+        with self._stats_lock:
+            self.degraded[reason] = self.degraded.get(reason, 0) + 1
+        if self.advice_cache is not None:
+            cached = self.advice_cache.get(query_hash(query))
+            if cached is not None:
+                return cached, reason
+        return self._generate_fallback_advice(query, context), reason
+    
+    def stats(self):
+        """
+        Get degradation statistics
+        
+        Returns:
+            dict: Degraded answers by reason, plus admission and circuit breaker statistics
+        """
+        with self._stats_lock:
+            degraded = dict(self.degraded)
+        return {
+            'degraded': degraded,
+            'admission': self.admission.stats() if self.admission else {},
+            'circuit_breaker': self.breaker.stats() if self.breaker else {},
+            'by_category': self.generation_report()
+        }
+    
+    def generation_report(self):
+        """
+        Summarize generation length and time per category
+        
+        The estimated time saved counts the tokens the old fixed
+        max_length=512 would have allowed beyond what was generated, at
+        the measured time per token; it is an upper bound for answers that
+        would have ended on their own anyway.
+        
+        Returns:
+            dict: Category -> calls, mean new tokens, mean seconds, share stopped
+                  before the budget, and estimated seconds saved per call
+        """
+        with self._stats_lock:
+            snapshot = {category: dict(stats) for category, stats in self.generation_stats.items()}
+        report = {}
+        for category, stats in snapshot.items():
+            calls = stats['calls']
+            seconds_per_token = stats['seconds'] / stats['new_tokens'] if stats['new_tokens'] else 0.0
+            report[category] = {
+                'calls': calls,
+                'budget': GENERATION_BUDGETS.get(category, DEFAULT_MAX_NEW_TOKENS),
+                'mean_new_tokens': stats['new_tokens'] / calls,
+                'mean_seconds': stats['seconds'] / calls,
+                'stopped_early': stats['stopped_early'] / calls,
+                'est_seconds_saved': stats['tokens_saved'] * seconds_per_token / calls
+            }
+        return report
     
     def _generate_fallback_advice(self, query, context):
         """
@@ -136,14 +376,15 @@ class AdviceGenerator:
             str: Fallback business advice
         """
         # Simple rule-based fallback response
-        if "price" in query.lower() or "pricing" in query.lower():
-            return "To price your products effectively, consider your material costs, labor time, and a reasonable profit margin. Research what similar products sell for in your local market and adjust accordingly."
+        query = query.lower()
+        if "price" in query or "pricing" in query:
+            return FALLBACK_ADVICE['pricing']
         
-        elif "marketing" in query.lower() or "sell" in query.lower():
-            return "Focus on highlighting the unique features of your products. Start with local markets and use word-of-mouth marketing. Consider collaborating with other local businesses for cross-promotion."
+        elif "marketing" in query or "sell" in query:
+            return FALLBACK_ADVICE['marketing']
         
-        elif "sustain" in query.lower() or "environment" in query.lower():
-            return "Adopt sustainable practices like using local materials, minimizing waste, and reusing resources when possible. This can both reduce costs and appeal to environmentally conscious customers."
+        elif "sustain" in query or "environment" in query:
+            return FALLBACK_ADVICE['sustainability']
         
         else:
-            return "Start by identifying your business strengths and the specific needs of your local community. Focus on delivering quality products or services consistently, and gradually expand your offerings based on customer feedback." 
\ No newline at end of file
+            return FALLBACK_ADVICE['general']
@@ -0,0 +1,423 @@
+"""
+Versioned index bundles
+
+A bundle root holds one directory per index version and a CURRENT file
+naming the version readers should serve:
+    
+    bundles/
+        CURRENT
+        versions/
+            20240101-120000-1a2b3c4d/
+                index.faiss
+                index.faiss.meta.json
+                index.faiss.vectors.npy
+                documents.txt
+                manifest.json
+                
+The manifest records the encoder, dimension, document count, build
+parameters and a SHA-256 checksum of every file in the version. Versions
+are written to a temporary directory and renamed into place, and CURRENT
+is replaced with os.replace(), so readers never see a half-written bundle.
+"""
+import os
+import copy
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import numpy as np
+import faiss
+from skillmentor.rag.mmap_index import MmapFlatIndex, read_index, save_vectors
+
+# Separator between documents in a documents file
+DOCUMENT_SEPARATOR = '\n---\n'
+
+# Header line naming the category of a document
+CATEGORY_PREFIX = 'Category:'
+
+# File names inside a bundle root and a version directory
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+MANIFEST_FILE = 'manifest.json'
+INDEX_FILE = 'index.faiss'
+DOCUMENTS_FILE = 'documents.txt'
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _bundle_checksum(files):
+    """Checksum of a whole bundle from the checksums of its files"""
+    return hashlib.sha256(json.dumps(files, sort_keys=True).encode('utf-8')).hexdigest()
+
+def write_documents(path, documents):
+    """
+    Write documents separated by DOCUMENT_SEPARATOR
+    
+    Args:
+        path (str): Output file
+        documents (list): Document strings
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        for doc in documents:
+            f.write(doc.strip() + DOCUMENT_SEPARATOR)
+
+def read_documents(path):
+    """
+    Read a documents file
+    
+    Files without DOCUMENT_SEPARATOR are read as one document per line.
+    
+    Args:
+        path (str): Documents file
+        
+    Returns:
+        list: Document strings
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if DOCUMENT_SEPARATOR in content:
+        return [doc.strip() for doc in content.split(DOCUMENT_SEPARATOR) if doc.strip()]
+    return content.splitlines(keepends=True)
+
+def document_category(document):
+    """Category named by the 'Category:' header of a document (None without a header)"""
+    first_line = document.lstrip().split('\n', 1)[0]
+    if not first_line.startswith(CATEGORY_PREFIX):
+        return None
+    return first_line[len(CATEGORY_PREFIX):].strip() or None
+
+def category_key(category):
+    """Partition key of a category name: its first word, lowercased ('Pricing Strategies' -> 'pricing')"""
+    words = (category or '').split()
+    return words[0].lower() if words else None
+
+def version_dir(root, version):
+    """Directory of one version inside a bundle root"""
+    return os.path.join(root, VERSIONS_DIR, version)
+
+def list_versions(root):
+    """
+    List the complete versions in a bundle root, oldest first
+    
+    Returns:
+        list: Version names
+    """
+    versions_path = os.path.join(root, VERSIONS_DIR)
+    if not os.path.isdir(versions_path):
+        return []
+    return sorted(
+        name for name in os.listdir(versions_path)
+        if os.path.exists(os.path.join(versions_path, name, MANIFEST_FILE))
+    )
+
+def current_version(root):
+    """
+    Version named by the CURRENT file of a bundle root
+    
+    Returns:
+        str: Version name, or None if nothing has been published
+    """
+    try:
+        with open(os.path.join(root, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def write_bundle(root, index, documents, encoder, params=None):
+    """
+    Write an index and its documents as a new version
+    
+    The version is not served until it is published.
+    
+    Args:
+        root (str): Bundle root
+        index: FAISS index over the documents
+        documents (list): Document strings, in index order
+        encoder (Encoder): Encoder that produced the index vectors
+        params (dict): Build parameters to record in the manifest
+        
+    Returns:
+        str: The new version name
+    """
+    if index.ntotal != len(documents):
+        raise ValueError(f"Index holds {index.ntotal} vectors but {len(documents)} documents were given")
+    
+    versions_path = os.path.join(root, VERSIONS_DIR)
+    os.makedirs(versions_path, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=versions_path)
+    try:
+        faiss.write_index(index, os.path.join(staging, INDEX_FILE))
+        save_vectors(index, os.path.join(staging, INDEX_FILE))
+        encoder.save(os.path.join(staging, INDEX_FILE), len(documents))
+        write_documents(os.path.join(staging, DOCUMENTS_FILE), documents)
+        
+        files = {name: file_sha256(os.path.join(staging, name)) for name in sorted(os.listdir(staging))}
+        checksum = _bundle_checksum(files)
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{checksum[:8]}"
+        manifest = dict(
+            encoder.metadata(),
+            version=version,
+            created=time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            doc_count=len(documents),
+            index_type=type(index).__name__,
+            params=params or {},
+            files=files,
+            checksum=checksum
+        )
+        with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        
+        if os.path.exists(version_dir(root, version)):
+            # Same content written within the same second
+            shutil.rmtree(staging)
+        else:
+            os.rename(staging, version_dir(root, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    logging.info(f"Index bundle {version} written to {root} ({len(documents)} documents)")
+    return version
+
+def publish(root, version):
+    """
+    Atomically point CURRENT at a version
+    
+    Args:
+        root (str): Bundle root
+        version (str): Version to serve
+    """
+    verify_bundle(root, version)
+    fd, tmp_path = tempfile.mkstemp(prefix='.CURRENT-', dir=root)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+    logging.info(f"Published index bundle {version}")
+
+def read_manifest(root, version):
+    """
+    Read the manifest of a version
+    
+    Returns:
+        dict: The manifest
+    """
+    with open(os.path.join(version_dir(root, version), MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def verify_bundle(root, version):
+    """
+    Check every file of a version against its manifest checksum
+    
+    Args:
+        root (str): Bundle root
+        version (str): Version to check
+        
+    Returns:
+        dict: The manifest
+        
+    Raises:
+        ValueError: If a file is missing or does not match its checksum
+    """
+    manifest = read_manifest(root, version)
+    files = manifest.get('files', {})
+    if _bundle_checksum(files) != manifest.get('checksum'):
+        raise ValueError(f"Manifest of index bundle {version} is inconsistent")
+    for name, expected in files.items():
+        path = os.path.join(version_dir(root, version), name)
+        if not os.path.exists(path):
+            raise ValueError(f"Index bundle {version} is missing {name}")
+        if file_sha256(path) != expected:
+            raise ValueError(f"Checksum mismatch for {name} in index bundle {version}")
+    return manifest
+
+def prune_versions(root, keep=3):
+    """
+    Delete old versions, never the published one
+    
+    Args:
+        root (str): Bundle root
+        keep (int): Number of most recent versions to keep
+        
+    Returns:
+        list: Deleted version names
+    """
+    current = current_version(root)
+    versions = list_versions(root)
+    stale = [v for v in versions[:max(len(versions) - keep, 0)] if v != current]
+    for version in stale:
+        shutil.rmtree(version_dir(root, version), ignore_errors=True)
+        logging.info(f"Deleted index bundle {version}")
+    return stale
+
+class CategoryPartition:
+    """
+    The documents of one category, as ids and a FAISS selector that
+    restricts a search to them
+    """
+    
+    def __init__(self, ids, ntotal):
+        """
+        Initialize the partition
+        
+        Args:
+            ids (numpy.ndarray): int64 ids of the documents in the category
+            ntotal (int): Number of vectors in the index
+        """
+        self.ids = ids
+        mask = np.zeros(ntotal, dtype=bool)
+        mask[ids] = True
+        # The selector reads the bitmap in place, so it must stay referenced
+        self.bitmap = np.packbits(mask, bitorder='little')
+        self.selector = faiss.IDSelectorBitmap(ntotal, faiss.swig_ptr(self.bitmap))
+
+class IndexBundle:
+    """
+    A loaded index version shared by concurrent readers.
+    
+    Readers hold a lease while they use the index. Once the bundle is
+    retired (replaced by a newer version) it is released as soon as the
+    last lease is returned.
+    """
+    
+    def __init__(self, index, documents, encoder, version=None, manifest=None):
+        """
+        Initialize the bundle
+        
+        Args:
+            index: FAISS index (None if not loaded yet)
+            documents (list): Document strings, in index order
+            encoder (Encoder): Encoder for queries against this index
+            version (str): Bundle version (None for indexes loaded from plain files)
+            manifest (dict): Bundle manifest
+        """
+        self.index = index
+        self.documents = documents
+        self.encoder = encoder
+        self.version = version
+        self.manifest = manifest or {}
+        self.generation = 0
+        self.leases = 0
+        self.retired = False
+        self._partitions = None
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take a lease on the bundle"""
+        with self._lock:
+            self.leases += 1
+    
+    def release(self):
+        """Return a lease, freeing the bundle if it was the last one on a retired bundle"""
+        with self._lock:
+            self.leases -= 1
+            free = self.retired and self.leases == 0
+        if free:
+            self._free()
+    
+    def retire(self):
+        """Mark the bundle as replaced, freeing it now if no reader holds it"""
+        with self._lock:
+            self.retired = True
+            free = self.leases == 0
+        if free:
+            self._free()
+    
+    def partition(self, category):
+        """
+        Partition of the documents in a category
+        
+        Partitions are built from the documents' 'Category:' headers on first use.
+        
+        Args:
+            category (str): Category name, matched on its first word ('Pricing' finds 'Pricing Strategies')
+            
+        Returns:
+            CategoryPartition: The partition, or None if no document has the category
+        """
+        if self._partitions is None:
+            members = {}
+            for doc_id, document in enumerate(self.documents):
+                key = category_key(document_category(document))
+                if key:
+                    members.setdefault(key, []).append(doc_id)
+            self._partitions = {
+                key: CategoryPartition(np.array(ids, dtype=np.int64), len(self.documents))
+                for key, ids in members.items()
+            }
+        return self._partitions.get(category_key(category))
+    
+    def search(self, embeddings, k, partition=None):
+        """
+        Search the index, optionally only within a partition
+        
+        Args:
+            embeddings (numpy.ndarray): Query embeddings
+            k (int): Number of neighbours
+            partition (CategoryPartition): Restrict the search to these documents
+            
+        Returns:
+            tuple: (distances, ids) arrays; missing neighbours have id -1
+        """
+        if partition is None:
+            return self.index.search(embeddings, k)
+        if isinstance(self.index, MmapFlatIndex):
+            return self.index.search(embeddings, k, ids=partition.ids)
+        return self.index.search(embeddings, k, params=faiss.SearchParameters(sel=partition.selector))
+    
+    def _free(self):
+        """Drop the references to the index and documents"""
+        if self.version:
+            logging.info(f"Released index bundle {self.version}")
+        self.index = None
+        self.documents = []
+        self._partitions = None
+
+def load_bundle(root, encoder, version=None, mmap=False):
+    """
+    Load and verify a version
+    
+    Args:
+        root (str): Bundle root
+        encoder (Encoder): Encoder the index must have been built with
+        version (str): Version to load (default: the published one)
+        mmap (bool): Memory-map the index instead of reading it into memory
+        
+    Returns:
+        IndexBundle: The loaded bundle
+        
+    Raises:
+        ValueError: If nothing is published, a checksum fails, or the bundle
+                    does not match the encoder or its documents
+    """
+    version = version or current_version(root)
+    if not version:
+        raise ValueError(f"No index bundle published in {root}")
+    
+    manifest = verify_bundle(root, version)
+    index_path = os.path.join(version_dir(root, version), INDEX_FILE)
+    index = read_index(index_path, mmap=mmap)
+    
+    if encoder.pca_dim:
+        # The projection belongs to this version; keep it off the shared encoder
+        encoder = copy.copy(encoder)
+    encoder.check(index_path, index.d)
+    
+    documents = read_documents(os.path.join(version_dir(root, version), DOCUMENTS_FILE))
+    if index.ntotal != len(documents) or manifest.get('doc_count') != len(documents):
+        raise ValueError(
+            f"Index bundle {version} holds {index.ntotal} vectors and {len(documents)} documents, "
+            f"but its manifest lists {manifest.get('doc_count')}"
+        )
+    
+    logging.info(f"Index bundle {version} loaded ({manifest['encoder']}, {index.d} dimensions, {len(documents)} documents)")
+    return IndexBundle(index, documents, encoder, version=version, manifest=manifest)
@@ -0,0 +1,195 @@
+"""
+Direct transformers backend for advice generation
+
+Tokenizes the prompt, calls model.generate and decodes only the new
+tokens, without a text-generation pipeline or LangChain in between.
+This module imports torch and transformers, so AdviceGenerator imports
+it only when it loads a model.
+
+With a draft model, generation is speculative (transformers' assisted
+generation): the small draft model proposes a few tokens and the main
+model checks them all in one forward pass, keeping the longest prefix it
+agrees with. Under greedy decoding the output is the same as without the
+draft; the main model just runs fewer, wider steps. The draft must use
+the main model's tokenizer.
+"""
+import logging
+from collections import namedtuple
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteria, StoppingCriteriaList
+
+# Result of one generation call
+Generation = namedtuple('Generation', ['text', 'prompt_tokens', 'new_tokens', 'stopped'])
+
+class StopSequenceCriteria(StoppingCriteria):
+    """
+    Stops generation once the new text contains a stop sequence
+    
+    Only the tokens added since the last step, plus a window before them
+    for stop sequences spanning steps, are decoded, so the check stays
+    cheap however long the answer gets. A step adds several tokens when a
+    draft model's proposals are accepted.
+    """
+    
+    def __init__(self, tokenizer, stop_sequences, prompt_length, window=16):
+        """
+        Initialize the criteria
+        
+        Args:
+            tokenizer: Tokenizer of the model
+            stop_sequences (list): Strings that end the answer
+            prompt_length (int): Prompt tokens at the start of each sequence
+            window (int): Tokens before the new ones decoded again at each step
+        """
+        self.tokenizer = tokenizer
+        self.stop_sequences = stop_sequences
+        self.prompt_length = prompt_length
+        self.window = window
+        self.checked = prompt_length
+        self.stopped = False
+    
+    def __call__(self, input_ids, scores, **kwargs):
+        start = max(self.prompt_length, min(self.checked, input_ids.shape[1] - 1) - self.window)
+        self.checked = input_ids.shape[1]
+        done = []
+        for row in input_ids:
+            tail = self.tokenizer.decode(row[start:], skip_special_tokens=True)
+            done.append(any(stop in tail for stop in self.stop_sequences))
+        self.stopped = all(done)
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+def load_model(model_name, device):
+    """Load a causal LM, in 8-bit on GPU"""
+    return AutoModelForCausalLM.from_pretrained(
+        model_name,
+        device_map=device,
+        load_in_8bit=True if device == "cuda" else False
+    )
+
+class TransformersBackend:
+    """
+    Causal language model called directly through model.generate
+    """
+    
+    def __init__(self, model, tokenizer, max_new_tokens=160, draft_model=None, **generation_kwargs):
+        """
+        Initialize the backend
+        
+        Args:
+            model: Causal LM (transformers PreTrainedModel)
+            tokenizer: Its tokenizer
+            max_new_tokens (int): Default new-token budget per call
+            draft_model: Small causal LM with the same tokenizer that proposes
+                         tokens for the main model to verify (optional)
+            **generation_kwargs: Further arguments for model.generate (temperature, top_p, ...)
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_new_tokens = max_new_tokens
+        self.draft_model = draft_model
+        self.generation_kwargs = generation_kwargs
+        if tokenizer.pad_token_id is None:
+            self.generation_kwargs.setdefault('pad_token_id', tokenizer.eos_token_id)
+        self.model.eval()
+        if draft_model is not None:
+            draft_model.eval()
+    
+    @classmethod
+    def from_pretrained(cls, model_name, device="cpu", draft_model_name=None, **kwargs):
+        """
+        Load a model and tokenizer from the Hugging Face hub or a local path
+        
+        Args:
+            model_name (str): HF model name or path to local model
+            device (str): Device to run the model on (cpu or cuda)
+            draft_model_name (str): HF model name or path of a draft model for
+                                    speculative decoding (optional); it is skipped
+                                    if its tokenizer differs from the main model's
+            **kwargs: Arguments for the backend
+            
+        Returns:
+            TransformersBackend: The backend
+        """
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = load_model(model_name, device)
+        logging.info(f"Loaded {model_name} for direct generation on {device}")
+        
+        draft_model = None
+        if draft_model_name:
+            if AutoTokenizer.from_pretrained(draft_model_name).get_vocab() != tokenizer.get_vocab():
+                logging.error(f"Draft model {draft_model_name} uses another tokenizer than {model_name}, "
+                              "generating without it")
+            else:
+                draft_model = load_model(draft_model_name, device)
+                logging.info(f"Loaded {draft_model_name} as draft model")
+        return cls(model, tokenizer, draft_model=draft_model, **kwargs)
+    
+    def generate(self, prompt, max_new_tokens=None, stop_sequences=None):
+        """
+        Generate a continuation of a prompt
+        
+        Args:
+            prompt (str): Prompt text
+            max_new_tokens (int): New-token budget (default: the backend's)
+            stop_sequences (list): Strings that end generation (optional)
+            
+        Returns:
+            Generation: Decoded new text (stop sequences included), prompt and new
+                        token counts, and whether a stop sequence ended it
+        """
+        inputs = self.tokenizer(prompt, return_tensors='pt').to(self.model.device)
+        prompt_tokens = inputs['input_ids'].shape[1]
+        criteria = None
+        kwargs = dict(self.generation_kwargs)
+        if stop_sequences:
+            criteria = StopSequenceCriteria(self.tokenizer, stop_sequences, prompt_tokens)
+            kwargs['stopping_criteria'] = StoppingCriteriaList([criteria])
+        if self.draft_model is not None:
+            kwargs['assistant_model'] = self.draft_model
+        
+        with torch.inference_mode():
+            output = self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens or self.max_new_tokens,
+                **kwargs
+            )
+        
+        new_ids = output[0, prompt_tokens:]
+        return Generation(
+            text=self.tokenizer.decode(new_ids, skip_special_tokens=True),
+            prompt_tokens=prompt_tokens,
+            new_tokens=int(new_ids.shape[0]),
+            stopped=bool(criteria and criteria.stopped)
+        )
+    
+    def __call__(self, prompt):
+        """Generate with the default budget and return the new text"""
+        return self.generate(prompt).text
+
+def langchain_llm(backend):
+    """
+    Wrap a backend as a LangChain LLM, for use in LangChain chains
+    
+    LangChain is imported only when this is called.
+    
+    Args:
+        backend (TransformersBackend): Backend to wrap
+        
+    Returns:
+        langchain.llms.base.LLM: The adapter
+    """
+    from langchain.llms.base import LLM
+    
+    class SkillMentorLLM(LLM):
+        @property
+        def _llm_type(self):
+            return 'skillmentor-transformers'
+        
+        def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+            text = backend.generate(prompt, stop_sequences=stop).text
+            # LangChain expects the text to end before the stop sequence
+            for sequence in stop or []:
+                text = text.split(sequence, 1)[0]
+            return text
+    
+    return SkillMentorLLM()
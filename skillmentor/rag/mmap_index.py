@@ -0,0 +1,118 @@
+"""
+Memory-mapped loading of flat FAISS indexes
+
+faiss.read_index() copies the whole index into private memory, so every
+worker process holds its own copy. Mapping the vectors read-only from the
+file instead lets all workers share one copy in the OS page cache.
+
+FAISS 1.8+ can map flat indexes itself (IO_FLAG_MMAP_IFC). For older
+builds, MmapFlatIndex searches a .npy copy of the vectors written next to
+the index with save_vectors().
+"""
+import os
+import logging
+import numpy as np
+import faiss
+
+# Header of flat indexes in the FAISS file format, by metric
+FLAT_METRICS = {
+    b'IxF2': faiss.METRIC_L2,
+    b'IxFI': faiss.METRIC_INNER_PRODUCT
+}
+
+def vectors_path(index_path):
+    """Path of the vector file stored next to an index"""
+    return index_path + '.vectors.npy'
+
+def save_vectors(index, index_path):
+    """
+    Write the vectors of a flat index next to it for memory-mapped loading
+    
+    Args:
+        index: Flat FAISS index
+        index_path (str): Path of the saved index
+        
+    Returns:
+        bool: Whether vectors were written (False for non-flat indexes)
+    """
+    if not isinstance(index, faiss.IndexFlat):
+        return False
+    vectors = faiss.vector_to_array(index.codes).view(np.float32).reshape(index.ntotal, index.d)
+    np.save(vectors_path(index_path), vectors)
+    return True
+
+class MmapFlatIndex:
+    """
+    Exact nearest-neighbour search over memory-mapped vectors, returning
+    the same distances and ids as the flat FAISS index it was saved from
+    """
+    
+    def __init__(self, path, metric_type=faiss.METRIC_L2):
+        """
+        Map a vector file
+        
+        Args:
+            path (str): .npy file of float32 vectors
+            metric_type (int): faiss.METRIC_L2 or faiss.METRIC_INNER_PRODUCT
+        """
+        self.vectors = np.load(path, mmap_mode='r')
+        if self.vectors.dtype != np.float32 or self.vectors.ndim != 2:
+            raise ValueError(f"{path} does not hold a 2-d float32 array")
+        self.d = self.vectors.shape[1]
+        self.ntotal = self.vectors.shape[0]
+        self.metric_type = metric_type
+    
+    def search(self, x, k, ids=None):
+        """
+        Search the k nearest vectors
+        
+        Args:
+            x (numpy.ndarray): float32 queries of shape (n, d)
+            k (int): Number of neighbours
+            ids (numpy.ndarray): Only search these vector ids (optional)
+            
+        Returns:
+            tuple: (distances, ids) arrays of shape (n, k); missing neighbours have id -1
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        if ids is None:
+            return faiss.knn(x, self.vectors, k, metric=self.metric_type)
+        
+        distances = np.full((x.shape[0], k), np.inf, dtype=np.float32)
+        labels = np.full((x.shape[0], k), -1, dtype=np.int64)
+        found = min(k, len(ids))
+        if found:
+            subset_distances, subset_labels = faiss.knn(x, self.vectors[ids], found, metric=self.metric_type)
+            distances[:, :found] = subset_distances
+            labels[:, :found] = ids[subset_labels]
+        return distances, labels
+
+def read_index(index_path, mmap=False):
+    """
+    Load an index, optionally memory-mapped
+    
+    With mmap, flat indexes are mapped by FAISS when it supports it, and
+    otherwise served by MmapFlatIndex from their .npy vectors. Other
+    indexes are read normally.
+    
+    Args:
+        index_path (str): Path to the FAISS index
+        mmap (bool): Map the vectors instead of copying them into memory
+        
+    Returns:
+        The index (a FAISS index or MmapFlatIndex)
+    """
+    if not mmap:
+        return faiss.read_index(index_path)
+    
+    if hasattr(faiss, 'IO_FLAG_MMAP_IFC'):
+        return faiss.read_index(index_path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+    
+    if os.path.exists(vectors_path(index_path)):
+        with open(index_path, 'rb') as f:
+            fourcc = f.read(4)
+        if fourcc in FLAT_METRICS:
+            return MmapFlatIndex(vectors_path(index_path), metric_type=FLAT_METRICS[fourcc])
+    
+    logging.warning(f"No memory-mappable vectors for {index_path}; reading it into memory")
+    return faiss.read_index(index_path)
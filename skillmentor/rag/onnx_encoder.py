@@ -0,0 +1,196 @@
+"""
+ONNX Runtime backend for sentence encoders
+
+An encoder exported with export_onnx_encoder() is a directory holding the
+(int8-quantized) transformer graph, its tokenizer and a small JSON config.
+Loading it needs only onnxruntime and tokenizers, not PyTorch.
+"""
+import os
+import json
+import inspect
+import logging
+import numpy as np
+
+# Name of the config file inside an export directory
+CONFIG_FILE = 'onnx_encoder.json'
+
+class OnnxEncoderModel:
+    """
+    Drop-in replacement for a SentenceTransformer model: encode() runs the
+    exported transformer with ONNX Runtime and pools its token embeddings
+    """
+    
+    def __init__(self, path, threads=None):
+        """
+        Load an exported encoder
+        
+        Args:
+            path (str): Export directory
+            threads (int): Intra-op threads for ONNX Runtime (default: runtime choice)
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+        
+        with open(os.path.join(path, CONFIG_FILE), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(path, self.config['model_file']), options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = [node.name for node in self.session.get_inputs()]
+        
+        self.tokenizer = Tokenizer.from_file(os.path.join(path, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.config['max_length'])
+        self.tokenizer.enable_padding(pad_id=self.config['pad_token_id'], pad_token=self.config['pad_token'])
+        logging.info(f"ONNX encoder loaded from {path} ({self.config['model_file']})")
+    
+    def encode(self, texts, batch_size=32):
+        """
+        Encode texts
+        
+        Args:
+            texts (list): Texts to encode
+            batch_size (int): Texts per session run
+            
+        Returns:
+            numpy.ndarray: float32 sentence embeddings
+        """
+        batches = []
+        for i in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[i:i + batch_size]))
+            feed = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64)
+            }
+            hidden = self.session.run(None, {name: feed[name] for name in self.input_names})[0]
+            batches.append(self._pool(hidden, feed['attention_mask']))
+        
+        embeddings = np.vstack(batches) if batches else np.zeros((0, self.config['dimension']), dtype=np.float32)
+        if self.config['normalize']:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return embeddings.astype(np.float32)
+    
+    def _pool(self, hidden, attention_mask):
+        """Pool token embeddings into sentence embeddings"""
+        if self.config['pooling'] == 'cls':
+            return hidden[:, 0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+def _pooling_mode(model):
+    """Pooling mode of a SentenceTransformer model ('mean' or 'cls')"""
+    for module in model:
+        if hasattr(module, 'pooling_mode_cls_token'):
+            if module.pooling_mode_cls_token:
+                return 'cls'
+            if module.pooling_mode_mean_tokens:
+                return 'mean'
+            raise ValueError("Only mean and CLS pooling can be exported")
+    return 'mean'
+
+def _normalizes(model):
+    """Check whether a SentenceTransformer model normalizes its output"""
+    return any(type(module).__name__ == 'Normalize' for module in model)
+
+def export_onnx_encoder(encoder, output_dir, quantize=True, opset=14):
+    """
+    Export an encoder's transformer to ONNX, optionally quantized to int8
+    
+    Args:
+        encoder (Encoder): Encoder whose SentenceTransformer model is exported
+        output_dir (str): Directory for the graph, tokenizer and config
+        quantize (bool): Apply dynamic int8 quantization to the weights
+        opset (int): ONNX opset version
+        
+    Returns:
+        str: The export directory
+    """
+    import torch
+    
+    model = encoder.model
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    max_length = model.max_seq_length or tokenizer.model_max_length
+    os.makedirs(output_dir, exist_ok=True)
+    
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids')
+                   if name in tokenizer.model_input_names]
+    
+    class HiddenStates(torch.nn.Module):
+        """Expose the last hidden state with positional inputs"""
+        def __init__(self, module):
+            super().__init__()
+            self.module = module
+        
+        def forward(self, *inputs):
+            return self.module(**dict(zip(input_names, inputs)))[0]
+    
+    sample = tokenizer(["export sample"], return_tensors='pt')
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        # Newer PyTorch releases default to the dynamo exporter; keep the
+        # TorchScript exporter, which handles dynamic_axes
+        export_kwargs['dynamo'] = False
+    
+    fp32_path = os.path.join(output_dir, 'model.onnx')
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(transformer),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            **export_kwargs
+        )
+    model_file = 'model.onnx'
+    
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        
+        quantize_dynamic(fp32_path, os.path.join(output_dir, 'model.int8.onnx'), weight_type=QuantType.QInt8)
+        model_file = 'model.int8.onnx'
+    
+    tokenizer.save_pretrained(output_dir)
+    config = {
+        'encoder': encoder.name,
+        'model_id': encoder.model_id,
+        'dimension': encoder.base_dimension,
+        'pooling': _pooling_mode(model),
+        'normalize': _normalizes(model),
+        'max_length': max_length,
+        'pad_token': tokenizer.pad_token,
+        'pad_token_id': tokenizer.pad_token_id,
+        'model_file': model_file,
+        'quantized': quantize
+    }
+    with open(os.path.join(output_dir, CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    
+    logging.info(f"Exported {encoder.name} to {os.path.join(output_dir, model_file)}")
+    return output_dir
+
+def cosine_similarities(a, b):
+    """
+    Row-wise cosine similarity of two embedding matrices
+    
+    Args:
+        a (numpy.ndarray): First embeddings
+        b (numpy.ndarray): Second embeddings
+        
+    Returns:
+        numpy.ndarray: One similarity per row
+    """
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return (a * b).sum(axis=1)
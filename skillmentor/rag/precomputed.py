@@ -0,0 +1,206 @@
+"""
+Precomputed advice for the most frequent questions
+
+Most traffic is a few hundred recurring questions. Offline, recorded
+queries are clustered by embedding, one representative question per
+cluster gets advice from the full pipeline (and its translations), and
+the results are stored in a small table of normalized embeddings. At
+serve time a query whose embedding is close enough to one of them gets
+that advice back from a single matrix-vector product.
+"""
+import os
+import json
+import logging
+import threading
+import numpy as np
+import faiss
+
+# Default location of the precomputed advice table (relative to the project root)
+DEFAULT_PRECOMPUTED_PATH = os.path.join('data', 'processed', 'precomputed_advice.npz')
+
+def normalize_rows(embeddings):
+    """L2-normalize embedding rows so inner products are cosine similarities"""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.ascontiguousarray(embeddings / np.maximum(norms, 1e-12), dtype=np.float32)
+
+def cluster_queries(queries, embeddings, counts, n_clusters, niter=20, seed=1234):
+    """
+    Cluster queries by embedding and pick a representative for each cluster
+    
+    Queries are weighted by how often they were asked, and clusters are
+    ranked by the traffic they cover. The representative is the member
+    closest to the cluster centroid.
+    
+    Args:
+        queries (list): Distinct query texts
+        embeddings (numpy.ndarray): Their embeddings
+        counts (list): Times each query was asked
+        n_clusters (int): Number of clusters (at most the number of queries)
+        niter (int): k-means iterations
+        seed (int): k-means random seed
+        
+    Returns:
+        list: One dict per cluster, most traffic first, with the representative
+              'question', its 'similarity' to the centroid, the cluster 'size'
+              (distinct queries) and 'count' (requests)
+    """
+    if not queries:
+        return []
+    embeddings = normalize_rows(embeddings)
+    n_clusters = min(n_clusters, len(queries))
+    kmeans = faiss.Kmeans(embeddings.shape[1], n_clusters, niter=niter, seed=seed, spherical=True)
+    kmeans.train(embeddings, weights=np.asarray(counts, dtype=np.float32))
+    similarities, assignments = kmeans.index.search(embeddings, 1)
+    
+    clusters = {}
+    for row, (cluster, similarity) in enumerate(zip(assignments[:, 0], similarities[:, 0])):
+        entry = clusters.setdefault(int(cluster), {'row': row, 'similarity': similarity, 'size': 0, 'count': 0})
+        entry['size'] += 1
+        entry['count'] += counts[row]
+        if similarity > entry['similarity']:
+            entry['row'], entry['similarity'] = row, similarity
+    
+    ranked = sorted(clusters.values(), key=lambda entry: entry['count'], reverse=True)
+    return [
+        {
+            'question': queries[entry['row']],
+            'similarity': float(entry['similarity']),
+            'size': entry['size'],
+            'count': entry['count']
+        }
+        for entry in ranked
+    ]
+
+class PrecomputedAdvice:
+    """
+    Lookup table from question embeddings to precomputed advice
+    """
+    
+    def __init__(self, embeddings, questions, categories, advice, threshold=0.9, encoder=None):
+        """
+        Initialize the table
+        
+        Args:
+            embeddings (numpy.ndarray): Embeddings of the representative questions
+            questions (list): Representative questions, in embedding order
+            categories (list): Query category of each question
+            advice (dict): Advice per language code ('en' required), each a list
+                           in question order
+            threshold (float): Lowest cosine similarity served from the table
+            encoder (dict): Metadata of the encoder that produced the embeddings
+        """
+        if 'en' not in advice:
+            raise ValueError("Precomputed advice needs English ('en') advice")
+        if any(len(texts) != len(questions) for texts in advice.values()) or len(embeddings) != len(questions):
+            raise ValueError("Embeddings, questions and advice must have one entry per question")
+        
+        self.embeddings = normalize_rows(embeddings).reshape(len(questions), -1)
+        self.questions = list(questions)
+        self.categories = list(categories)
+        self.advice = {lang: list(texts) for lang, texts in advice.items()}
+        self.threshold = threshold
+        self.encoder = encoder or {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.questions)
+    
+    def match(self, embedding, source_lang='en'):
+        """
+        Find precomputed advice for a query embedding
+        
+        Args:
+            embedding (numpy.ndarray): Query embedding (same encoder as the table)
+            source_lang (str): Language the advice is wanted in
+            
+        Returns:
+            dict: 'question', 'category', 'similarity', English 'advice' and
+                  'advice_source_lang' (None when not precomputed for source_lang),
+                  or None when no question is within the threshold
+        """
+        similarity = -1.0
+        if len(self.questions):
+            similarities = self.embeddings @ normalize_rows(np.reshape(embedding, (1, -1)))[0]
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+        
+        with self._lock:
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+        
+        translations = self.advice.get(source_lang)
+        return {
+            'question': self.questions[best],
+            'category': self.categories[best],
+            'similarity': similarity,
+            'advice': self.advice['en'][best],
+            'advice_source_lang': translations[best] if translations else None
+        }
+    
+    def stats(self):
+        """
+        Get lookup statistics
+        
+        Returns:
+            dict: Table size, languages, threshold, hits, misses and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.questions),
+                'languages': sorted(self.advice),
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+    
+    def save(self, path):
+        """
+        Write the table to a compressed .npz file
+        
+        Args:
+            path (str): Output path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        metadata = {
+            'questions': self.questions,
+            'categories': self.categories,
+            'advice': self.advice,
+            'encoder': self.encoder
+        }
+        # Write next to the target and rename, so readers never see a partial file
+        staging = path + '.tmp.npz'
+        np.savez_compressed(staging, embeddings=self.embeddings.astype(np.float16), metadata=np.array(json.dumps(metadata)))
+        os.replace(staging, path)
+        logging.info(f"Precomputed advice for {len(self.questions)} questions written to {path}")
+    
+    @classmethod
+    def load(cls, path, threshold=0.9):
+        """
+        Read a table written by save()
+        
+        Args:
+            path (str): Table path
+            threshold (float): Lowest cosine similarity served from the table
+            
+        Returns:
+            PrecomputedAdvice: The table
+        """
+        with np.load(path, allow_pickle=False) as data:
+            embeddings = data['embeddings'].astype(np.float32)
+            metadata = json.loads(str(data['metadata']))
+        logging.info(f"Loaded precomputed advice for {len(metadata['questions'])} questions from {path}")
+        return cls(
+            embeddings,
+            metadata['questions'],
+            metadata['categories'],
+            metadata['advice'],
+            threshold=threshold,
+            encoder=metadata['encoder']
+        )
@@ -0,0 +1,63 @@
+"""
+Caches for repeated retrieval queries
+
+Results are keyed by (query hash, k, category, index generation),
+so entries from a previous index can never be served after a swap; the
+retriever also clears the caches whenever it switches index.
+"""
+import sys
+from skillmentor.storage.cache import LRUCache
+
+class RetrievalCache:
+    """
+    LRU caches of retrieval results and query embeddings
+    """
+    
+    def __init__(self, maxsize=1024, embedding_maxsize=1024):
+        """
+        Initialize the caches
+        
+        Args:
+            maxsize (int): Number of retrieval results kept
+            embedding_maxsize (int): Number of query embeddings kept
+        """
+        self.results = LRUCache(maxsize=maxsize)
+        self.embeddings = LRUCache(maxsize=embedding_maxsize)
+    
+    def clear(self):
+        """Drop all cached results and embeddings"""
+        self.results.clear()
+        self.embeddings.clear()
+    
+    def memory_bytes(self):
+        """
+        Estimate the memory held by the caches
+        
+        Cached results reference the index's document strings, which the
+        index owns, so only keys, result tuples and embeddings are counted.
+        
+        Returns:
+            dict: Estimated bytes for results and embeddings
+        """
+        results = sum(
+            sys.getsizeof(key) + sys.getsizeof(key[0]) + sys.getsizeof(docs)
+            for key, docs in self.results.items()
+        )
+        embeddings = sum(
+            sys.getsizeof(key) + sys.getsizeof(key[0]) + embedding.nbytes
+            for key, embedding in self.embeddings.items()
+        )
+        return {'results': results, 'embeddings': embeddings}
+    
+    def stats(self):
+        """
+        Get cache statistics
+        
+        Returns:
+            dict: Counters, hit ratio and estimated memory of each cache
+        """
+        memory = self.memory_bytes()
+        return {
+            'results': dict(self.results.stats(), memory_bytes=memory['results']),
+            'embeddings': dict(self.embeddings.stats(), memory_bytes=memory['embeddings'])
+        }
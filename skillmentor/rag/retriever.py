@@ -2,10 +2,20 @@
 Document retrieval functionality using FAISS vector store
 """
 import os
+import copy
 import logging
-import numpy as np
-from sentence_transformers import SentenceTransformer
+import itertools
+import threading
+from contextlib import contextmanager
 import faiss
+import numpy as np
+from skillmentor.rag.encoders import create_encoder
+from skillmentor.rag.mmap_index import read_index, save_vectors
+from skillmentor.rag.index_store import (
+    DOCUMENT_SEPARATOR, IndexBundle, category_key, current_version, load_bundle, publish, read_documents, write_bundle
+)
+from skillmentor.rag.result_cache import RetrievalCache
+from skillmentor.nlp.tokenizer import query_hash
 
 class DocumentRetriever:
     """
@@ -13,7 +23,8 @@ class DocumentRetriever:
     using FAISS vector store for efficient similarity search
     """
     
-    def __init__(self, index_path=None, embeddings_path=None, documents_path=None):
+    def __init__(self, index_path=None, embeddings_path=None, documents_path=None, encoder=None, mmap=False,
+                 category_max_distance=None, cache_size=1024):
         """
         Initialize the document retriever
         
@@ -21,19 +32,84 @@ class DocumentRetriever:
             index_path (str): Path to the FAISS index
             embeddings_path (str): Path to the embeddings
             documents_path (str): Path to the documents
+            encoder (str or Encoder): Registered encoder name or Encoder instance
+                                      (default: minilm)
+            mmap (bool): Memory-map loaded indexes so worker processes share one copy
+            category_max_distance (float): Search the whole index instead when the best
+                                           match within a category is farther than this
+            cache_size (int): Retrieval results (and query embeddings) to cache;
+                              0 disables the cache
         """
-        self.model = SentenceTransformer('microsoft/codebert-base')
-        self.index = None
-        self.documents = []
+        self.encoder = create_encoder(encoder)
+        self.mmap = mmap
+        self.category_max_distance = category_max_distance
+        self.index_metadata = {}
+        self.cache = RetrievalCache(maxsize=cache_size, embedding_maxsize=cache_size) if cache_size else None
+        self._bundle = IndexBundle(None, [], self.encoder)
+        self._generations = itertools.count(1)
+        self._swap_lock = threading.Lock()
         
         # Load index and documents if paths are provided
         if index_path and os.path.exists(index_path) and documents_path and os.path.exists(documents_path):
-            self.load_index(index_path)
-            self.load_documents(documents_path)
+            if self.load_index(index_path) and self.load_documents(documents_path):
+                self._check_document_count()
             logging.info("Document retriever initialized with existing index and documents")
         else:
             logging.info("Document retriever initialized without index")
     
+    @property
+    def index(self):
+        """FAISS index of the active bundle"""
+        return self._bundle.index
+    
+    @index.setter
+    def index(self, index):
+        self._activate(IndexBundle(index, self.documents, self.encoder))
+    
+    @property
+    def documents(self):
+        """Documents of the active bundle"""
+        return self._bundle.documents
+    
+    @documents.setter
+    def documents(self, documents):
+        self._activate(IndexBundle(self.index, documents, self._bundle.encoder))
+    
+    @property
+    def version(self):
+        """Version of the active index bundle (None for plain index files)"""
+        return self._bundle.version
+    
+    def _activate(self, bundle):
+        """Make a bundle the one new queries use and retire the previous one"""
+        with self._swap_lock:
+            bundle.generation = next(self._generations)
+            previous = self._bundle
+            self._bundle = bundle
+        # Cache keys carry the generation, so clearing only frees memory
+        if self.cache:
+            self.cache.clear()
+        previous.retire()
+    
+    @contextmanager
+    def lease(self):
+        """
+        Hold the active bundle for the duration of a query
+        
+        The bundle stays usable even if a newer version is swapped in
+        meanwhile; it is freed once its last lease is returned.
+        
+        Yields:
+            IndexBundle: The active bundle
+        """
+        with self._swap_lock:
+            bundle = self._bundle
+            bundle.acquire()
+        try:
+            yield bundle
+        finally:
+            bundle.release()
+    
     def create_index(self, documents, save_path=None):
         """
         Create a FAISS index from documents
@@ -46,20 +122,25 @@ class DocumentRetriever:
             bool: Success status
         """
         try:
-            # Store documents
-            self.documents = documents
-            
-            # Generate embeddings
-            embeddings = self.generate_embeddings(documents)
+            # Generate embeddings (fitting the PCA projection first if one is configured).
+            # The projection belongs to this index; fit it on a copy so queries still
+            # running on the previous index keep theirs, as load_bundle does
+            encoder = copy.copy(self.encoder) if self.encoder.pca_dim else self.encoder
+            embeddings = encoder.fit_encode(documents)
             
             # Create and train FAISS index
             dimension = embeddings.shape[1]
-            self.index = faiss.IndexFlatL2(dimension)
-            self.index.add(embeddings)
+            index = faiss.IndexFlatL2(dimension)
+            index.add(embeddings)
+            
+            # Switch queries to the new index and documents together
+            self._activate(IndexBundle(index, documents, encoder))
             
             # Save index if path provided
             if save_path:
-                faiss.write_index(self.index, save_path)
+                faiss.write_index(index, save_path)
+                save_vectors(index, save_path)
+                encoder.save(save_path, len(documents))
                 logging.info(f"FAISS index saved to {save_path}")
             
             return True
@@ -71,6 +152,9 @@ class DocumentRetriever:
         """
         Load a FAISS index from file
         
+        The index is refused if its metadata names a different encoder
+        or if its dimension does not match the encoder output.
+        
         Args:
             index_path (str): Path to the FAISS index
             
@@ -78,8 +162,12 @@ class DocumentRetriever:
             bool: Success status
         """
         try:
-            self.index = faiss.read_index(index_path)
-            logging.info(f"FAISS index loaded from {index_path}")
+            index = read_index(index_path, mmap=self.mmap)
+            # The stored projection is loaded onto a copy, like create_index fits one
+            encoder = copy.copy(self.encoder) if self.encoder.pca_dim else self.encoder
+            self.index_metadata = encoder.check(index_path, index.d)
+            self._activate(IndexBundle(index, self.documents, encoder))
+            logging.info(f"FAISS index loaded from {index_path} ({self.encoder.name}, {index.d} dimensions)")
             return True
         except Exception as e:
             logging.error(f"Error loading index: {str(e)}")
@@ -96,14 +184,22 @@ class DocumentRetriever:
             bool: Success status
         """
         try:
-            with open(documents_path, 'r', encoding='utf-8') as f:
-                self.documents = f.readlines()
+            self.documents = read_documents(documents_path)
             logging.info(f"Documents loaded from {documents_path}")
             return True
         except Exception as e:
             logging.error(f"Error loading documents: {str(e)}")
             return False
     
+    def _check_document_count(self):
+        """Drop the index if it does not cover exactly the loaded documents"""
+        if self.index is not None and self.index.ntotal != len(self.documents):
+            logging.error(
+                f"Index holds {self.index.ntotal} vectors but {len(self.documents)} documents were loaded; "
+                "rebuild the index"
+            )
+            self.index = None
+    
     def generate_embeddings(self, texts):
         """
         Generate embeddings for a list of texts
@@ -114,31 +210,270 @@ class DocumentRetriever:
         Returns:
             numpy.ndarray: Text embeddings
         """
-        embeddings = self.model.encode(texts)
-        return np.array(embeddings).astype('float32')
+        with self.lease() as bundle:
+            return bundle.encoder.encode(texts)
     
-    def retrieve(self, query, k=3):
+    def retrieve(self, query, k=3, category=None):
         """
         Retrieve the top-k most relevant documents for a query
         
+        Results are cached per (query hash, k, category, index), and the
+        cache is cleared whenever the index changes. A cached result is
+        returned without leasing the index or building a batch.
+        
+        With a category, only the documents whose 'Category:' header matches
+        are searched. The whole index is searched as well when the category
+        has fewer than k matches (to fill the remaining slots) or when its
+        best match is farther than category_max_distance.
+        
         Args:
             query (str): The query text
             k (int): Number of documents to retrieve
+            category (str): Category to search within (optional)
             
         Returns:
             list: List of retrieved documents
         """
-        if not self.index:
-            logging.error("FAISS index not initialized")
-            return []
+        hashes = [query_hash(query)]
+        if self.cache:
+            # A swap clears the cache, so reading the generation needs no lease
+            cached = self.cache.results.get((hashes[0], k, category_key(category), self._bundle.generation))
+            if cached is not None:
+                return list(cached)
+        return self._retrieve_batch([query], hashes, k, [category], lookup=False)[0]
+    
+    def retrieve_batch(self, queries, k=3, categories=None):
+        """
+        Retrieve the top-k documents for many queries at once
         
-        # Generate query embedding
-        query_embedding = self.generate_embeddings([query])
+        Queries missing from the cache are encoded in one call and searched
+        with one FAISS search per category, falling back to the whole index
+        like retrieve().
         
-        # Perform search
-        distances, indices = self.index.search(query_embedding, k)
+        Args:
+            queries (list): Query texts
+            k (int): Number of documents to retrieve per query
+            categories (list): Category to search within for each query
+                               (optional; None entries search the whole index)
+                               
+        Returns:
+            list: One list of retrieved documents per query
+        """
+        if categories is None:
+            categories = [None] * len(queries)
+        return self._retrieve_batch(queries, [query_hash(query) for query in queries], k, categories)
+    
+    def _retrieve_batch(self, queries, hashes, k, categories, lookup=True):
+        """
+        Retrieve for queries whose hashes are already computed
+        
+        With lookup=False the result cache is only filled, for callers that
+        have just missed it.
+        """
+        with self.lease() as bundle:
+            if not bundle.index:
+                logging.error("FAISS index not initialized")
+                return [[] for _ in queries]
+            
+            results = [None] * len(queries)
+            pending = {}
+            for position, (query, digest, category) in enumerate(zip(queries, hashes, categories)):
+                key = (digest, k, category_key(category), bundle.generation)
+                if self.cache and lookup:
+                    cached = self.cache.results.get(key)
+                    if cached is not None:
+                        results[position] = list(cached)
+                        continue
+                # Repeated queries are searched once, with the first spelling seen
+                pending.setdefault(key, (query, category, []))[2].append(position)
+            
+            if pending:
+                keys = list(pending)
+                query_embeddings = self._embed(
+                    bundle, [pending[key][0] for key in keys], hashes=[key[0] for key in keys]
+                )
+                hits = self._search(bundle, query_embeddings, k, [pending[key][1] for key in keys])
+                for key, row_hits in zip(keys, hits):
+                    # Get the corresponding documents
+                    retrieved_docs = [bundle.documents[idx] for idx in row_hits]
+                    if self.cache:
+                        self.cache.results.put(key, tuple(retrieved_docs))
+                    first, *repeats = pending[key][2]
+                    results[first] = retrieved_docs
+                    for position in repeats:
+                        results[position] = list(retrieved_docs)
+        
+        return results
+    
+    def _search(self, bundle, query_embeddings, k, categories):
+        """
+        Search a batch of query embeddings, each within its category's partition
+        
+        Returns:
+            list: Document ids found for each query
+        """
+        hits = [None] * len(categories)
+        groups = {}
+        for row, category in enumerate(categories):
+            partition = bundle.partition(category) if category else None
+            group = category_key(category) if partition is not None else None
+            groups.setdefault(group, (partition, []))[1].append(row)
         
-        # Get the corresponding documents
-        retrieved_docs = [self.documents[idx] for idx in indices[0]]
+        fallback = []
+        for partition, rows in groups.values():
+            distances, indices = bundle.search(query_embeddings[rows], k, partition=partition)
+            for row, row_distances, row_indices in zip(rows, distances, indices):
+                hits[row] = [idx for idx in row_indices if idx >= 0]
+                if partition is not None:
+                    too_far = (self.category_max_distance is not None and hits[row]
+                               and row_distances[0] > self.category_max_distance)
+                    if too_far or len(hits[row]) < k:
+                        fallback.append((row, too_far))
         
-        return retrieved_docs 
\ No newline at end of file
+        # Search the whole index for queries whose category fell short
+        if fallback:
+            _, global_indices = bundle.search(query_embeddings[[row for row, _ in fallback]], k)
+            for (row, too_far), row_indices in zip(fallback, global_indices):
+                global_hits = [idx for idx in row_indices if idx >= 0]
+                if too_far:
+                    hits[row] = global_hits
+                else:
+                    hits[row] += [idx for idx in global_hits if idx not in hits[row]][:k - len(hits[row])]
+        return hits
+    
+    def embed_query(self, query):
+        """
+        Encode a query the way retrieval does, sharing its embedding cache
+        
+        Args:
+            query (str): The query text
+            
+        Returns:
+            numpy.ndarray: The query embedding
+        """
+        return self.embed_queries([query])[0]
+    
+    def embed_queries(self, queries):
+        """
+        Encode many queries in one call the way retrieval does, sharing its embedding cache
+        
+        Args:
+            queries (list): Query texts
+            
+        Returns:
+            numpy.ndarray: One embedding row per query
+        """
+        with self.lease() as bundle:
+            return self._embed(bundle, list(queries))
+    
+    def _embed(self, bundle, queries, hashes=None):
+        """
+        Encode queries in one call, reusing cached embeddings
+        
+        The query text as given is encoded; the hash of its normalized form
+        is only the cache key, so spellings differing in case or spacing
+        share an entry. Callers that already hashed the queries pass hashes.
+        """
+        if not self.cache:
+            return bundle.encoder.encode(queries)
+        if hashes is None:
+            hashes = [query_hash(query) for query in queries]
+        keys = [(digest, bundle.generation) for digest in hashes]
+        embeddings = [self.cache.embeddings.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = bundle.encoder.encode([queries[i] for i in missing])
+            for i, row in zip(missing, encoded):
+                # Copy so a cached row does not keep the whole batch alive
+                embeddings[i] = row[np.newaxis].copy()
+                self.cache.embeddings.put(keys[i], embeddings[i])
+        return np.vstack(embeddings)
+    
+    def cache_stats(self):
+        """
+        Get retrieval cache statistics
+        
+        Returns:
+            dict: Hit ratio, counters and estimated memory of the result and
+                  embedding caches (empty if caching is disabled)
+        """
+        return self.cache.stats() if self.cache else {}
+    
+    def save_bundle(self, root, params=None, make_current=True):
+        """
+        Write the active index and documents as a new bundle version
+        
+        Args:
+            root (str): Bundle root directory
+            params (dict): Build parameters to record in the manifest
+            make_current (bool): Publish the version so readers pick it up
+            
+        Returns:
+            str: The new version, or None on failure
+        """
+        try:
+            with self.lease() as bundle:
+                version = write_bundle(root, bundle.index, bundle.documents, bundle.encoder, params=params)
+            if make_current:
+                publish(root, version)
+            return version
+        except Exception as e:
+            logging.error(f"Error saving index bundle: {str(e)}")
+            return None
+    
+    def load_bundle(self, root, version=None):
+        """
+        Load a bundle version and switch queries to it
+        
+        Queries already running finish on the previous version, which is
+        freed when the last of them returns.
+        
+        Args:
+            root (str): Bundle root directory
+            version (str): Version to load (default: the published one)
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            bundle = load_bundle(root, self.encoder, version=version, mmap=self.mmap)
+        except Exception as e:
+            logging.error(f"Error loading index bundle: {str(e)}")
+            return False
+        
+        previous = self.version
+        self.index_metadata = bundle.manifest
+        self._activate(bundle)
+        logging.info(f"Switched index from {previous or 'unversioned'} to {bundle.version}")
+        return True
+    
+    def swap_bundle(self, root, version=None):
+        """
+        Load a bundle version in a background thread and switch to it
+        when it is ready; queries keep using the current version meanwhile
+        
+        Args:
+            root (str): Bundle root directory
+            version (str): Version to load (default: the published one)
+            
+        Returns:
+            threading.Thread: The loading thread
+        """
+        thread = threading.Thread(target=self.load_bundle, args=(root, version), name='index-swap', daemon=True)
+        thread.start()
+        return thread
+    
+    def refresh(self, root):
+        """
+        Swap to the published version in the background if it changed
+        
+        Args:
+            root (str): Bundle root directory
+            
+        Returns:
+            threading.Thread: The loading thread, or None if already current
+        """
+        version = current_version(root)
+        if not version or version == self.version:
+            return None
+        return self.swap_bundle(root, version) 
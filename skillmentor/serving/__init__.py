@@ -0,0 +1,3 @@
+"""
+Serving module for protecting the pipeline under concurrent load
+"""
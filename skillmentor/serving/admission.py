@@ -0,0 +1,248 @@
+"""
+Admission control and circuit breaking in front of a slow backend
+
+AdmissionController bounds how many calls run at once and how long the
+rest may queue: a caller whose expected wait exceeds the latency SLO is
+turned away immediately instead of queueing, so it can serve a degraded
+answer while it still has time. CircuitBreaker stops calling a backend
+that keeps failing or timing out, and lets a single trial call through
+once it has had time to recover.
+"""
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+class Overloaded(RuntimeError):
+    """
+    Raised when a call is not admitted
+    
+    Attributes:
+        reason (str): 'queue_full', 'slo' (expected wait too long) or 'deadline'
+                      (waited in the queue until the SLO ran out)
+    """
+    
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded FIFO queue and queueing deadlines
+    """
+    
+    def __init__(self, max_concurrency=1, max_queue=8, slo=10.0, smoothing=0.2):
+        """
+        Initialize the controller
+        
+        Args:
+            max_concurrency (int): Calls allowed to run at once
+            max_queue (int): Callers allowed to wait for a slot
+            slo (float): Longest time in seconds a caller may wait in the queue
+            smoothing (float): Weight of the newest call in the moving average of
+                               service time used to predict queue waits
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+        
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.slo = slo
+        self.smoothing = smoothing
+        self.service_time = None
+        self._running = 0
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self.admitted = 0
+        self.rejected = {'queue_full': 0, 'slo': 0, 'deadline': 0}
+    
+    def expected_wait(self):
+        """Predicted seconds a new caller would wait for a slot (0 if one is free)"""
+        with self._condition:
+            return self._expected_wait()
+    
+    def _expected_wait(self):
+        if self._running < self.max_concurrency and not self._queue:
+            return 0.0
+        if self.service_time is None:
+            return 0.0
+        # Callers ahead leave in rounds of max_concurrency, one service time each
+        return (len(self._queue) // self.max_concurrency + 1) * self.service_time
+    
+    @contextmanager
+    def slot(self):
+        """
+        Hold one of the concurrency slots for the duration of a call
+        
+        Raises:
+            Overloaded: If the queue is full, the expected wait exceeds the SLO,
+                        or no slot freed up within the SLO
+        """
+        release = self.acquire()
+        try:
+            yield
+        finally:
+            release()
+    
+    def acquire(self):
+        """
+        Take one of the concurrency slots until the returned function is called
+        
+        For calls that may outlive their caller, such as work handed to a
+        thread pool that the caller stops waiting for: the slot stays taken
+        until the work itself finishes.
+        
+        Returns:
+            callable: Releases the slot; call it exactly once
+            
+        Raises:
+            Overloaded: If the queue is full, the expected wait exceeds the SLO,
+                        or no slot freed up within the SLO
+        """
+        self._acquire()
+        start = time.perf_counter()
+        return lambda: self._release(time.perf_counter() - start)
+    
+    def _acquire(self):
+        with self._condition:
+            if self._running < self.max_concurrency and not self._queue:
+                self._running += 1
+                self.admitted += 1
+                return
+            
+            if len(self._queue) >= self.max_queue:
+                self.rejected['queue_full'] += 1
+                raise Overloaded('queue_full', f"{len(self._queue)} calls already queued")
+            expected = self._expected_wait()
+            if expected > self.slo:
+                self.rejected['slo'] += 1
+                raise Overloaded('slo', f"Expected wait {expected:.1f}s exceeds the {self.slo:.1f}s SLO")
+            
+            ticket = object()
+            self._queue.append(ticket)
+            deadline = time.monotonic() + self.slo
+            try:
+                while self._queue[0] is not ticket or self._running >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected['deadline'] += 1
+                        raise Overloaded('deadline', f"No slot within the {self.slo:.1f}s SLO")
+                    self._condition.wait(remaining)
+            finally:
+                self._queue.remove(ticket)
+                # The next caller may now be at the head of the queue
+                self._condition.notify_all()
+            self._running += 1
+            self.admitted += 1
+    
+    def _release(self, seconds):
+        with self._condition:
+            self._running -= 1
+            if self.service_time is None:
+                self.service_time = seconds
+            else:
+                self.service_time += self.smoothing * (seconds - self.service_time)
+            self._condition.notify_all()
+    
+    def stats(self):
+        """
+        Get admission statistics
+        
+        Returns:
+            dict: Running and queued calls, admissions, rejections by reason
+                  and the average service time in seconds
+        """
+        with self._condition:
+            return {
+                'running': self._running,
+                'queued': len(self._queue),
+                'admitted': self.admitted,
+                'rejected': dict(self.rejected),
+                'service_time': self.service_time
+            }
+
+class CircuitBreaker:
+    """
+    Stops calls to a backend after repeated failures
+    
+    Closed: calls go through. After failure_threshold consecutive failures
+    the circuit opens and calls are refused for reset_timeout seconds.
+    Then it is half-open: one trial call goes through, and its outcome
+    closes or reopens the circuit.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Initialize the breaker
+        
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """
+        Decide whether a call may go to the backend
+        
+        A caller that is allowed must report the outcome with
+        record_success or record_failure, or record_skipped if it did
+        not make the call.
+        
+        Returns:
+            bool: True if the call may proceed
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+    
+    def record_success(self):
+        """Report a successful call"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+    
+    def record_skipped(self):
+        """Report that an allowed call was not made after all (e.g. it was not admitted)"""
+        with self._lock:
+            # A half-open circuit lets the next caller make the trial instead
+            self._trial_running = False
+    
+    def record_failure(self):
+        """Report a failed or timed out call"""
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+    
+    def stats(self):
+        """
+        Get breaker statistics
+        
+        Returns:
+            dict: State, consecutive failures and number of times the circuit opened
+        """
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'trips': self.trips}
@@ -0,0 +1,127 @@
+"""
+In-flight request coalescing ("singleflight")
+
+While a computation for a key is running, other callers asking for the
+same key wait for it and share its result instead of starting their own.
+Nothing is cached: once the computation finishes, the next caller starts
+a fresh one.
+"""
+import threading
+
+class TooManyWaiters(RuntimeError):
+    """Raised when a key already has the maximum number of waiting callers"""
+
+class _Call:
+    """A computation in flight and the callers waiting on it"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one computation
+    """
+    
+    def __init__(self, max_waiters=100, timeout=30.0):
+        """
+        Initialize the coalescer
+        
+        Args:
+            max_waiters (int): Callers allowed to wait on one computation;
+                               further callers get TooManyWaiters
+            timeout (float): Default seconds a caller waits before giving up
+                             (None to wait indefinitely)
+        """
+        if max_waiters < 1:
+            raise ValueError("max_waiters must be a positive integer")
+        
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+        self.rejected = 0
+        self.timeouts = 0
+    
+    def do(self, key, func, timeout=None):
+        """
+        Run func, or wait for the run already in flight for key
+        
+        The first caller for a key runs func; callers arriving before it
+        finishes wait and receive the same result, or the same exception.
+        
+        Args:
+            key: Hashable key identifying the computation
+            func (callable): Function taking no arguments
+            timeout (float): Seconds to wait for a computation in flight
+                             (default: the coalescer's timeout)
+                             
+        Returns:
+            tuple: (result, shared) where shared is True if the result came
+                   from another caller's computation
+                   
+        Raises:
+            TooManyWaiters: If max_waiters callers are already waiting on key
+            TimeoutError: If the computation in flight did not finish in time
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            elif call.waiters >= self.max_waiters:
+                self.rejected += 1
+                raise TooManyWaiters(f"{call.waiters} callers already waiting for the same request")
+            else:
+                call.waiters += 1
+                leader = False
+        
+        if leader:
+            try:
+                call.result = func()
+                return call.result, False
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        
+        if not call.done.wait(self.timeout if timeout is None else timeout):
+            with self._lock:
+                call.waiters -= 1
+                self.timeouts += 1
+            raise TimeoutError("Timed out waiting for the same request in flight")
+        if call.error is not None:
+            raise call.error
+        with self._lock:
+            self.shared += 1
+        return call.result, True
+    
+    def in_flight(self):
+        """Number of keys with a computation running"""
+        with self._lock:
+            return len(self._calls)
+    
+    def stats(self):
+        """
+        Get coalescing statistics
+        
+        Returns:
+            dict: Computations run, results shared, callers rejected and timed out,
+                  and keys in flight
+        """
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'shared': self.shared,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'in_flight': len(self._calls)
+            }
@@ -0,0 +1,184 @@
+"""
+Cache warming from the recorded query history
+
+After a deploy or restart every cache is empty, so the first users pay
+for encoding, retrieval, generation and translation. CacheWarmer replays
+the most frequent recorded queries through a warm-up function in a
+background thread at low priority, backing off while live traffic is
+being served, and reports its progress for a readiness check.
+"""
+import os
+import time
+import logging
+import threading
+from collections import Counter
+from skillmentor.nlp.tokenizer import normalize_query
+
+def top_queries(records, n=100):
+    """
+    Most frequent queries in recorded advice requests
+    
+    Queries are counted by their normalized form; the first spelling seen
+    stands for all of them.
+    
+    Args:
+        records (iterable): Advice request records with a 'query' and
+                            optionally a 'source_lang'
+        n (int): Number of queries to return (None for all)
+        
+    Returns:
+        list: (query, source_lang, count) tuples, most frequent first
+    """
+    counts = Counter()
+    first_seen = {}
+    for record in records:
+        query = record.get('query')
+        if not query:
+            continue
+        source_lang = record.get('source_lang') or 'en'
+        key = (normalize_query(query), source_lang)
+        counts[key] += 1
+        first_seen.setdefault(key, query)
+    return [(first_seen[key], key[1], count) for key, count in counts.most_common(n)]
+
+class CacheWarmer:
+    """
+    Runs a warm-up function over queries in a low-priority background thread
+    """
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    STOPPED = 'stopped'
+    
+    def __init__(self, warm, queries, batch_size=8, pause=0.05, idle=None,
+                 ready_fraction=1.0, niceness=10):
+        """
+        Initialize the warmer
+        
+        Args:
+            warm (callable): Called as warm(batch) with a list of (query, source_lang)
+                             pairs; fills the caches and returns nothing
+            queries (list): (query, source_lang) pairs or top_queries() tuples,
+                            warmed in order
+            batch_size (int): Queries passed to one warm call
+            pause (float): Seconds to sleep between batches, and between checks
+                           while the application is busy
+            idle (callable): Returns True when no live request is being served;
+                             warming waits for it before each batch (optional)
+            ready_fraction (float): Share of the queries that must be warmed
+                                    before the warmer reports ready
+            niceness (int): Scheduling niceness added to the warm-up thread
+                            (Linux only; 0 keeps normal priority)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        
+        self.warm = warm
+        self.queries = [(query[0], query[1]) for query in queries]
+        self.batch_size = batch_size
+        self.pause = pause
+        self.idle = idle
+        self.ready_fraction = ready_fraction
+        self.niceness = niceness
+        self.state = self.PENDING
+        self.warmed = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Start warming in the background (a second call does nothing)"""
+        if self._thread is not None:
+            return
+        self.started_at = time.time()
+        self.state = self.RUNNING
+        self._thread = threading.Thread(target=self._run, name='cache-warmer', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """
+        Stop warming after the batch in progress
+        
+        Args:
+            timeout (float): Seconds to wait for the thread to finish (None to wait indefinitely)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def wait(self, timeout=None):
+        """
+        Wait for warming to finish
+        
+        Args:
+            timeout (float): Seconds to wait (None to wait indefinitely)
+            
+        Returns:
+            bool: True if warming has finished
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.state in (self.DONE, self.STOPPED)
+    
+    @property
+    def ready(self):
+        """Whether enough queries are warmed (or warming is over) to take traffic"""
+        if self.state in (self.DONE, self.STOPPED) or not self.queries:
+            return True
+        return self.warmed + self.failed >= self.ready_fraction * len(self.queries)
+    
+    def _run(self):
+        """Background loop: warm the queries batch by batch"""
+        if self.niceness:
+            try:
+                # On Linux a thread is its own scheduling entity
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.niceness)
+            except (AttributeError, OSError) as e:
+                logging.warning(f"Could not lower cache warm-up priority: {str(e)}")
+        
+        for start in range(0, len(self.queries), self.batch_size):
+            while self.idle is not None and not self.idle() and not self._stop.is_set():
+                self._stop.wait(self.pause)
+            if self._stop.is_set():
+                self.state = self.STOPPED
+                break
+            
+            batch = self.queries[start:start + self.batch_size]
+            try:
+                self.warm(batch)
+                self.warmed += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logging.error(f"Cache warm-up failed for {len(batch)} queries: {str(e)}")
+            self._stop.wait(self.pause)
+        else:
+            self.state = self.DONE
+        
+        self.finished_at = time.time()
+        logging.info(f"Cache warm-up {self.state}: {self.warmed} queries warmed, {self.failed} failed "
+                     f"in {self.finished_at - self.started_at:.1f} seconds")
+    
+    def status(self):
+        """
+        Get warm-up progress
+        
+        Returns:
+            dict: State, readiness, total/warmed/failed query counts,
+                  progress (0 to 1) and elapsed seconds
+        """
+        total = len(self.queries)
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            'state': self.state,
+            'ready': self.ready,
+            'total': total,
+            'warmed': self.warmed,
+            'failed': self.failed,
+            'progress': (self.warmed + self.failed) / total if total else 1.0,
+            'seconds': elapsed
+        }
@@ -0,0 +1,3 @@
+"""
+Storage module for persisting request history, feedback and caches
+"""
@@ -0,0 +1,116 @@
+"""
+In-memory caching utilities for SkillMentor
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe mapping that keeps at most `maxsize` entries,
+    evicting the least recently used entry first
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Initialize the cache
+
+        Args:
+            maxsize (int): Maximum number of entries to keep
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Get a cached value and mark it as recently used
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing
+
+        Returns:
+            The cached value or `default`
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entry if full
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Remove a key and return its value (or `default`)"""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def items(self):
+        """Snapshot of the cached (key, value) pairs, least recently used first"""
+        with self._lock:
+            return list(self._data.items())
+
+    def stats(self):
+        """
+        Get cache usage statistics
+
+        Returns:
+            dict: Size, capacity, hit/miss counters and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._data[key]
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
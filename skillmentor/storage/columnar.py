@@ -0,0 +1,226 @@
+"""
+Compact columnar request history for fast analytics
+"""
+import hashlib
+import threading
+import numpy as np
+
+
+DEFAULT_CATEGORIES = ['pricing', 'marketing', 'sustainability', 'production', 'general']
+
+
+class RequestHistory:
+    """
+    Stores advice request history as NumPy columns instead of dicts.
+
+    Each request costs 23 bytes (timestamp, processing time, category
+    code, 64-bit query key and document count) and nothing else is kept
+    per request or per distinct query, so millions of requests fit in a
+    worker. Columns grow by doubling; once `capacity` is reached the
+    oldest requests are overwritten.
+    """
+
+    def __init__(self, capacity=1000000, categories=None, initial_size=1024):
+        """
+        Initialize the request history
+
+        Args:
+            capacity (int): Maximum number of requests kept
+            categories (list): Known category names, in code order
+            initial_size (int): Number of rows allocated up front
+        """
+        self.capacity = capacity
+        size = min(initial_size, capacity)
+        self._timestamps = np.zeros(size, dtype=np.float64)
+        self._processing_times = np.zeros(size, dtype=np.float32)
+        self._categories = np.zeros(size, dtype=np.uint8)
+        self._query_keys = np.zeros(size, dtype=np.uint64)
+        self._doc_counts = np.zeros(size, dtype=np.uint16)
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+        self.category_names = []
+        self._category_codes = {}
+        for name in categories or DEFAULT_CATEGORIES:
+            self._category_code(name)
+
+    def _category_code(self, name):
+        """Get the code for a category name, registering it if new"""
+        name = (name or 'general').lower()
+        code = self._category_codes.get(name)
+        if code is None:
+            if len(self.category_names) > np.iinfo(np.uint8).max:
+                raise ValueError("Too many distinct categories")
+            code = len(self.category_names)
+            self._category_codes[name] = code
+            self.category_names.append(name)
+        return code
+
+    @staticmethod
+    def query_key(query_id):
+        """
+        Get the 64-bit key stored for a query id
+
+        The key is the first 16 hex digits of a query_hash id, or of the
+        MD5 of any other id. 0 stands for no query id.
+
+        Args:
+            query_id (str): Query id
+
+        Returns:
+            int: Key (0 if query_id is empty)
+        """
+        if not query_id:
+            return 0
+        try:
+            return int(query_id[:16], 16)
+        except ValueError:
+            return int(hashlib.md5(query_id.encode('utf-8')).hexdigest()[:16], 16)
+
+    def _grow(self):
+        """Double the allocated rows, up to `capacity`"""
+        size = min(len(self._timestamps) * 2, self.capacity)
+        for name in ('_timestamps', '_processing_times', '_categories', '_query_keys', '_doc_counts'):
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def append(self, timestamp, category, processing_time=0.0, query_id=None, doc_count=0):
+        """
+        Record one request
+
+        Args:
+            timestamp (float): Request time (seconds since the epoch)
+            category (str): Query category
+            processing_time (float): Processing time in seconds
+            query_id (str): Normalized query id
+            doc_count (int): Number of documents retrieved
+        """
+        with self._lock:
+            i = self._next
+            if i >= len(self._timestamps):
+                self._grow()
+            self._timestamps[i] = timestamp
+            self._processing_times[i] = processing_time
+            self._categories[i] = self._category_code(category)
+            self._query_keys[i] = self.query_key(query_id)
+            self._doc_counts[i] = min(doc_count, np.iinfo(np.uint16).max)
+            self._next = (i + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, records):
+        """
+        Record many requests from stored request dicts
+
+        Args:
+            records (iterable): Dicts with 'timestamp', 'category',
+                                'processing_time', 'query_id' and 'doc_count'
+        """
+        for record in records:
+            self.append(
+                record.get('timestamp', 0),
+                record.get('category', 'general'),
+                record.get('processing_time', 0.0),
+                record.get('query_id'),
+                record.get('doc_count', 0)
+            )
+
+    def __len__(self):
+        return self._size
+
+    def _column(self, column):
+        """View of the filled part of a column (order is not chronological)"""
+        return column[:self._size]
+
+    def window_counts(self, windows, now):
+        """
+        Count requests within trailing time windows
+
+        Args:
+            windows (dict): Label -> window length in seconds
+            now (float): Reference time
+
+        Returns:
+            dict: Label -> number of requests
+        """
+        with self._lock:
+            timestamps = self._column(self._timestamps)
+            return {
+                label: int(np.count_nonzero(timestamps > now - seconds))
+                for label, seconds in windows.items()
+            }
+
+    def category_counts(self):
+        """
+        Count requests per category
+
+        Returns:
+            dict: Category name -> number of requests
+        """
+        with self._lock:
+            counts = np.bincount(
+                self._column(self._categories),
+                minlength=len(self.category_names)
+            )
+            return {name: int(counts[code]) for code, name in enumerate(self.category_names)}
+
+    def processing_time_histogram(self, bins=10):
+        """
+        Histogram of processing times
+
+        Args:
+            bins (int): Number of bins
+
+        Returns:
+            tuple: (counts, bin_edges) NumPy arrays
+        """
+        with self._lock:
+            return np.histogram(self._column(self._processing_times), bins=bins)
+
+    def mean_processing_time(self):
+        """Get the mean processing time in seconds"""
+        with self._lock:
+            if not self._size:
+                return 0.0
+            return float(self._column(self._processing_times).mean())
+
+    def mean_doc_count(self):
+        """Get the mean number of documents retrieved per request"""
+        with self._lock:
+            if not self._size:
+                return 0.0
+            return float(self._column(self._doc_counts).mean())
+
+    def top_query_ids(self, n=10):
+        """
+        Get the most frequent query keys
+
+        Args:
+            n (int): Number of query keys to return
+
+        Returns:
+            list: (query key, count) tuples, most frequent first; a key is the
+                  16-hex-digit prefix of the query id (see query_key)
+        """
+        with self._lock:
+            keys = self._column(self._query_keys)
+            keys = keys[keys != 0]
+            if not len(keys):
+                return []
+            keys, counts = np.unique(keys, return_counts=True)
+            top = np.argsort(counts, kind='stable')[::-1][:n]
+            return [(f"{int(keys[i]):016x}", int(counts[i])) for i in top]
+
+    def memory_usage(self):
+        """
+        Get the approximate memory used by the columns
+
+        Returns:
+            int: Size in bytes
+        """
+        return sum(column.nbytes for column in (
+            self._timestamps, self._processing_times, self._categories,
+            self._query_keys, self._doc_counts
+        ))
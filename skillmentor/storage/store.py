@@ -0,0 +1,463 @@
+"""
+Bounded, persistent event storage for advice requests and user feedback
+"""
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+from collections import deque
+from skillmentor.storage.writer import WriteBehindWriter
+
+
+class RetentionPolicy:
+    """
+    Limits how many events of each kind are kept and for how long
+    """
+
+    def __init__(self, max_events=100000, max_age=30 * 86400, compact_every=20):
+        """
+        Initialize the retention policy
+
+        Args:
+            max_events (int): Maximum number of events kept per kind
+            max_age (float): Maximum event age in seconds (None keeps events forever)
+            compact_every (int): Run compaction after this many batch writes
+        """
+        self.max_events = max_events
+        self.max_age = max_age
+        self.compact_every = compact_every
+
+    def cutoff(self, now=None):
+        """
+        Get the oldest timestamp still retained
+
+        Args:
+            now (float): Reference time (defaults to the current time)
+
+        Returns:
+            float: Cutoff timestamp, or None if events never expire
+        """
+        if self.max_age is None:
+            return None
+        return (now if now is not None else time.time()) - self.max_age
+
+
+class MemoryBackend:
+    """
+    Storage backend that keeps events in bounded in-process buffers.
+    Events are lost on restart and are not shared between workers.
+    """
+
+    def __init__(self, retention=None):
+        """
+        Initialize the memory backend
+
+        Args:
+            retention (RetentionPolicy): Retention limits
+        """
+        self.retention = retention or RetentionPolicy()
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def _buffer(self, kind):
+        if kind not in self._events:
+            self._events[kind] = deque(maxlen=self.retention.max_events)
+        return self._events[kind]
+
+    def write(self, kind, records):
+        """Append a batch of records"""
+        with self._lock:
+            self._buffer(kind).extend(records)
+
+    def read(self, kind, since=None, limit=None):
+        """
+        Read records in chronological order
+
+        Args:
+            kind (str): Event kind
+            since (float): Only return records at or after this timestamp
+            limit (int): Only return the newest `limit` records
+
+        Returns:
+            list: Records
+        """
+        with self._lock:
+            records = list(self._buffer(kind))
+        if since is not None:
+            records = [r for r in records if r.get('timestamp', 0) >= since]
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else []
+        return records
+
+    def count(self, kind):
+        """Count the stored records of a kind"""
+        with self._lock:
+            return len(self._buffer(kind))
+
+    def compact(self, kind):
+        """Drop records older than the retention window"""
+        cutoff = self.retention.cutoff()
+        if cutoff is None:
+            return
+        with self._lock:
+            buffer = self._buffer(kind)
+            while buffer and buffer[0].get('timestamp', 0) < cutoff:
+                buffer.popleft()
+
+    def close(self):
+        """Release resources (nothing to do for memory storage)"""
+
+
+class SQLiteBackend:
+    """
+    Storage backend that appends events to a SQLite database in WAL mode,
+    so several worker processes can share one persistent history
+    """
+
+    def __init__(self, path, retention=None):
+        """
+        Initialize the SQLite backend
+
+        Args:
+            path (str): Path to the database file
+            retention (RetentionPolicy): Retention limits
+        """
+        self.path = path
+        self.retention = retention or RetentionPolicy()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "kind TEXT NOT NULL, "
+            "timestamp REAL NOT NULL, "
+            "payload TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_events_kind_timestamp ON events (kind, timestamp)"
+        )
+        self._conn.commit()
+        logging.info(f"SQLite event store opened at {path}")
+
+    def write(self, kind, records):
+        """Append a batch of records in a single transaction"""
+        rows = [(kind, record.get('timestamp', time.time()), json.dumps(record)) for record in records]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO events (kind, timestamp, payload) VALUES (?, ?, ?)", rows
+                )
+
+    def read(self, kind, since=None, limit=None):
+        """
+        Read records in chronological order
+
+        Args:
+            kind (str): Event kind
+            since (float): Only return records at or after this timestamp
+            limit (int): Only return the newest `limit` records
+
+        Returns:
+            list: Records
+        """
+        sql = "SELECT payload FROM events WHERE kind = ?"
+        params = [kind]
+        if since is not None:
+            sql += " AND timestamp >= ?"
+            params.append(since)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def count(self, kind):
+        """Count the stored records of a kind"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM events WHERE kind = ?", (kind,)
+            ).fetchone()[0]
+
+    def compact(self, kind):
+        """
+        Apply the retention policy to a kind and truncate the WAL file
+        """
+        cutoff = self.retention.cutoff()
+        with self._lock:
+            with self._conn:
+                if cutoff is not None:
+                    self._conn.execute(
+                        "DELETE FROM events WHERE kind = ? AND timestamp < ?", (kind, cutoff)
+                    )
+                self._conn.execute(
+                    "DELETE FROM events WHERE kind = ? AND id <= ("
+                    "SELECT id FROM events WHERE kind = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (kind, kind, self.retention.max_events)
+                )
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class EventLog:
+    """
+    Append-only log for one kind of event. Writes are batched into the
+    backend (optionally by a background writer) and the newest events
+    are kept in a ring buffer for hot reads.
+    """
+
+    def __init__(self, kind, backend, hot_capacity=1000, batch_size=50, writer=None):
+        """
+        Initialize the event log
+
+        Args:
+            kind (str): Event kind (e.g. 'advice_requests')
+            backend: Storage backend
+            hot_capacity (int): Size of the in-memory ring buffer
+            batch_size (int): Number of events buffered before a batch write
+            writer (WriteBehindWriter): Background writer; when given, appends
+                                        never write to the backend directly
+        """
+        self.kind = kind
+        self.backend = backend
+        self.batch_size = batch_size
+        self.writer = writer
+        self._hot = deque(maxlen=hot_capacity)
+        self._pending = []
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        # Warm the ring buffer with the newest persisted events
+        try:
+            self._hot.extend(backend.read(kind, limit=hot_capacity))
+        except Exception as e:
+            logging.error(f"Error loading recent {kind} events: {str(e)}")
+
+    def append(self, record):
+        """
+        Append an event
+
+        Args:
+            record (dict): Event data; should contain a 'timestamp'
+        """
+        if self.writer:
+            with self._lock:
+                self._hot.append(record)
+            self.writer.submit(self.kind, record)
+            return
+
+        batch = None
+        with self._lock:
+            self._hot.append(record)
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                batch, self._pending = self._pending, []
+
+        if batch:
+            self.write_batch(batch)
+
+    def flush(self):
+        """Write any buffered events to the backend"""
+        if self.writer:
+            self.writer.flush()
+            return
+
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self.write_batch(batch)
+
+    def write_batch(self, batch):
+        """
+        Write a batch of events to the backend, compacting periodically
+
+        Args:
+            batch (list): Events to write
+        """
+        try:
+            self.backend.write(self.kind, batch)
+        except Exception as e:
+            logging.error(f"Error writing {len(batch)} {self.kind} events: {str(e)}")
+            return
+
+        self._writes += 1
+        compact_every = self.backend.retention.compact_every
+        if compact_every and self._writes % compact_every == 0:
+            self.compact()
+
+    def compact(self):
+        """Apply the backend's retention policy to this log"""
+        try:
+            self.backend.compact(self.kind)
+        except Exception as e:
+            logging.error(f"Error compacting {self.kind} events: {str(e)}")
+
+    def recent(self, limit=None):
+        """
+        Get the newest events from the ring buffer, oldest first
+
+        Args:
+            limit (int): Maximum number of events to return
+
+        Returns:
+            list: Events
+        """
+        with self._lock:
+            records = list(self._hot)
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else []
+        return records
+
+    def read(self, since=None, limit=None):
+        """
+        Read retained events from the backend, oldest first
+
+        Args:
+            since (float): Only return events at or after this timestamp
+            limit (int): Only return the newest `limit` events
+
+        Returns:
+            list: Events
+        """
+        self.flush()
+        return self.backend.read(self.kind, since=since, limit=limit)
+
+    def __iter__(self):
+        return iter(self.read())
+
+    def __len__(self):
+        if self.writer:
+            pending = self.writer.pending(self.kind)
+        else:
+            with self._lock:
+                pending = len(self._pending)
+        return self.backend.count(self.kind) + pending
+
+
+class EventStore:
+    """
+    Collection of event logs sharing one storage backend
+    """
+
+    def __init__(self, backend, hot_capacity=1000, batch_size=50,
+                 write_behind=False, flush_interval=1.0, max_queue=10000):
+        """
+        Initialize the event store
+
+        Args:
+            backend: Storage backend (MemoryBackend or SQLiteBackend)
+            hot_capacity (int): Ring buffer size for each log
+            batch_size (int): Batch size for each log
+            write_behind (bool): Persist events from a background thread
+            flush_interval (float): Maximum seconds an event waits in the write-behind queue
+            max_queue (int): Capacity of the write-behind queue
+        """
+        self.backend = backend
+        self.hot_capacity = hot_capacity
+        self.batch_size = batch_size
+        self._logs = {}
+        self._lock = threading.Lock()
+        self.writer = None
+        if write_behind:
+            self.writer = WriteBehindWriter(
+                self._write_batch,
+                max_queue=max_queue,
+                batch_size=batch_size,
+                flush_interval=flush_interval
+            )
+
+    def log(self, kind):
+        """
+        Get (or create) the log for an event kind
+
+        Args:
+            kind (str): Event kind
+
+        Returns:
+            EventLog: The event log
+        """
+        with self._lock:
+            if kind not in self._logs:
+                self._logs[kind] = EventLog(
+                    kind, self.backend,
+                    hot_capacity=self.hot_capacity,
+                    batch_size=self.batch_size,
+                    writer=self.writer
+                )
+            return self._logs[kind]
+
+    def _write_batch(self, kind, records):
+        """Sink for the write-behind writer"""
+        self.log(kind).write_batch(records)
+
+    def flush(self):
+        """Flush all logs"""
+        if self.writer:
+            self.writer.flush()
+            return
+        for log in list(self._logs.values()):
+            log.flush()
+
+    def compact(self):
+        """Apply the retention policy to all logs"""
+        for log in list(self._logs.values()):
+            log.compact()
+
+    def close(self):
+        """Flush all logs and close the backend"""
+        if self.writer:
+            self.writer.close()
+        else:
+            self.flush()
+        self.backend.close()
+
+
+def create_event_store(url=None, retention=None, hot_capacity=1000, batch_size=50,
+                       write_behind=False, flush_interval=1.0, max_queue=10000):
+    """
+    Create an event store from a storage URL
+
+    Args:
+        url (str): 'memory://' or 'sqlite:///path/to/file.db' (default: memory)
+        retention (RetentionPolicy): Retention limits
+        hot_capacity (int): Ring buffer size for each log
+        batch_size (int): Batch size for each log
+        write_behind (bool): Persist events from a background thread
+        flush_interval (float): Maximum seconds an event waits in the write-behind queue
+        max_queue (int): Capacity of the write-behind queue
+
+    Returns:
+        EventStore: The configured event store
+    """
+    url = url or 'memory://'
+    retention = retention or RetentionPolicy()
+
+    if url.startswith('sqlite:///'):
+        backend = SQLiteBackend(url[len('sqlite:///'):], retention=retention)
+    elif url.startswith('memory://'):
+        backend = MemoryBackend(retention=retention)
+    else:
+        raise ValueError(f"Unsupported storage URL: {url}")
+
+    return EventStore(
+        backend,
+        hot_capacity=hot_capacity,
+        batch_size=batch_size,
+        write_behind=write_behind,
+        flush_interval=flush_interval,
+        max_queue=max_queue
+    )
@@ -0,0 +1,222 @@
+"""
+Write-behind buffering so persistence stays off the request path
+"""
+import time
+import queue
+import logging
+import threading
+
+
+class WriteBehindWriter:
+    """
+    Collects events on a bounded queue and writes them in batches
+    from a background thread
+    """
+
+    def __init__(self, sink, max_queue=10000, batch_size=100, flush_interval=1.0, put_timeout=0.05):
+        """
+        Initialize the writer and start the background flusher
+
+        Args:
+            sink (callable): Called as sink(kind, records) to persist a batch
+            max_queue (int): Maximum number of queued events
+            batch_size (int): Maximum number of events written per batch
+            flush_interval (float): Maximum seconds an event waits before being written
+            put_timeout (float): Seconds a producer blocks on a full queue before
+                                 the event is dropped
+        """
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.dropped = 0
+        self.written = 0
+        self._queued_by_kind = {}
+        self._counter_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._submitting = 0
+        self._state = threading.Condition()
+        self._stop = object()
+
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def submit(self, kind, record):
+        """
+        Queue an event for writing
+
+        When the queue is full the caller is blocked for at most `put_timeout`
+        seconds; if there is still no room the event is dropped.
+
+        Args:
+            kind (str): Event kind
+            record (dict): Event data
+
+        Returns:
+            bool: True if the event was queued
+        """
+        # close() waits for submits already past this check, so their
+        # events are queued ahead of the stop marker and still written
+        with self._state:
+            if self._closed:
+                logging.warning(f"Write-behind writer closed, dropping {kind} event")
+                return False
+            self._submitting += 1
+        try:
+            return self._put(kind, record)
+        finally:
+            with self._state:
+                self._submitting -= 1
+                self._state.notify_all()
+
+    def _put(self, kind, record):
+        """Queue an event, waiting up to `put_timeout` for room (see submit)"""
+        # Counted before it is queued, so the writer never uncounts it first
+        self._count_queued(kind, 1)
+        try:
+            self._queue.put_nowait((kind, record))
+            return True
+        except queue.Full:
+            pass
+
+        try:
+            self._queue.put((kind, record), timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            with self._counter_lock:
+                self._queued_by_kind[kind] -= 1
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                logging.warning(f"Write-behind queue full, dropped {dropped} events so far")
+            return False
+
+    def pending(self, kind=None):
+        """
+        Get the approximate number of queued events
+
+        Args:
+            kind (str): Only count events of this kind
+
+        Returns:
+            int: Events queued and not yet written
+        """
+        if kind is None:
+            return self._queue.qsize()
+        with self._counter_lock:
+            return self._queued_by_kind.get(kind, 0)
+
+    def _count_queued(self, kind, n):
+        """Add n to the number of queued events of a kind"""
+        with self._counter_lock:
+            self._queued_by_kind[kind] = self._queued_by_kind.get(kind, 0) + n
+
+    def flush(self, timeout=None):
+        """
+        Block until every event queued before this call has been written
+
+        Args:
+            timeout (float): Maximum seconds to wait, including for room on a
+                             full queue
+
+        Returns:
+            bool: True if the flush completed in time
+        """
+        if self._closed or not self._thread.is_alive():
+            return False
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def close(self, timeout=10.0):
+        """
+        Write all remaining events and stop the background thread
+
+        Events still queued when the timeout runs out (for example because
+        the sink is stalled) are not written.
+
+        Args:
+            timeout (float): Maximum seconds to wait for the final flush
+                             (None to wait indefinitely)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        remaining = lambda: None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        with self._state:
+            if self._closed:
+                return
+            self._closed = True
+            self._state.wait_for(lambda: not self._submitting, remaining())
+
+        try:
+            self._queue.put(self._stop, timeout=remaining())
+        except queue.Full:
+            logging.warning(f"Write-behind queue still full after {timeout} seconds, "
+                            f"{self.pending()} events not written")
+            return
+        self._thread.join(remaining())
+        if self._thread.is_alive():
+            logging.warning(f"Write-behind writer did not finish within {timeout} seconds")
+
+    def _run(self):
+        """Background loop: gather events into batches and write them"""
+        while True:
+            batch = []
+            markers = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if item is self._stop:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    break
+                batch.append(item)
+
+            if stop:
+                # Drain whatever is still queued before exiting
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, threading.Event):
+                        markers.append(item)
+                    elif item is not self._stop:
+                        batch.append(item)
+
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
+    def _write(self, batch):
+        """Group a batch by event kind and pass it to the sink"""
+        by_kind = {}
+        for kind, record in batch:
+            by_kind.setdefault(kind, []).append(record)
+
+        for kind, records in by_kind.items():
+            try:
+                self.sink(kind, records)
+                with self._counter_lock:
+                    self.written += len(records)
+            except Exception as e:
+                logging.error(f"Error writing {len(records)} {kind} events: {str(e)}")
+            self._count_queued(kind, -len(records))
@@ -0,0 +1,65 @@
+"""
+Parity of the ONNX encoder export with the PyTorch encoder
+
+The export is built from a small randomly initialized BERT wrapped as a
+SentenceTransformer, so the test needs no model download. It is skipped
+when PyTorch, sentence-transformers or ONNX Runtime is not installed.
+"""
+import os
+import sys
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skillmentor.rag.encoders import Encoder, create_encoder
+
+TEXTS = [
+    "How should I price my handmade wooden crafts?",
+    "Source materials locally to reduce carbon footprint.",
+    "Plan for seasonal income fluctuations by saving during high seasons."
+]
+
+@pytest.fixture(scope='module')
+def tiny_encoder(tmp_path_factory):
+    """Encoder registered as minilm but backed by a tiny random BERT"""
+    torch = pytest.importorskip('torch')
+    transformers = pytest.importorskip('transformers')
+    sentence_transformers = pytest.importorskip('sentence_transformers')
+    
+    model_dir = str(tmp_path_factory.mktemp('tiny-bert'))
+    words = sorted({word.strip('?.') for text in TEXTS for word in text.lower().split()})
+    vocab_path = os.path.join(model_dir, 'vocab.txt')
+    with open(vocab_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]', '.', '?'] + words))
+    
+    torch.manual_seed(0)
+    transformers.BertTokenizerFast(vocab_path).save_pretrained(model_dir)
+    config = transformers.BertConfig(
+        vocab_size=len(words) + 7,
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=128
+    )
+    transformers.BertModel(config).save_pretrained(model_dir)
+    return Encoder('minilm', model=sentence_transformers.SentenceTransformer(model_dir, device='cpu'))
+
+def test_onnx_export_matches_pytorch(tiny_encoder, tmp_path):
+    """The int8 ONNX export encodes like the PyTorch model"""
+    pytest.importorskip('onnxruntime')
+    from skillmentor.rag.onnx_encoder import export_onnx_encoder, cosine_similarities
+    
+    export_dir = export_onnx_encoder(tiny_encoder, str(tmp_path / 'onnx'))
+    exported = Encoder('minilm', onnx_path=export_dir)
+    
+    reference = tiny_encoder.encode(TEXTS)
+    embeddings = exported.encode(TEXTS)
+    assert embeddings.shape == reference.shape
+    assert cosine_similarities(reference, embeddings).min() >= 0.99
+
+def test_create_encoder_rejects_options_for_an_instance(tiny_encoder):
+    """Options such as onnx_path are not silently dropped for an existing Encoder"""
+    assert create_encoder(tiny_encoder) is tiny_encoder
+    with pytest.raises(ValueError):
+        create_encoder(tiny_encoder, onnx_path='data/models/minilm-onnx')